@@ -0,0 +1,47 @@
+"""Evaluator normalization
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('evaluator_normalizations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('evaluator_id', sa.Integer(), nullable=False),
+    sa.Column('evaluator_name', sa.String(), nullable=False),
+    sa.Column('skill', sa.String(), nullable=False),
+    sa.Column('offset', sa.Float(), nullable=False),
+    sa.Column('scale', sa.Float(), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['evaluator_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('evaluator_id', 'evaluator_name', 'skill')
+    )
+    op.create_index(op.f('ix_evaluator_normalizations_id'), 'evaluator_normalizations', ['id'], unique=False)
+    op.create_index(op.f('ix_evaluator_normalizations_evaluator_id'), 'evaluator_normalizations', ['evaluator_id'], unique=False)
+
+    op.create_table('refresh_watermarks',
+    sa.Column('job', sa.String(), nullable=False),
+    sa.Column('last_evaluation_id', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('job')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('refresh_watermarks')
+    op.drop_index(op.f('ix_evaluator_normalizations_evaluator_id'), table_name='evaluator_normalizations')
+    op.drop_index(op.f('ix_evaluator_normalizations_id'), table_name='evaluator_normalizations')
+    op.drop_table('evaluator_normalizations')
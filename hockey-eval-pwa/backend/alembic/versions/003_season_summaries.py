@@ -0,0 +1,54 @@
+"""Season summaries
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('season_skill_summaries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('coach_id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('age_group', sa.String(), nullable=True),
+    sa.Column('season', sa.String(), nullable=False),
+    sa.Column('period', sa.String(), nullable=False),
+    sa.Column('skill', sa.String(), nullable=False),
+    sa.Column('evaluation_count', sa.Integer(), nullable=False),
+    sa.Column('player_count', sa.Integer(), nullable=False),
+    sa.Column('average', sa.Float(), nullable=False),
+    sa.Column('minimum', sa.Integer(), nullable=False),
+    sa.Column('maximum', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['coach_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_season_skill_summaries_id'), 'season_skill_summaries', ['id'], unique=False)
+    op.create_index(op.f('ix_season_skill_summaries_coach_id'), 'season_skill_summaries', ['coach_id'], unique=False)
+    op.create_index(op.f('ix_season_skill_summaries_season'), 'season_skill_summaries', ['season'], unique=False)
+
+    op.create_table('summary_refresh_requests',
+    sa.Column('coach_id', sa.Integer(), nullable=False),
+    sa.Column('requested_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['coach_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('coach_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('summary_refresh_requests')
+    op.drop_index(op.f('ix_season_skill_summaries_season'), table_name='season_skill_summaries')
+    op.drop_index(op.f('ix_season_skill_summaries_coach_id'), table_name='season_skill_summaries')
+    op.drop_index(op.f('ix_season_skill_summaries_id'), table_name='season_skill_summaries')
+    op.drop_table('season_skill_summaries')
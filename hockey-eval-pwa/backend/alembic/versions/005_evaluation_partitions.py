@@ -0,0 +1,91 @@
+"""Season partitions for evaluations
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+# Seasons start on August 1st; one range partition per season, named
+# evaluations_2025_26, plus a default partition for anything outside them.
+SEASON_START_MONTH = 8
+
+
+def _season_start_year(date):
+    return date.year if date.month >= SEASON_START_MONTH else date.year - 1
+
+
+def _create_season_partition(start_year):
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS evaluations_{start_year}_{(start_year + 1) % 100:02d} "
+        f"PARTITION OF evaluations FOR VALUES FROM ('{start_year}-08-01') TO ('{start_year + 1}-08-01')"
+    )
+
+
+def upgrade() -> None:
+    op.create_table('archived_seasons',
+    sa.Column('season', sa.String(), nullable=False),
+    sa.Column('starts_at', sa.DateTime(), nullable=False),
+    sa.Column('ends_at', sa.DateTime(), nullable=False),
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('evaluation_count', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('season')
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # Declarative range partitioning is PostgreSQL only; other databases
+        # keep the plain table and archive with DELETE.
+        return
+
+    earliest = bind.execute(sa.text("SELECT min(date) FROM evaluations")).scalar()
+    current = _season_start_year(datetime.utcnow())
+    first = _season_start_year(earliest) if earliest else current
+
+    op.execute("ALTER TABLE evaluations RENAME TO evaluations_unpartitioned")
+    op.execute(
+        "CREATE TABLE evaluations (LIKE evaluations_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (date)"
+    )
+    for start_year in range(first, current + 2):
+        _create_season_partition(start_year)
+    op.execute("CREATE TABLE evaluations_default PARTITION OF evaluations DEFAULT")
+    op.execute("INSERT INTO evaluations SELECT * FROM evaluations_unpartitioned")
+    op.execute("ALTER SEQUENCE evaluations_id_seq OWNED BY evaluations.id")
+    op.drop_table('evaluations_unpartitioned')
+
+    # Unique keys on a partitioned table must include the partition key.
+    op.create_index('uq_evaluations_id_date', 'evaluations', ['id', 'date'], unique=True)
+    op.create_index(op.f('ix_evaluations_id'), 'evaluations', ['id'], unique=False)
+    op.create_index(op.f('ix_evaluations_date'), 'evaluations', ['date'], unique=False)
+    op.create_foreign_key('evaluations_player_id_fkey', 'evaluations', 'players', ['player_id'], ['id'])
+    op.create_foreign_key('evaluations_evaluator_id_fkey', 'evaluations', 'users', ['evaluator_id'], ['id'])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("ALTER TABLE evaluations RENAME TO evaluations_partitioned")
+        op.execute(
+            "CREATE TABLE evaluations (LIKE evaluations_partitioned INCLUDING DEFAULTS)"
+        )
+        op.execute("INSERT INTO evaluations SELECT * FROM evaluations_partitioned")
+        op.execute("ALTER SEQUENCE evaluations_id_seq OWNED BY evaluations.id")
+        op.drop_table('evaluations_partitioned')
+        op.create_primary_key('evaluations_pkey', 'evaluations', ['id'])
+        op.create_index(op.f('ix_evaluations_id'), 'evaluations', ['id'], unique=False)
+        op.create_foreign_key('evaluations_player_id_fkey', 'evaluations', 'players', ['player_id'], ['id'])
+        op.create_foreign_key('evaluations_evaluator_id_fkey', 'evaluations', 'users', ['evaluator_id'], ['id'])
+
+    op.drop_table('archived_seasons')
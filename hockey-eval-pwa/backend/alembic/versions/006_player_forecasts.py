@@ -0,0 +1,37 @@
+"""Player forecasts
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('player_forecasts',
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('skill', sa.String(), nullable=False),
+    sa.Column('slope_per_year', sa.Float(), nullable=False),
+    sa.Column('current', sa.Float(), nullable=False),
+    sa.Column('forecast', sa.Float(), nullable=False),
+    sa.Column('lower', sa.Float(), nullable=False),
+    sa.Column('upper', sa.Float(), nullable=False),
+    sa.Column('horizon_days', sa.Integer(), nullable=False),
+    sa.Column('evaluation_count', sa.Integer(), nullable=False),
+    sa.Column('last_evaluation_at', sa.DateTime(), nullable=False),
+    sa.Column('fitted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+    sa.PrimaryKeyConstraint('player_id', 'skill')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('player_forecasts')
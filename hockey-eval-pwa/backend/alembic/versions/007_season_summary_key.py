@@ -0,0 +1,35 @@
+"""Unique key for season summaries
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+KEY = ['coach_id', 'team_id', 'age_group', 'season', 'period', 'skill']
+
+
+def upgrade() -> None:
+    # Concurrent refreshes could insert the same summary row twice; keep the
+    # newest copy. GROUP BY treats NULLs as equal, like the constraint below.
+    op.execute(
+        "DELETE FROM season_skill_summaries WHERE id NOT IN "
+        f"(SELECT max(id) FROM season_skill_summaries GROUP BY {', '.join(KEY)})"
+    )
+    with op.batch_alter_table('season_skill_summaries') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_season_skill_summaries_key', KEY, postgresql_nulls_not_distinct=True
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('season_skill_summaries') as batch_op:
+        batch_op.drop_constraint('uq_season_skill_summaries_key', type_='unique')
@@ -0,0 +1,59 @@
+"""Pending refresh queue for season summaries
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('pending_refreshes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job', sa.String(), nullable=False),
+    sa.Column('coach_id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=True),
+    sa.Column('season_year', sa.Integer(), nullable=True),
+    sa.Column('queued_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pending_refreshes_job'), 'pending_refreshes', ['job'], unique=False)
+
+    # Carry over what the old watermark and request table still owed: every
+    # season of coaches with evaluations past the watermark or a request.
+    op.execute(
+        "INSERT INTO pending_refreshes (job, coach_id, queued_at) "
+        "SELECT DISTINCT 'season_summaries', p.coach_id, CURRENT_TIMESTAMP "
+        "FROM evaluations e JOIN players p ON p.id = e.player_id "
+        "WHERE e.id > COALESCE((SELECT last_evaluation_id FROM refresh_watermarks "
+        "WHERE job = 'season_summaries'), 0)"
+    )
+    op.execute(
+        "INSERT INTO pending_refreshes (job, coach_id, queued_at) "
+        "SELECT 'season_summaries', coach_id, requested_at FROM summary_refresh_requests"
+    )
+    op.drop_table('summary_refresh_requests')
+
+
+def downgrade() -> None:
+    op.create_table('summary_refresh_requests',
+    sa.Column('coach_id', sa.Integer(), nullable=False),
+    sa.Column('requested_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['coach_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('coach_id')
+    )
+    op.execute(
+        "INSERT INTO summary_refresh_requests (coach_id, requested_at) "
+        "SELECT coach_id, max(queued_at) FROM pending_refreshes "
+        "WHERE job = 'season_summaries' GROUP BY coach_id"
+    )
+    op.drop_index(op.f('ix_pending_refreshes_job'), table_name='pending_refreshes')
+    op.drop_table('pending_refreshes')
@@ -0,0 +1,28 @@
+"""Queue evaluator normalization work in pending_refreshes
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 17:30:00.000000
+
+"""
+from alembic import op
+
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Accounts with evaluations the old watermark had not reached yet.
+    op.execute(
+        "INSERT INTO pending_refreshes (job, coach_id, queued_at) "
+        "SELECT DISTINCT 'evaluator_normalization', evaluator_id, CURRENT_TIMESTAMP FROM evaluations "
+        "WHERE id > COALESCE((SELECT last_evaluation_id FROM refresh_watermarks "
+        "WHERE job = 'evaluator_normalization'), 0)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM pending_refreshes WHERE job = 'evaluator_normalization'")
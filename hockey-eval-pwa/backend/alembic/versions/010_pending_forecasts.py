@@ -0,0 +1,36 @@
+"""Queue forecast work in pending_refreshes, drop the id watermark
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Players with evaluations the old watermark had not reached yet.
+    op.execute(
+        "INSERT INTO pending_refreshes (job, coach_id, player_id, queued_at) "
+        "SELECT DISTINCT 'player_forecasts', p.coach_id, p.id, CURRENT_TIMESTAMP "
+        "FROM evaluations e JOIN players p ON p.id = e.player_id "
+        "WHERE e.id > COALESCE((SELECT last_evaluation_id FROM refresh_watermarks "
+        "WHERE job = 'player_forecasts'), 0)"
+    )
+    # Every refresh now takes its work from pending_refreshes.
+    with op.batch_alter_table('refresh_watermarks') as batch_op:
+        batch_op.drop_column('last_evaluation_id')
+
+
+def downgrade() -> None:
+    # Everything still queued is redone from scratch after a downgrade.
+    with op.batch_alter_table('refresh_watermarks') as batch_op:
+        batch_op.add_column(sa.Column('last_evaluation_id', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("DELETE FROM pending_refreshes WHERE job = 'player_forecasts'")
@@ -0,0 +1,246 @@
+import argparse
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from . import models, packed, seasons
+from .database import SessionLocal, advisory_lock
+
+# Closed seasons are moved out of the hot evaluations table into
+# ARCHIVE_DIR/<season>/, one pair of files per coach (evaluator):
+#   coach-<id>.ndjson.gz  every column of every evaluation, for restores/exports
+#   coach-<id>.skills.gz  packed.RECORD_DTYPE records sorted by date, for analytics
+# archived_seasons records what was moved. Readers merge archived seasons
+# back in whenever the requested range (or, without one, all time) reaches
+# into them: packed.load_skill_records from the .skills files, analytics and
+# reports through load_evaluations() from the .ndjson files.
+#
+# On PostgreSQL the table is range-partitioned by season (migration 005), so
+# archiving drops the season's partition instead of deleting row by row, and
+# ensure_partitions() creates upcoming seasons' partitions ahead of time, at
+# startup and then daily. Rows that already landed in the default partition
+# for a season (a missed run, a far-future date) are moved into the new
+# partition: PostgreSQL refuses to create a partition whose range still has
+# rows in the default one.
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive")
+KEEP_SEASONS = int(os.getenv("ARCHIVE_KEEP_SEASONS", "2"))
+PARTITIONS_AHEAD = int(os.getenv("PARTITIONS_AHEAD", "2"))
+PARTITION_JOB_NAME = "evaluation_partitions"
+CHUNK_ROWS = 10_000
+
+_COLUMNS = [column.name for column in models.Evaluation.__table__.columns]
+
+
+def records_filename(coach_id: int) -> str:
+    return f"coach-{coach_id}.ndjson.gz"
+
+
+def partition_name(season: str) -> str:
+    return "evaluations_" + season.replace("-", "_")
+
+
+def archived_paths(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[str]:
+    """Directories of archived seasons overlapping ``[start, end)``, oldest first."""
+    archived = models.ArchivedSeason
+    stmt = select(archived.path).order_by(archived.starts_at)
+    if start:
+        stmt = stmt.where(archived.ends_at > start)
+    if end:
+        stmt = stmt.where(archived.starts_at < end)
+    return list(db.execute(stmt).scalars())
+
+
+def load_evaluations(
+    db: Session,
+    coach_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Iterator[dict]:
+    """Archived evaluations by ``coach_id`` in ``[start, end)``, oldest season first.
+
+    Each is the exported record with ``date`` parsed back to a datetime.
+    """
+    for path in archived_paths(db, start, end):
+        try:
+            handle = gzip.open(os.path.join(path, records_filename(coach_id)), "rt", encoding="utf-8")
+        except FileNotFoundError:
+            continue
+        with handle:
+            for line in handle:
+                record = json.loads(line)
+                record["date"] = datetime.fromisoformat(record["date"])
+                if (start and record["date"] < start) or (end and record["date"] >= end):
+                    continue
+                yield record
+
+
+def is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'evaluations'::regclass"
+    )).first() is not None
+
+
+def _default_partition(db: Session):
+    return db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'evaluations'::regclass AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'"
+    )).scalar()
+
+
+def ensure_partitions(db: Session, ahead: int = PARTITIONS_AHEAD) -> List[str]:
+    """Create partitions for the current season and ``ahead`` after it."""
+    if not is_partitioned(db) or not advisory_lock(db, PARTITION_JOB_NAME):
+        return []
+    current = seasons.season_start_year(datetime.utcnow())
+    default = _default_partition(db)
+    created = []
+    for start_year in range(current, current + ahead + 1):
+        season = seasons.season_label(start_year)
+        name = partition_name(season)
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            continue
+        start, end = seasons.season_bounds(season)
+        bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        in_range = {"start": start, "end": end}
+        stranded = default is not None and db.execute(text(
+            f"SELECT 1 FROM {default} WHERE date >= :start AND date < :end LIMIT 1"
+        ), in_range).first() is not None
+        if stranded:
+            db.execute(text(f"ALTER TABLE evaluations DETACH PARTITION {default}"))
+            db.execute(text(f"CREATE TABLE {name} PARTITION OF evaluations {bounds}"))
+            db.execute(text(
+                f"INSERT INTO evaluations SELECT * FROM {default} WHERE date >= :start AND date < :end"
+            ), in_range)
+            db.execute(text(f"DELETE FROM {default} WHERE date >= :start AND date < :end"), in_range)
+            db.execute(text(f"ALTER TABLE evaluations ATTACH PARTITION {default} DEFAULT"))
+        else:
+            db.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF evaluations {bounds}"))
+        created.append(name)
+    db.commit()
+    return created
+
+
+def ensure_partitions_pending():
+    db = SessionLocal()
+    try:
+        ensure_partitions(db)
+    finally:
+        db.close()
+
+
+def archived_seasons(db: Session) -> List[str]:
+    return list(db.execute(select(models.ArchivedSeason.season)).scalars())
+
+
+def closed_seasons(db: Session, keep: int = KEEP_SEASONS) -> List[str]:
+    """Seasons with hot evaluations that are older than the newest ``keep``."""
+    e = models.Evaluation
+    cutoff_year = seasons.season_start_year(datetime.utcnow()) - keep + 1
+    cutoff, _ = seasons.season_bounds(seasons.season_label(cutoff_year))
+    years = db.execute(
+        select(seasons.season_year_expr(e.date)).where(e.date < cutoff).distinct()
+    ).scalars()
+    archived = set(archived_seasons(db))
+    labels = [seasons.season_label(int(year)) for year in sorted(years)]
+    return [season for season in labels if season not in archived]
+
+
+def _write_season(db: Session, season: str, directory: str) -> int:
+    e = models.Evaluation
+    start, end = seasons.season_bounds(season)
+    stmt = select(*[e.__table__.c[name] for name in _COLUMNS]).where(
+        e.date >= start, e.date < end
+    ).order_by(e.evaluator_id, e.date, e.id)
+    result = db.execute(stmt.execution_options(yield_per=CHUNK_ROWS))
+
+    coach_id, ndjson, skills, pending = None, None, None, []
+    count = 0
+
+    def flush_skills():
+        skills.write(packed.to_records(pending).tobytes())
+        pending.clear()
+
+    try:
+        for rows in result.partitions():
+            # Rows arrive grouped by coach, so one pair of files is open at a time.
+            for row in rows:
+                if row.evaluator_id != coach_id:
+                    if ndjson is not None:
+                        flush_skills()
+                        ndjson.close()
+                        skills.close()
+                    coach_id = row.evaluator_id
+                    ndjson = gzip.open(os.path.join(directory, records_filename(coach_id)), "wt", encoding="utf-8")
+                    skills = gzip.open(os.path.join(directory, packed.archive_filename(coach_id)), "wb")
+                record = row._asdict()
+                record["date"] = record["date"].isoformat()
+                ndjson.write(json.dumps(record) + "\n")
+                pending.append((row.player_id, row.date, *[record[skill] for skill in models.SKILLS]))
+            if pending:
+                flush_skills()
+            count += len(rows)
+    finally:
+        if ndjson is not None:
+            ndjson.close()
+            skills.close()
+    return count
+
+
+def archive_season(db: Session, season: str, archive_dir: str = ARCHIVE_DIR) -> int:
+    """Export ``season`` to the archive and remove it from evaluations."""
+    start, end = seasons.season_bounds(season)
+    if end > datetime.utcnow():
+        raise ValueError(f"Season {season} is not closed yet")
+    if db.get(models.ArchivedSeason, season) is not None:
+        raise ValueError(f"Season {season} is already archived")
+
+    directory = os.path.abspath(os.path.join(archive_dir, season))
+    staging = directory + ".partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    count = _write_season(db, season, staging)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.rename(staging, directory)
+
+    e = models.Evaluation
+    if is_partitioned(db):
+        name = partition_name(season)
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            db.execute(text(f"ALTER TABLE evaluations DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+    # Catches rows outside a season partition (default partition, or no
+    # partitioning at all).
+    db.execute(delete(e).where(e.date >= start, e.date < end))
+    db.add(models.ArchivedSeason(
+        season=season, starts_at=start, ends_at=end, path=directory, evaluation_count=count
+    ))
+    db.commit()
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move closed seasons out of the evaluations table")
+    parser.add_argument("--season", action="append", help="season to archive, e.g. 2023-24 (repeatable)")
+    parser.add_argument("--keep", type=int, default=KEEP_SEASONS, help="newest seasons to keep hot")
+    parser.add_argument("--dry-run", action="store_true", help="list seasons without archiving")
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        targets = args.season or closed_seasons(db, args.keep)
+        for season in targets:
+            if args.dry_run:
+                print(f"Would archive {season}")
+                continue
+            count = archive_season(db, season)
+            print(f"Archived {count} evaluation(s) from {season}")
+    finally:
+        db.close()
@@ -1,11 +1,11 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from . import models, schemas
-from .database import get_db
+from . import models, repository, schemas
+from .database import READ_YOUR_WRITES_HEADER, SessionLocal, choose_replica, get_db
 import os
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
@@ -24,7 +24,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(response: Response, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -38,12 +38,32 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         token_data = schemas.TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.username == token_data.username).first()
+    user = repository.user_by_username(db, token_data.username)
     if user is None:
         raise credentials_exception
+    # Commits on this session keep the coach's reads on the primary for a
+    # while, on this worker and, through the response header, on the others.
+    db.info["coach_id"] = user.id
+    db.info["response"] = response
     return user
 
 async def get_current_active_user(current_user: models.User = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+def primary_until(request: Request) -> Optional[float]:
+    """The read-your-writes deadline the client sent back, if any."""
+    try:
+        return float(request.headers[READ_YOUR_WRITES_HEADER])
+    except (KeyError, ValueError):
+        return None
+
+def get_read_db(request: Request, current_user: models.User = Depends(get_current_active_user)):
+    """Session for read-only handlers, routed to a replica when one is configured."""
+    db = SessionLocal()
+    db.info["replica"] = choose_replica(current_user.id, primary_until(request))
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,100 @@
+import asyncio
+import gzip
+import hashlib
+from typing import Callable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from .database import SessionLocal, choose_replica
+
+# Everything the PWA needs on launch in one response. Each query runs in the
+# threadpool on its own session (and connection), so they overlap instead of
+# queueing behind one another on a shared session.
+
+
+def _teams(db: Session, coach_id: int) -> List[schemas.Team]:
+    teams = db.query(models.Team).filter(models.Team.coach_id == coach_id).all()
+    return [schemas.Team.model_validate(team) for team in teams]
+
+
+def _players(db: Session, coach_id: int) -> List[schemas.Player]:
+    players = db.query(models.Player).filter(models.Player.coach_id == coach_id).all()
+    return [schemas.Player.model_validate(player) for player in players]
+
+
+def _feedback_templates(db: Session, coach_id: int) -> List[schemas.FeedbackTemplate]:
+    templates = db.query(models.FeedbackTemplate).filter(
+        models.FeedbackTemplate.coach_id == coach_id
+    ).all()
+    return [schemas.FeedbackTemplate.model_validate(template) for template in templates]
+
+
+def _latest(db: Session, coach_id: int) -> List[schemas.PlayerLatest]:
+    e = models.Evaluation
+    skills = [getattr(e, skill) for skill in models.SKILLS]
+    ranked = select(
+        e.player_id,
+        e.date,
+        *skills,
+        func.row_number().over(partition_by=e.player_id, order_by=(e.date.desc(), e.id.desc())).label("position"),
+        func.count().over(partition_by=e.player_id).label("evaluation_count"),
+    ).where(e.evaluator_id == coach_id).subquery()
+    rows = db.execute(
+        select(ranked).where(ranked.c.position == 1).order_by(ranked.c.player_id)
+    ).all()
+    latest = []
+    for row in rows:
+        ratings = [row._mapping[skill] for skill in models.SKILLS]
+        latest.append(schemas.PlayerLatest(
+            player_id=row.player_id,
+            date=row.date,
+            evaluation_count=row.evaluation_count,
+            skills=ratings,
+            overall=round(sum(ratings) / len(ratings), 2),
+        ))
+    return latest
+
+
+def _run(coach_id: int, loader: Callable[[Session, int], list], primary_until: Optional[float]) -> list:
+    db = SessionLocal()
+    db.info["replica"] = choose_replica(coach_id, primary_until)
+    try:
+        return loader(db, coach_id)
+    finally:
+        db.close()
+
+
+async def load(user: models.User, primary_until: Optional[float] = None) -> schemas.Bootstrap:
+    teams, players, templates, latest = await asyncio.gather(*[
+        run_in_threadpool(_run, user.id, loader, primary_until)
+        for loader in (_teams, _players, _feedback_templates, _latest)
+    ])
+    return schemas.Bootstrap(
+        user=schemas.User.model_validate(user),
+        teams=teams,
+        players=players,
+        feedback_templates=templates,
+        skills=list(models.SKILLS),
+        latest=latest,
+    )
+
+
+def encode(payload: schemas.Bootstrap) -> tuple:
+    """Return ``(json_bytes, etag)``; the weak ETag covers every content encoding."""
+    body = payload.model_dump_json().encode("utf-8")
+    return body, 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == opaque for candidate in candidates
+    )
+
+
+def compress(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=6, mtime=0)
@@ -0,0 +1,137 @@
+import base64
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import archive, invalidation, models, repository, schemas, seasons, similarity, template_index
+from .pdf_generator import RECENT_EVALUATIONS, ReportData, TrendPoint, generate_player_evaluation_pdf
+
+
+def build_evaluation(coach_id: int, evaluation: schemas.EvaluationCreate) -> models.Evaluation:
+    return models.Evaluation(
+        player_id=evaluation.player_id,
+        evaluator_id=coach_id,
+        evaluator_name=evaluation.evaluator_name,
+        evaluation_type=evaluation.evaluation_type,
+        skating=evaluation.skills.skating,
+        shooting=evaluation.skills.shooting,
+        passing=evaluation.skills.passing,
+        puck_handling=evaluation.skills.puck_handling,
+        hockey_iq=evaluation.skills.hockey_iq,
+        physicality=evaluation.skills.physicality,
+        notes=evaluation.notes,
+        strengths=evaluation.strengths,
+        areas_for_improvement=evaluation.areas_for_improvement
+    )
+
+
+def create_evaluations(
+    db: Session, coach_id: int, evaluations: List[schemas.EvaluationCreate]
+) -> List[models.Evaluation]:
+    created_evaluations = []
+    used_templates = []
+    for evaluation in evaluations:
+        if not repository.owns_player(db, evaluation.player_id, coach_id):
+            continue
+
+        db_evaluation = build_evaluation(coach_id, evaluation)
+        db.add(db_evaluation)
+        created_evaluations.append(db_evaluation)
+        used_templates.append(evaluation.feedback_template_ids)
+
+    invalidation.publish(db, coach_id, "evaluations")
+    db.commit()
+    for eval in created_evaluations:
+        db.refresh(eval)
+    for template_ids in used_templates:
+        template_index.record_use(coach_id, set(template_ids))
+    similarity.record_evaluations(coach_id, created_evaluations)
+    return created_evaluations
+
+
+def _archived_report_evaluations(
+    db: Session, player: models.Player, start: Optional[datetime], end: Optional[datetime]
+) -> List[SimpleNamespace]:
+    return [
+        SimpleNamespace(**record)
+        for record in archive.load_evaluations(db, player.coach_id, start, end)
+        if record["player_id"] == player.id
+    ]
+
+
+def player_report_data(
+    db: Session, player: models.Player, start: Optional[datetime] = None, end: Optional[datetime] = None
+) -> ReportData:
+    """Report data for evaluations in ``[start, end)``, archived seasons included."""
+    e = models.Evaluation
+    in_range = [e.player_id == player.id]
+    if start:
+        in_range.append(e.date >= start)
+    if end:
+        in_range.append(e.date < end)
+    recent = db.query(e).filter(*in_range).order_by(
+        e.date.desc(), e.id.desc()
+    ).limit(RECENT_EVALUATIONS).all()
+
+    source = select(
+        seasons.season_year_expr(e.date).label("season_year"),
+        seasons.period_expr(e.date).label("period"),
+        e.date,
+        *[getattr(e, skill) for skill in models.SKILLS],
+    ).where(*in_range, e.date.isnot(None)).subquery()
+    periods = db.execute(
+        select(
+            source.c.season_year,
+            source.c.period,
+            func.min(source.c.date),
+            func.count(),
+            *[func.sum(source.c[skill]) for skill in models.SKILLS],
+        ).group_by(source.c.season_year, source.c.period)
+    ).all()
+
+    # (season start year, period) -> [first date, count, per-skill sums]
+    buckets = {}
+    for season_year, period, first, count, *sums in periods:
+        buckets[(int(season_year), period)] = [first, count, [float(total) for total in sums]]
+    archived = _archived_report_evaluations(db, player, start, end)
+    for evaluation in archived:
+        key = (seasons.season_start_year(evaluation.date), seasons.period_for(evaluation.date))
+        bucket = buckets.setdefault(key, [evaluation.date, 0, [0.0] * len(models.SKILLS)])
+        bucket[0] = min(bucket[0], evaluation.date)
+        bucket[1] += 1
+        bucket[2] = [total + getattr(evaluation, skill) for total, skill in zip(bucket[2], models.SKILLS)]
+    if len(recent) < RECENT_EVALUATIONS:
+        # Archived seasons are older than anything still in evaluations.
+        recent += sorted(archived, key=lambda evaluation: (evaluation.date, evaluation.id), reverse=True)[
+            :RECENT_EVALUATIONS - len(recent)
+        ]
+
+    trend = []
+    totals = [0.0] * len(models.SKILLS)
+    evaluation_count = 0
+    for (season_year, period), (_, count, sums) in sorted(buckets.items(), key=lambda item: item[1][0]):
+        season = seasons.season_label(season_year)
+        trend.append(TrendPoint(f"{period.title()} {season[2:]}", count, [total / count for total in sums]))
+        totals = [total + added for total, added in zip(totals, sums)]
+        evaluation_count += count
+    return ReportData(
+        player=player,
+        recent=recent,
+        trend=trend,
+        averages=[total / evaluation_count for total in totals] if evaluation_count else totals,
+        evaluation_count=evaluation_count,
+    )
+
+
+def render_player_pdf(
+    db: Session, player: models.Player, start: Optional[datetime] = None, end: Optional[datetime] = None
+) -> bytes:
+    return generate_player_evaluation_pdf(player_report_data(db, player, start, end))
+
+
+def photo_data_url(contents: bytes, content_type: str) -> str:
+    photo_data = base64.b64encode(contents).decode('utf-8')
+    return f"data:{content_type};base64,{photo_data}"
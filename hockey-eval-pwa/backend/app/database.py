@@ -1,15 +1,93 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Optional
 import os
+import random
+import threading
+import time
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost/hockey_eval")
+REPLICA_DATABASE_URLS = [
+    url.strip() for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if url.strip()
+]
+# After a coach commits, their reads stay on the primary for this long so
+# they never see a replica that has not caught up with their own write. The
+# worker that committed remembers it, and the response carries the deadline
+# in READ_YOUR_WRITES_HEADER (Unix time) for the client to send back, so
+# whichever worker serves the next read honours it too.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+READ_YOUR_WRITES_HEADER = "X-Read-Primary-Until"
 
 engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+replica_engines = [create_engine(url) for url in REPLICA_DATABASE_URLS]
+
+
+class RoutingSession(Session):
+    """Session that sends reads to ``info["replica"]`` when one is set.
+
+    Flushes always go to the primary, so a read session that ends up
+    writing cannot write to a replica.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is not None and not self._flushing:
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+_last_write = {}
+_last_write_lock = threading.Lock()
+
+
+def mark_write(coach_id: int):
+    with _last_write_lock:
+        _last_write[coach_id] = time.monotonic()
+
+
+def choose_replica(coach_id: Optional[int] = None, primary_until: Optional[float] = None):
+    if not replica_engines:
+        return None
+    if primary_until is not None and time.time() < primary_until:
+        return None
+    if coach_id is not None:
+        with _last_write_lock:
+            written = _last_write.get(coach_id)
+        if written is not None and time.monotonic() - written < READ_YOUR_WRITES_SECONDS:
+            return None
+    return random.choice(replica_engines)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_write(session):
+    coach_id = session.info.get("coach_id")
+    if coach_id is not None and session.info.get("replica") is None:
+        mark_write(coach_id)
+        response = session.info.get("response")
+        if response is not None:
+            response.headers[READ_YOUR_WRITES_HEADER] = f"{time.time() + READ_YOUR_WRITES_SECONDS:.3f}"
+
+
+def advisory_lock(db: Session, name: str, wait: bool = False) -> bool:
+    """Take a lock on ``name`` shared by every process using the database.
+
+    Held until ``db``'s transaction ends. Returns False instead of waiting
+    when another transaction holds it, unless ``wait`` is set. Only
+    PostgreSQL has such locks; elsewhere this always succeeds.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    if wait:
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": name})
+        return True
+    return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext(:name))"), {"name": name}).scalar())
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,217 @@
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from . import forecast, models, normalization, refresh_queue
+
+# Duplicate players from repeated roster imports. Instead of comparing every
+# pair, each player is put into a few blocks and only players sharing a
+# block are scored:
+#   - the Soundex codes of their name tokens, sorted (coach-wide, so it also
+#     catches a player imported again after moving up an age group, and
+#     swapped first/last names)
+#   - age group + Soundex of the last name + first initial
+#   - age group + jersey number + first letter of the last name
+# Blocks larger than MAX_BLOCK_SIZE carry too little signal to be worth the
+# quadratic cost and are skipped. Pairs are scored on name trigram similarity
+# plus agreement of jersey number, age group and position.
+
+MAX_BLOCK_SIZE = 200
+NAME_WEIGHT = 0.7
+JERSEY_WEIGHT = 0.15
+AGE_GROUP_WEIGHT = 0.1
+POSITION_WEIGHT = 0.05
+JERSEY_CONFLICT_PENALTY = 0.1
+
+_NON_LETTERS = re.compile(r"[^a-z ]+")
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+class Candidate(NamedTuple):
+    player_id: int
+    duplicate_id: int
+    score: float
+    reasons: List[str]
+
+
+def normalize_name(name: str) -> str:
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return " ".join(_NON_LETTERS.sub(" ", ascii_name.lower()).split())
+
+
+@lru_cache(maxsize=65536)
+def soundex(word: str) -> str:
+    if not word:
+        return ""
+    code = word[0].upper()
+    previous = _SOUNDEX_CODES.get(word[0], "")
+    for letter in word[1:]:
+        digit = _SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters with the same code; vowels do.
+        if letter not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def trigrams(name: str) -> frozenset:
+    padded = f"  {name} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class _Profile(NamedTuple):
+    id: int
+    name: str
+    tokens: List[str]
+    grams: frozenset
+    jersey_number: Optional[int]
+    age_group: Optional[str]
+    position: Optional[str]
+
+
+def _profile(player: models.Player) -> _Profile:
+    name = normalize_name(player.name or "")
+    return _Profile(
+        id=player.id,
+        name=name,
+        tokens=name.split(),
+        grams=trigrams(name),
+        jersey_number=player.jersey_number,
+        age_group=(player.age_group or "").strip().lower() or None,
+        position=(player.position or "").strip().lower() or None,
+    )
+
+
+def blocking_keys(profile: _Profile) -> List[str]:
+    if not profile.tokens:
+        return []
+    first, last = profile.tokens[0], profile.tokens[-1]
+    keys = ["n:" + "".join(sorted(soundex(token) for token in profile.tokens))]
+    if profile.age_group:
+        keys.append(f"l:{profile.age_group}:{soundex(last)}:{first[0]}")
+        if profile.jersey_number is not None:
+            keys.append(f"j:{profile.age_group}:{profile.jersey_number}:{last[0]}")
+    return keys
+
+
+def _name_similarity(a: _Profile, b: _Profile) -> float:
+    shared = len(a.grams & b.grams)
+    union = len(a.grams) + len(b.grams) - shared
+    return shared / union if union else 0.0
+
+
+def _attribute_score(a: _Profile, b: _Profile) -> float:
+    value = 0.0
+    if a.jersey_number is not None and b.jersey_number is not None:
+        value += JERSEY_WEIGHT if a.jersey_number == b.jersey_number else -JERSEY_CONFLICT_PENALTY
+    if a.age_group and a.age_group == b.age_group:
+        value += AGE_GROUP_WEIGHT
+    if a.position and a.position == b.position:
+        value += POSITION_WEIGHT
+    return value
+
+
+def score(a: _Profile, b: _Profile) -> Candidate:
+    name_similarity = _name_similarity(a, b)
+    reasons = [f"name {name_similarity:.0%} similar"]
+    if a.jersey_number is not None and b.jersey_number is not None:
+        reasons.append("same jersey number" if a.jersey_number == b.jersey_number else "different jersey numbers")
+    if a.age_group and a.age_group == b.age_group:
+        reasons.append("same age group")
+    if a.position and a.position == b.position:
+        reasons.append("same position")
+    value = NAME_WEIGHT * name_similarity + _attribute_score(a, b)
+    return Candidate(a.id, b.id, round(max(value, 0.0), 3), reasons)
+
+
+def find_duplicates(players: Iterable[models.Player], min_score: float = 0.6, limit: Optional[int] = None) -> List[Candidate]:
+    """Score players that share a blocking key; best matches first."""
+    profiles = [_profile(player) for player in players]
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for position, profile in enumerate(profiles):
+        for key in blocking_keys(profile):
+            blocks[key].append(position)
+
+    seen = set()
+    candidates = []
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        for i, first in enumerate(members):
+            a = profiles[first]
+            for second in members[i + 1:]:
+                pair = (first, second) if first < second else (second, first)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                b = profiles[second]
+                # Most pairs in a block are strangers: the trigram set sizes
+                # bound the Jaccard similarity, which rules many of them out
+                # before intersecting, and reasons are only built for matches.
+                attributes = _attribute_score(a, b)
+                shorter, longer = sorted((len(a.grams), len(b.grams)))
+                if NAME_WEIGHT * shorter / max(longer, 1) + attributes < min_score:
+                    continue
+                if NAME_WEIGHT * _name_similarity(a, b) + attributes < min_score:
+                    continue
+                # Older row first: it is the natural merge target.
+                candidates.append(score(a, b) if a.id < b.id else score(b, a))
+    candidates.sort(key=lambda candidate: (-candidate.score, candidate.player_id, candidate.duplicate_id))
+    return candidates[:limit] if limit else candidates
+
+
+def coach_duplicates(db: Session, coach_id: int, min_score: float = 0.6, limit: Optional[int] = None) -> List[Candidate]:
+    p = models.Player
+    rows = db.execute(
+        select(p.id, p.name, p.jersey_number, p.age_group, p.position).where(p.coach_id == coach_id)
+    ).all()
+    return find_duplicates(rows, min_score, limit)
+
+
+def merge(db: Session, survivor: models.Player, duplicates: Sequence[models.Player]) -> int:
+    """Move the duplicates' evaluations to ``survivor`` and delete them.
+
+    Empty fields on the survivor are filled from the duplicates. Does not
+    commit. Returns the number of evaluations moved.
+    """
+    duplicate_ids = [duplicate.id for duplicate in duplicates]
+    e = models.Evaluation
+    moved = db.execute(
+        update(e).where(e.player_id.in_(duplicate_ids)).values(player_id=survivor.id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    for field in ("jersey_number", "position", "age_group", "team_id", "photo_url"):
+        if getattr(survivor, field) is None:
+            for duplicate in duplicates:
+                if getattr(duplicate, field) is not None:
+                    setattr(survivor, field, getattr(duplicate, field))
+                    break
+
+    db.query(models.PlayerForecast).filter(
+        models.PlayerForecast.player_id.in_(duplicate_ids)
+    ).delete(synchronize_session=False)
+    for duplicate in duplicates:
+        db.delete(duplicate)
+    db.flush()
+    forecast.refit(db, [survivor.id])
+    if moved:
+        # The moved evaluations now share a player with the survivor's, which
+        # changes the consensus every evaluator of that player is fitted against.
+        refresh_queue.request(db, normalization.JOB_NAME, survivor.coach_id)
+    return moved
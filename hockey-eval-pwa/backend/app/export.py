@@ -0,0 +1,184 @@
+import csv
+import gzip
+import io
+import json
+import os
+import zipfile
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import archive, models
+from .database import SessionLocal, choose_replica
+
+# Full-account export streamed straight from the database. Rows are fetched
+# CHUNK_ROWS at a time with yield_per (a server-side cursor on PostgreSQL),
+# encoded and handed to the response before the next chunk is read, so
+# memory stays flat no matter how many evaluations a coach has. Archived
+# seasons are streamed from their NDJSON files ahead of the hot rows.
+
+FORMATS = ("csv", "ndjson", "zip")
+TABLES = ("teams", "players", "evaluations")
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "zip": "application/zip",
+}
+CHUNK_ROWS = 5_000
+
+_COLUMNS = {
+    "teams": list(models.Team.__table__.columns),
+    # Photos are stored as data URLs and would dwarf everything else.
+    "players": [column for column in models.Player.__table__.columns if column.name != "photo_url"],
+    "evaluations": list(models.Evaluation.__table__.columns),
+}
+
+
+def columns(table: str) -> List[str]:
+    return [column.name for column in _COLUMNS[table]]
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _statement(table: str, coach_id: int):
+    stmt = select(*_COLUMNS[table])
+    if table == "teams":
+        return stmt.where(models.Team.coach_id == coach_id).order_by(models.Team.id)
+    if table == "players":
+        return stmt.where(models.Player.coach_id == coach_id).order_by(models.Player.id)
+    e = models.Evaluation
+    return stmt.where(e.evaluator_id == coach_id).order_by(e.date, e.id)
+
+
+def _archived_chunks(db: Session, coach_id: int) -> Iterator[list]:
+    names = columns("evaluations")
+    paths = db.execute(
+        select(models.ArchivedSeason.path).order_by(models.ArchivedSeason.starts_at)
+    ).scalars().all()
+    for path in paths:
+        try:
+            handle = gzip.open(os.path.join(path, archive.records_filename(coach_id)), "rt", encoding="utf-8")
+        except FileNotFoundError:
+            continue
+        with handle:
+            rows = []
+            for line in handle:
+                record = json.loads(line)
+                rows.append(tuple(record.get(name) for name in names))
+                if len(rows) == CHUNK_ROWS:
+                    yield rows
+                    rows = []
+            if rows:
+                yield rows
+
+
+def iter_chunks(db: Session, coach_id: int, table: str) -> Iterator[list]:
+    """Yield a coach's rows of ``table`` as lists of plain tuples."""
+    if table == "evaluations":
+        yield from _archived_chunks(db, coach_id)
+    result = db.execute(_statement(table, coach_id).execution_options(yield_per=CHUNK_ROWS))
+    for rows in result.partitions():
+        yield [tuple(_plain(value) for value in row) for row in rows]
+
+
+def _csv(db: Session, coach_id: int, table: str) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns(table))
+    for rows in iter_chunks(db, coach_id, table):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson(db: Session, coach_id: int, tables: Iterable[str]) -> Iterator[bytes]:
+    for table in tables:
+        names = columns(table)
+        for rows in iter_chunks(db, coach_id, table):
+            yield "".join(
+                json.dumps({"table": table, **dict(zip(names, row))}) + "\n" for row in rows
+            ).encode("utf-8")
+
+
+class _Sink(io.RawIOBase):
+    """Write-only stream that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip(db: Session, coach_id: int, tables: Iterable[str]) -> Iterator[bytes]:
+    # The sink is not seekable, so zipfile writes data descriptors after each
+    # member instead of going back to patch sizes into the local headers.
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for table in tables:
+            with bundle.open(f"{table}.csv", "w", force_zip64=True) as member:
+                for data in _csv(db, coach_id, table):
+                    member.write(data)
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+    yield sink.drain()
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def filename(format: str, table: Optional[str], compress: bool) -> str:
+    name = f"hockey-eval-export-{datetime.utcnow():%Y%m%d}"
+    if table and format != "zip":
+        name += f"-{table}"
+    return f"{name}.{format}" + (".gz" if compress else "")
+
+
+def stream(
+    coach_id: int,
+    format: str,
+    table: Optional[str] = None,
+    compress: bool = False,
+    primary_until: Optional[float] = None,
+) -> Iterator[bytes]:
+    """Encoded export for one coach; opens and closes its own session.
+
+    ``table`` limits the export to one table (required for CSV).
+    """
+    db = SessionLocal()
+    db.info["replica"] = choose_replica(coach_id, primary_until)
+    try:
+        tables = [table] if table else list(TABLES)
+        if format == "csv":
+            chunks = _csv(db, coach_id, table)
+        elif format == "ndjson":
+            chunks = _ndjson(db, coach_id, tables)
+        else:
+            chunks = _zip(db, coach_id, tables)
+        yield from _gzip(chunks) if compress else chunks
+    finally:
+        db.close()
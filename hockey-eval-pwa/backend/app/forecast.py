@@ -0,0 +1,209 @@
+import argparse
+import os
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from . import models, packed, refresh_queue
+from .database import SessionLocal, advisory_lock
+
+# Per-player, per-skill linear trend of rating against time, fitted for every
+# player at once. Sufficient statistics (sums of w, wx, wy, wxx, wxy) are
+# accumulated per (player, skill) with bincount, so one pass of array maths
+# solves all the regressions. A few Huber reweighting passes keep a single
+# unusually harsh or generous evaluation from tilting the trend.
+#
+# x is measured in years before the player's latest evaluation, so the
+# intercept is the fitted current level. Bands are +-BAND_Z standard errors
+# of the fitted trend at the horizon, clipped to the rating scale.
+#
+# As with season summaries, players with new evaluations arrive through
+# refresh_queue, and refreshes take an advisory lock on JOB_NAME so only one
+# of the API workers' schedulers refits at a time.
+
+JOB_NAME = "player_forecasts"
+HORIZON_DAYS = int(os.getenv("FORECAST_HORIZON_DAYS", "180"))
+MOVE_UP_RATING = float(os.getenv("FORECAST_MOVE_UP_RATING", "4.0"))
+MIN_EVALUATIONS = 3
+MIN_SPAN_DAYS = 30
+ROBUST_ITERATIONS = 3
+HUBER_K = 1.345
+BAND_Z = 1.96
+RATING_RANGE = (1.0, 5.0)
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+CHUNK_PLAYERS = 1000
+
+
+class Fit(NamedTuple):
+    player_ids: np.ndarray
+    counts: np.ndarray
+    last_dates: np.ndarray  # Unix seconds
+    valid: np.ndarray
+    slope: np.ndarray  # rating points per year, (players, skills)
+    current: np.ndarray
+    forecast: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+
+
+def _group_sum(cells: np.ndarray, values: np.ndarray, groups: int) -> np.ndarray:
+    """Sum ``(rows, skills)`` values into ``(groups, skills)`` with one bincount."""
+    skills = values.shape[1]
+    return np.bincount(cells, values.ravel(), minlength=groups * skills).reshape(groups, skills)
+
+
+def fit(player_ids: np.ndarray, dates: np.ndarray, ratings: np.ndarray, horizon_days: int = HORIZON_DAYS) -> Fit:
+    """Fit trends for ``ratings`` (evaluations x skills) grouped by player."""
+    players, index, counts = np.unique(player_ids, return_inverse=True, return_counts=True)
+    groups = len(players)
+    # Rows sorted by player keep the per-row gathers below sequential.
+    order = np.argsort(index, kind="stable")
+    index, dates, ratings = index[order], dates[order], ratings[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    last = np.maximum.reduceat(dates, starts)
+    first = np.minimum.reduceat(dates, starts)
+    cells = (index[:, None] * ratings.shape[1] + np.arange(ratings.shape[1])).ravel()
+
+    x = ((dates - last[index]) / SECONDS_PER_YEAR)[:, None]
+    y = ratings.astype(np.float64)
+    weights = np.ones_like(y)
+    for iteration in range(ROBUST_ITERATIONS + 1):
+        wx = weights * x
+        sw = _group_sum(cells, weights, groups)
+        sx = _group_sum(cells, wx, groups)
+        sy = _group_sum(cells, weights * y, groups)
+        sxx = _group_sum(cells, wx * x, groups)
+        sxy = _group_sum(cells, wx * y, groups)
+        x_mean, y_mean = sx / sw, sy / sw
+        spread = sxx - sw * x_mean ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(spread > 1e-12, (sxy - sw * x_mean * y_mean) / spread, 0.0)
+        intercept = y_mean - slope * x_mean
+        residuals = y - (intercept[index] + slope[index] * x)
+        dof = np.maximum(sw - 2, 1e-9)
+        sigma = np.sqrt(_group_sum(cells, weights * residuals ** 2, groups) / dof)
+        if iteration < ROBUST_ITERATIONS:
+            # Huber weights: full weight inside HUBER_K sigmas, 1/|r| beyond.
+            limit = HUBER_K * np.maximum(sigma[index], 1e-6)
+            weights = np.minimum(1.0, limit / np.maximum(np.abs(residuals), 1e-12))
+
+    horizon = horizon_days / 365.25
+    forecast = intercept + slope * horizon
+    with np.errstate(divide="ignore", invalid="ignore"):
+        error = sigma * np.sqrt(1 / sw + (horizon - x_mean) ** 2 / spread)
+    valid = (counts >= MIN_EVALUATIONS) & ((last - first) >= MIN_SPAN_DAYS * 86400)
+    low, high = RATING_RANGE
+    return Fit(
+        player_ids=players,
+        counts=counts,
+        last_dates=last,
+        valid=valid,
+        slope=slope,
+        current=np.clip(intercept, low, high),
+        forecast=np.clip(forecast, low, high),
+        lower=np.clip(forecast - BAND_Z * error, low, high),
+        upper=np.clip(forecast + BAND_Z * error, low, high),
+    )
+
+
+def _load(db: Session, player_ids: Optional[List[int]]) -> np.ndarray:
+    e = models.Evaluation
+    stmt = select(e.player_id, e.date, *[getattr(e, skill) for skill in models.SKILLS]).where(e.date.isnot(None))
+    if player_ids is None:
+        statements = [stmt]
+    else:
+        statements = [
+            stmt.where(e.player_id.in_(player_ids[i:i + CHUNK_PLAYERS]))
+            for i in range(0, len(player_ids), CHUNK_PLAYERS)
+        ]
+    chunks = []
+    for chunk_stmt in statements:
+        result = db.execute(chunk_stmt.execution_options(yield_per=packed.CHUNK_ROWS))
+        chunks.extend(packed.to_records(rows) for rows in result.partitions())
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=packed.RECORD_DTYPE)
+
+
+def refit(db: Session, player_ids: Optional[List[int]] = None) -> int:
+    """Replace stored forecasts for ``player_ids`` (every player when None).
+
+    Does not commit. Returns the number of players that got a forecast.
+    """
+    table = models.PlayerForecast.__table__
+    if player_ids is None:
+        db.execute(delete(table))
+    else:
+        for i in range(0, len(player_ids), CHUNK_PLAYERS):
+            db.execute(delete(table).where(table.c.player_id.in_(player_ids[i:i + CHUNK_PLAYERS])))
+    records = _load(db, player_ids)
+    if not len(records):
+        return 0
+
+    result = fit(records["player_id"].astype(np.int64), records["date"], records["skills"])
+    now = datetime.utcnow()
+    rows = [
+        {
+            "player_id": int(result.player_ids[i]),
+            "skill": skill,
+            "slope_per_year": float(result.slope[i, j]),
+            "current": float(result.current[i, j]),
+            "forecast": float(result.forecast[i, j]),
+            "lower": float(result.lower[i, j]),
+            "upper": float(result.upper[i, j]),
+            "horizon_days": HORIZON_DAYS,
+            "evaluation_count": int(result.counts[i]),
+            "last_evaluation_at": datetime(1970, 1, 1) + timedelta(seconds=int(result.last_dates[i])),
+            "fitted_at": now,
+        }
+        for i in np.flatnonzero(result.valid)
+        for j, skill in enumerate(models.SKILLS)
+    ]
+    if rows:
+        db.execute(insert(table), rows)
+    return int(result.valid.sum())
+
+
+def refresh(db: Session, full: bool = False) -> int:
+    """Refit players with evaluations queued since the last run. Returns players forecast."""
+    if not advisory_lock(db, JOB_NAME):
+        return 0
+    mark = models.RefreshWatermark.for_job(db, JOB_NAME)
+    queued = refresh_queue.take(db, JOB_NAME)
+    player_ids = None if full else sorted({player_id for _, player_id, _ in queued})
+    forecast_count = refit(db, player_ids) if player_ids is None or player_ids else 0
+
+    mark.refreshed_at = datetime.utcnow()
+    db.commit()
+    return forecast_count
+
+
+def refresh_coach(db: Session, coach_id: int) -> int:
+    """Refit every player of one coach now. Returns players forecast."""
+    advisory_lock(db, JOB_NAME, wait=True)
+    refresh_queue.take(db, JOB_NAME, coach_id)
+    player_ids = list(db.execute(select(models.Player.id).where(models.Player.coach_id == coach_id)).scalars())
+    forecast_count = refit(db, player_ids) if player_ids else 0
+    db.commit()
+    return forecast_count
+
+
+def refresh_pending():
+    db = SessionLocal()
+    try:
+        refresh(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refit player progression forecasts")
+    parser.add_argument("--full", action="store_true", help="refit every player")
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        count = refresh(db, full=args.full)
+    finally:
+        db.close()
+    print(f"Forecast {count} player(s)")
@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import re
+import select
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from .database import RoutingSession, engine, mark_write
+
+# Cross-worker cache invalidation. Write handlers call publish(db, coach_id,
+# kind) before committing; the events ride on the session and are delivered
+# when it commits (and dropped if it rolls back):
+#   - in this process, synchronously from after_commit, so the writing worker
+#     never serves its own stale cache;
+#   - to other workers through PostgreSQL NOTIFY, sent inside the committing
+#     transaction so PostgreSQL delivers it exactly when the write becomes
+#     visible. Each API worker runs a listener thread (start()/stop()) that
+#     applies events from other processes.
+# Without PostgreSQL (SQLite, single-worker test runs) only the in-process
+# delivery happens.
+#
+# Caches register an eviction callback per kind with subscribe(); a callback
+# is called with a coach id, or None to drop everything, which happens when
+# the listener reconnects and may have missed events. remote_only callbacks
+# are skipped for this process's own events, for caches that the writing
+# worker patches in place instead of dropping.
+#
+# Every write route publishes the kinds it changed, whether or not anything
+# caches them today; events of a kind nobody subscribed to are simply not
+# dispatched, so a cache only subscribes to what it holds.
+
+CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache_invalidation")
+POLL_SECONDS = 1.0
+RECONNECT_SECONDS = 5.0
+LAG_SAMPLES = 1000
+
+KINDS = ("teams", "players", "evaluations", "templates")
+
+ORIGIN = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+if not re.fullmatch(r"[a-z_][a-z0-9_]*", CHANNEL):
+    raise ValueError(f"CACHE_INVALIDATION_CHANNEL must be a plain identifier, got {CHANNEL!r}")
+
+logger = logging.getLogger(__name__)
+
+_PENDING = "invalidations"
+
+_handlers: Dict[str, List[Tuple[Callable[[Optional[int]], None], bool]]] = defaultdict(list)
+
+_metrics_lock = threading.Lock()
+_counts = {"published": 0, "received": 0, "reconnects": 0}
+_lags: deque = deque(maxlen=LAG_SAMPLES)
+
+
+def uses_notify() -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def subscribe(kind: str, evict: Callable[[Optional[int]], None], remote_only: bool = False):
+    if kind not in KINDS:
+        raise ValueError(f"Unknown invalidation kind {kind!r}")
+    _handlers[kind].append((evict, remote_only))
+
+
+def publish(db: Session, coach_id: int, *kinds: str):
+    """Invalidate ``kinds`` of ``coach_id``'s cached data when ``db`` commits."""
+    for kind in kinds:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown invalidation kind {kind!r}")
+    db.info.setdefault(_PENDING, {}).setdefault(coach_id, set()).update(kinds)
+
+
+def _dispatch(coach_id: Optional[int], kinds, remote: bool):
+    for kind in kinds:
+        for evict, remote_only in _handlers.get(kind, ()):
+            if remote_only and not remote:
+                continue
+            try:
+                evict(coach_id)
+            except Exception:
+                logger.exception("Evicting %s cache for coach %s failed", kind, coach_id)
+
+
+def reset():
+    """Drop every subscribed cache."""
+    _dispatch(None, KINDS, remote=True)
+
+
+@event.listens_for(RoutingSession, "before_commit")
+def _notify(session):
+    pending = session.info.get(_PENDING)
+    if not pending or not uses_notify():
+        return
+    sent_at = time.time()
+    for coach_id, kinds in pending.items():
+        payload = json.dumps({"o": ORIGIN, "c": coach_id, "k": sorted(kinds), "t": sent_at})
+        session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _apply_local(session):
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    with _metrics_lock:
+        _counts["published"] += len(pending)
+    for coach_id, kinds in pending.items():
+        _dispatch(coach_id, kinds, remote=False)
+
+
+@event.listens_for(RoutingSession, "after_soft_rollback")
+def _discard(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING, None)
+
+
+def receive(payload: str):
+    """Apply one NOTIFY payload; this process's own events are ignored."""
+    try:
+        message = json.loads(payload)
+        origin, coach_id, kinds, sent_at = message["o"], message["c"], message["k"], message["t"]
+    except (ValueError, KeyError, TypeError):
+        logger.warning("Ignoring malformed invalidation payload %r", payload)
+        return
+    if origin == ORIGIN:
+        return
+    with _metrics_lock:
+        _counts["received"] += 1
+        _lags.append(max(time.time() - sent_at, 0.0))
+    # The coach wrote through another worker; keep their reads on the
+    # primary here as well.
+    mark_write(coach_id)
+    _dispatch(coach_id, kinds, remote=True)
+
+
+def _notifications(connection, timeout: float) -> Iterator[str]:
+    if hasattr(connection, "poll"):  # psycopg2
+        if select.select([connection], [], [], timeout)[0]:
+            connection.poll()
+            while connection.notifies:
+                yield connection.notifies.pop(0).payload
+    else:  # psycopg 3
+        for notify in connection.notifies(timeout=timeout):
+            yield notify.payload
+
+
+class Listener:
+    """LISTENs on CHANNEL from a dedicated connection on a daemon thread."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+        self.connected = False
+
+    def start(self):
+        if self._thread is not None or not uses_notify():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        listened_before = False
+        while not self._stop.is_set():
+            try:
+                raw = engine.raw_connection()
+            except Exception:
+                logger.warning("Cache invalidation listener cannot connect; retrying", exc_info=True)
+                self._stop.wait(RECONNECT_SECONDS)
+                continue
+            # Kept out of the pool: it sits in autocommit mode with a LISTEN on it.
+            raw.detach()
+            try:
+                connection = raw.driver_connection
+                connection.autocommit = True
+                connection.cursor().execute(f"LISTEN {CHANNEL}")
+                self.connected = True
+                if listened_before:
+                    # Events sent while disconnected are lost for good.
+                    with _metrics_lock:
+                        _counts["reconnects"] += 1
+                    reset()
+                listened_before = True
+                while not self._stop.is_set():
+                    for payload in _notifications(connection, POLL_SECONDS):
+                        receive(payload)
+            except Exception:
+                logger.exception("Cache invalidation listener failed; reconnecting")
+                self._stop.wait(RECONNECT_SECONDS)
+            finally:
+                self.connected = False
+                try:
+                    raw.close()
+                except Exception:
+                    pass
+
+
+listener = Listener()
+
+
+def start():
+    listener.start()
+
+
+def stop():
+    listener.stop()
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def metrics() -> dict:
+    with _metrics_lock:
+        counts = dict(_counts)
+        last = _lags[-1] if _lags else None
+        lags = sorted(_lags)
+    lag_ms = None
+    if lags:
+        lag_ms = {
+            "last": round(last * 1000, 2),
+            "mean": round(sum(lags) / len(lags) * 1000, 2),
+            "p50": round(_percentile(lags, 0.5) * 1000, 2),
+            "p95": round(_percentile(lags, 0.95) * 1000, 2),
+            "max": round(lags[-1] * 1000, 2),
+            "samples": len(lags),
+        }
+    return {
+        "transport": "postgres" if uses_notify() else "in-process",
+        "origin": ORIGIN,
+        "listening": listener.connected,
+        **counts,
+        "lag_ms": lag_ms,
+    }
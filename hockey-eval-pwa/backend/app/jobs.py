@@ -0,0 +1,206 @@
+import base64
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, NamedTuple, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from . import crud, forecast, invalidation, models, normalization, repository, schemas, summaries, template_index
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+JOB_TIMEOUT = timedelta(seconds=int(os.getenv("JOB_TIMEOUT_SECONDS", "600")))
+RETRY_BASE_SECONDS = 5
+
+
+class JobResult(NamedTuple):
+    content: bytes
+    media_type: str
+    filename: Optional[str] = None
+
+
+Handler = Callable[[Session, models.Job, dict], JobResult]
+HANDLERS: Dict[str, Handler] = {}
+
+
+def handler(kind: str):
+    def register(func: Handler) -> Handler:
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def _json_result(data) -> JobResult:
+    return JobResult(json.dumps(data).encode(), "application/json")
+
+
+def _coach_player(db: Session, job: models.Job, player_id: int) -> models.Player:
+    player = repository.player_for_coach(db, player_id, job.coach_id)
+    if not player:
+        raise LookupError("Player not found")
+    return player
+
+
+@handler("player_pdf")
+def _player_pdf(db: Session, job: models.Job, payload: dict) -> JobResult:
+    player = _coach_player(db, job, payload["player_id"])
+    start, end = (payload.get(key) for key in ("start", "end"))
+    return JobResult(
+        crud.render_player_pdf(
+            db, player,
+            datetime.fromisoformat(start) if start else None,
+            datetime.fromisoformat(end) if end else None,
+        ),
+        "application/pdf",
+        f"player_{player.id}_evaluation.pdf",
+    )
+
+
+@handler("player_photo")
+def _player_photo(db: Session, job: models.Job, payload: dict) -> JobResult:
+    player = _coach_player(db, job, payload["player_id"])
+    contents = base64.b64decode(payload["data"])
+    player.photo_url = crud.photo_data_url(contents, payload["content_type"])
+    invalidation.publish(db, job.coach_id, "players")
+    db.commit()
+    return _json_result({"photo_url": player.photo_url})
+
+
+@handler("bulk_evaluations")
+def _bulk_evaluations(db: Session, job: models.Job, payload: dict) -> JobResult:
+    evaluations = [schemas.EvaluationCreate(**item) for item in payload["evaluations"]]
+    created = crud.create_evaluations(db, job.coach_id, evaluations)
+    if created:
+        try:
+            normalization.refresh_pending()
+            template_index.flush_pending()
+        except Exception:
+            logger.exception("Post-import refresh after job %s failed", job.id)
+    return _json_result([
+        schemas.Evaluation.model_validate(evaluation).model_dump(mode="json")
+        for evaluation in created
+    ])
+
+
+@handler("analytics_refresh")
+def _analytics_refresh(db: Session, job: models.Job, payload: dict) -> JobResult:
+    # Only the requesting coach's data; the scheduled refreshes cover everyone.
+    return _json_result({
+        "normalization_refit": normalization.refresh_account(db, job.coach_id),
+        "season_partitions_rebuilt": summaries.refresh_coach(db, job.coach_id),
+        "players_forecast": forecast.refresh_coach(db, job.coach_id),
+    })
+
+
+def enqueue(db: Session, coach_id: int, kind: str, payload: dict, max_attempts: int = 3) -> models.Job:
+    job = models.Job(
+        coach_id=coach_id,
+        kind=kind,
+        status=QUEUED,
+        payload=json.dumps(payload),
+        max_attempts=max_attempts,
+        run_after=datetime.utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_next(db: Session, worker_id: str) -> Optional[int]:
+    """Atomically move the oldest runnable job to running.
+
+    Postgres skips rows locked by other workers; elsewhere the conditional
+    UPDATE makes sure only one worker wins a given job.
+    """
+    while True:
+        now = datetime.utcnow()
+        job_id = db.execute(
+            select(models.Job.id).where(
+                models.Job.status == QUEUED,
+                models.Job.run_after <= now
+            ).order_by(models.Job.id).limit(1).with_for_update(skip_locked=True)
+        ).scalar()
+        if job_id is None:
+            db.rollback()
+            return None
+        claimed = db.execute(
+            update(models.Job).where(
+                models.Job.id == job_id,
+                models.Job.status == QUEUED
+            ).values(
+                status=RUNNING,
+                locked_by=worker_id,
+                started_at=now,
+                attempts=models.Job.attempts + 1
+            )
+        ).rowcount
+        db.commit()
+        if claimed:
+            return job_id
+
+
+def run_job(db: Session, job_id: int):
+    job = db.get(models.Job, job_id)
+    func = HANDLERS.get(job.kind)
+    try:
+        if func is None:
+            raise LookupError(f"Unknown job kind {job.kind}")
+        result = func(db, job, json.loads(job.payload))
+    except Exception as exc:
+        db.rollback()
+        job = db.get(models.Job, job_id)
+        job.error = f"{type(exc).__name__}: {exc}"
+        job.locked_by = None
+        if job.attempts < job.max_attempts:
+            job.status = QUEUED
+            job.run_after = datetime.utcnow() + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+        else:
+            job.status = FAILED
+            job.finished_at = datetime.utcnow()
+        db.commit()
+        logger.warning("Job %s (%s) attempt %s failed: %s", job.id, job.kind, job.attempts, job.error)
+        return
+
+    job.result = result.content
+    job.result_media_type = result.media_type
+    job.result_filename = result.filename
+    job.status = SUCCEEDED
+    job.error = None
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+
+def requeue_stale(db: Session) -> int:
+    """Return jobs whose worker died mid-run to the queue, or fail them."""
+    cutoff = datetime.utcnow() - JOB_TIMEOUT
+    stale = (models.Job.status == RUNNING) & (models.Job.started_at < cutoff)
+    failed = db.execute(
+        update(models.Job).where(stale, models.Job.attempts >= models.Job.max_attempts).values(
+            status=FAILED, error="Timed out", finished_at=datetime.utcnow(), locked_by=None
+        )
+    ).rowcount
+    requeued = db.execute(
+        update(models.Job).where(stale).values(status=QUEUED, run_after=datetime.utcnow(), locked_by=None)
+    ).rowcount
+    db.commit()
+    return failed + requeued
+
+
+def run_pending(db: Session, worker_id: str, limit: Optional[int] = None) -> int:
+    processed = 0
+    while limit is None or processed < limit:
+        job_id = claim_next(db, worker_id)
+        if job_id is None:
+            break
+        run_job(db, job_id)
+        processed += 1
+    return processed
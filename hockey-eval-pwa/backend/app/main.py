@@ -1,19 +1,45 @@
-from fastapi import FastAPI, HTTPException, Depends, File, UploadFile, Response
+from fastapi import FastAPI, HTTPException, Depends, File, UploadFile, Query, Request, Response, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy import case
+from contextlib import asynccontextmanager
 from typing import List, Optional
-from datetime import timedelta
+from datetime import datetime, timedelta
 import base64
 import os
 
-from . import models, schemas, auth
-from .database import engine, get_db
-from .pdf_generator import generate_player_evaluation_pdf
+import numpy as np
+
+from . import models, schemas, archive, auth, bootstrap, crud, dedupe, export, forecast, invalidation, jobs, normalization, packed, ratelimit, repository, seasons, similarity, summaries, team_balancer, template_index
+from .database import READ_YOUR_WRITES_HEADER, engine, get_db
+from .scheduler import refreshed_at, scheduler
 
 models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Hockey Evaluation API")
+SUMMARY_REFRESH_SECONDS = float(os.getenv("SUMMARY_REFRESH_SECONDS", "60"))
+TEMPLATE_USAGE_FLUSH_SECONDS = float(os.getenv("TEMPLATE_USAGE_FLUSH_SECONDS", "30"))
+PARTITION_MAINTENANCE_SECONDS = float(os.getenv("PARTITION_MAINTENANCE_SECONDS", "86400"))
+FORECAST_REFRESH_SECONDS = float(os.getenv("FORECAST_REFRESH_SECONDS", "86400"))
+
+scheduler.add_job("season_summaries", summaries.refresh_pending, SUMMARY_REFRESH_SECONDS, refreshed_at(summaries.JOB_NAME))
+scheduler.add_job("template_usage", template_index.flush_pending, TEMPLATE_USAGE_FLUSH_SECONDS)
+scheduler.add_job("evaluation_partitions", archive.ensure_partitions_pending, PARTITION_MAINTENANCE_SECONDS)
+scheduler.add_job("player_forecasts", forecast.refresh_pending, FORECAST_REFRESH_SECONDS, refreshed_at(forecast.JOB_NAME))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(archive.ensure_partitions_pending)
+    scheduler.start()
+    invalidation.start()
+    yield
+    invalidation.stop()
+    scheduler.stop()
+    template_index.flush_pending()
+
+app = FastAPI(title="Hockey Evaluation API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,20 +47,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[READ_YOUR_WRITES_HEADER],
 )
 
 @app.get("/healthz")
 async def healthz():
     return {"status": "ok"}
 
+@app.get("/metrics/invalidation", response_model=schemas.InvalidationMetrics, dependencies=[Depends(ratelimit.limit())])
+async def get_invalidation_metrics(current_user: models.User = Depends(auth.get_current_active_user)):
+    return invalidation.metrics()
+
 @app.post("/api/auth/register", response_model=schemas.User)
 async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if db_user:
+    if repository.user_by_email(db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    db_user = db.query(models.User).filter(models.User.username == user.username).first()
-    if db_user:
+    if repository.user_by_username(db, user.username):
         raise HTTPException(status_code=400, detail="Username already taken")
     
     hashed_password = models.User.get_password_hash(user.password)
@@ -51,7 +80,7 @@ async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
 
 @app.post("/api/auth/login", response_model=schemas.Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.username == form_data.username).first()
+    user = repository.user_by_username(db, form_data.username)
     if not user or not user.verify_password(form_data.password):
         raise HTTPException(
             status_code=401,
@@ -65,19 +94,35 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
-@app.get("/api/auth/me", response_model=schemas.User)
+@app.get("/api/auth/me", response_model=schemas.User, dependencies=[Depends(ratelimit.limit())])
 async def read_users_me(current_user: models.User = Depends(auth.get_current_active_user)):
     return current_user
 
-@app.get("/api/teams", response_model=List[schemas.Team])
+@app.get("/api/bootstrap", response_model=schemas.Bootstrap, dependencies=[Depends(ratelimit.limit(cost=3))])
+async def get_bootstrap(
+    request: Request,
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    payload = await bootstrap.load(current_user, auth.primary_until(request))
+    body, etag = bootstrap.encode(payload)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    if bootstrap.etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = bootstrap.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/api/teams", response_model=List[schemas.Team], dependencies=[Depends(ratelimit.limit())])
 async def get_teams(
     current_user: models.User = Depends(auth.get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(auth.get_read_db)
 ):
     teams = db.query(models.Team).filter(models.Team.coach_id == current_user.id).all()
     return teams
 
-@app.post("/api/teams", response_model=schemas.Team)
+@app.post("/api/teams", response_model=schemas.Team, dependencies=[Depends(ratelimit.limit())])
 async def create_team(
     team: schemas.TeamCreate,
     current_user: models.User = Depends(auth.get_current_active_user),
@@ -85,16 +130,85 @@ async def create_team(
 ):
     db_team = models.Team(**team.dict(), coach_id=current_user.id)
     db.add(db_team)
+    invalidation.publish(db, current_user.id, "teams")
     db.commit()
     db.refresh(db_team)
     return db_team
 
-@app.get("/api/players", response_model=List[schemas.Player])
+@app.post("/api/teams/balance", response_model=schemas.TeamBalanceResult, dependencies=[Depends(ratelimit.limit(cost=5, heavy=True))])
+async def balance_teams(
+    request: schemas.TeamBalanceRequest,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    player_ids = list(dict.fromkeys(request.player_ids))
+    players = {
+        player.id: player
+        for player in db.query(models.Player).filter(
+            models.Player.id.in_(player_ids),
+            models.Player.coach_id == current_user.id
+        )
+    }
+    missing = [player_id for player_id in player_ids if player_id not in players]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Players not found: {missing}")
+    if not 2 <= request.team_count <= len(player_ids):
+        raise HTTPException(status_code=400, detail="team_count must be between 2 and the number of players")
+    
+    index = similarity.get_index(db, current_user.id)
+    rated = [player_id for player_id in player_ids if player_id in index.rows]
+    unrated = [player_id for player_id in player_ids if player_id not in index.rows]
+    skills = np.empty((len(player_ids), len(models.SKILLS)))
+    if rated:
+        skills[:len(rated)] = index.latest[[index.rows[player_id] for player_id in rated]]
+    # Players without an evaluation count as an average member of the pool.
+    skills[len(rated):] = skills[:len(rated)].mean(axis=0) if rated else 3
+    ordered = rated + unrated
+    row_of = {player_id: row for row, player_id in enumerate(ordered)}
+    positions = [(players[player_id].position or "").strip().lower() for player_id in ordered]
+    keep_apart = [
+        (row_of[pair[0]], row_of[pair[1]])
+        for pair in request.keep_apart
+        if len(pair) == 2 and pair[0] in row_of and pair[1] in row_of
+    ]
+    
+    result = await run_in_threadpool(
+        team_balancer.balance,
+        skills, positions, request.team_count,
+        time_budget_ms=min(max(request.time_budget_ms, 0), 5000),
+        balance_positions=request.balance_positions,
+        keep_apart=keep_apart,
+        seed=request.seed
+    )
+    teams = []
+    for team in range(request.team_count):
+        rows = np.flatnonzero(result.teams == team)
+        averages = skills[rows].mean(axis=0)
+        position_counts = {}
+        for row in rows:
+            label = players[ordered[row]].position or "Unknown"
+            position_counts[label] = position_counts.get(label, 0) + 1
+        teams.append(schemas.BalancedTeam(
+            index=team,
+            player_ids=[ordered[row] for row in rows],
+            positions=position_counts,
+            average_skills=dict(zip(models.SKILLS, np.round(averages, 2).tolist())),
+            average_overall=round(float(averages.mean()), 3)
+        ))
+    return schemas.TeamBalanceResult(
+        teams=teams,
+        score=round(result.score, 5),
+        iterations=result.iterations,
+        keep_apart_violations=result.violations,
+        unrated_player_ids=unrated
+    )
+
+@app.get("/api/players", response_model=List[schemas.Player], dependencies=[Depends(ratelimit.limit())])
 async def get_players(
     team_id: Optional[int] = None,
     search: Optional[str] = None,
     current_user: models.User = Depends(auth.get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(auth.get_read_db)
 ):
     query = db.query(models.Player).filter(models.Player.coach_id == current_user.id)
     if team_id:
@@ -104,7 +218,33 @@ async def get_players(
     players = query.all()
     return players
 
-@app.post("/api/players", response_model=schemas.Player)
+@app.get("/api/players/duplicates", response_model=List[schemas.DuplicateCandidate], dependencies=[Depends(ratelimit.limit(cost=5, heavy=True))])
+async def get_duplicate_players(
+    min_score: float = 0.6,
+    limit: int = 100,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(auth.get_read_db)
+):
+    if not 0 <= min_score <= 1:
+        raise HTTPException(status_code=400, detail="min_score must be between 0 and 1")
+    candidates = await run_in_threadpool(dedupe.coach_duplicates, db, current_user.id, min_score, max(1, min(limit, 1000)))
+    ids = {candidate.player_id for candidate in candidates} | {candidate.duplicate_id for candidate in candidates}
+    p = models.Player
+    players = {
+        row.id: schemas.PlayerSummary.model_validate(row)
+        for row in db.query(p.id, p.name, p.jersey_number, p.position, p.age_group, p.team_id).filter(p.id.in_(ids))
+    } if ids else {}
+    return [
+        schemas.DuplicateCandidate(
+            player=players[candidate.player_id],
+            duplicate=players[candidate.duplicate_id],
+            score=candidate.score,
+            reasons=candidate.reasons
+        )
+        for candidate in candidates
+    ]
+
+@app.post("/api/players", response_model=schemas.Player, dependencies=[Depends(ratelimit.limit())])
 async def create_player(
     player: schemas.PlayerCreate,
     current_user: models.User = Depends(auth.get_current_active_user),
@@ -112,186 +252,316 @@ async def create_player(
 ):
     db_player = models.Player(**player.dict(), coach_id=current_user.id)
     db.add(db_player)
+    invalidation.publish(db, current_user.id, "players")
     db.commit()
     db.refresh(db_player)
     return db_player
 
-@app.get("/api/players/{player_id}", response_model=schemas.PlayerWithEvaluations)
+@app.get("/api/players/{player_id}", response_model=schemas.PlayerWithEvaluations, dependencies=[Depends(ratelimit.limit())])
 async def get_player(
     player_id: int,
     current_user: models.User = Depends(auth.get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(auth.get_read_db)
 ):
-    player = db.query(models.Player).filter(
-        models.Player.id == player_id,
-        models.Player.coach_id == current_user.id
-    ).first()
+    player = repository.player_for_coach(db, player_id, current_user.id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     return player
 
-@app.put("/api/players/{player_id}", response_model=schemas.Player)
+@app.put("/api/players/{player_id}", response_model=schemas.Player, dependencies=[Depends(ratelimit.limit())])
 async def update_player(
     player_id: int,
     player: schemas.PlayerUpdate,
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    db_player = db.query(models.Player).filter(
-        models.Player.id == player_id,
-        models.Player.coach_id == current_user.id
-    ).first()
+    db_player = repository.player_for_coach(db, player_id, current_user.id)
     if not db_player:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    for key, value in player.dict(exclude_unset=True).items():
+    changes = player.dict(exclude_unset=True)
+    for key, value in changes.items():
         setattr(db_player, key, value)
+    if "team_id" in changes or "age_group" in changes:
+        summaries.request_refresh(db, current_user.id)
+    invalidation.publish(db, current_user.id, "players")
     
     db.commit()
     db.refresh(db_player)
     return db_player
 
-@app.delete("/api/players/{player_id}")
+@app.delete("/api/players/{player_id}", dependencies=[Depends(ratelimit.limit())])
 async def delete_player(
     player_id: int,
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    db_player = db.query(models.Player).filter(
-        models.Player.id == player_id,
-        models.Player.coach_id == current_user.id
-    ).first()
+    db_player = repository.player_for_coach(db, player_id, current_user.id)
     if not db_player:
         raise HTTPException(status_code=404, detail="Player not found")
     
+    db.query(models.PlayerForecast).filter(models.PlayerForecast.player_id == player_id).delete()
     db.delete(db_player)
+    summaries.request_refresh(db, current_user.id)
+    invalidation.publish(db, current_user.id, "players")
     db.commit()
     return {"message": "Player deleted"}
 
-@app.post("/api/players/{player_id}/photo")
+@app.post("/api/players/{player_id}/merge", response_model=schemas.PlayerMergeResult, dependencies=[Depends(ratelimit.limit(cost=2))])
+async def merge_players(
+    player_id: int,
+    request: schemas.PlayerMergeRequest,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    duplicate_ids = sorted(set(request.duplicate_ids))
+    if not duplicate_ids or player_id in duplicate_ids:
+        raise HTTPException(status_code=400, detail="duplicate_ids must list other players to merge")
+    
+    players = {
+        player.id: player
+        for player in db.query(models.Player).filter(
+            models.Player.id.in_([player_id] + duplicate_ids),
+            models.Player.coach_id == current_user.id
+        )
+    }
+    if len(players) != len(duplicate_ids) + 1:
+        raise HTTPException(status_code=404, detail="Player not found")
+    
+    survivor = players[player_id]
+    moved = dedupe.merge(db, survivor, [players[i] for i in duplicate_ids])
+    summaries.request_refresh(db, current_user.id)
+    invalidation.publish(db, current_user.id, "players")
+    db.commit()
+    db.refresh(survivor)
+    return schemas.PlayerMergeResult(
+        player=survivor,
+        merged_player_ids=duplicate_ids,
+        evaluations_moved=moved
+    )
+
+@app.get("/api/players/{player_id}/forecast", response_model=schemas.PlayerForecast, dependencies=[Depends(ratelimit.limit())])
+async def get_player_forecast(
+    player_id: int,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(auth.get_read_db)
+):
+    if not repository.owns_player(db, player_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Player not found")
+    
+    rows = {
+        row.skill: row
+        for row in db.query(models.PlayerForecast).filter(models.PlayerForecast.player_id == player_id)
+    }
+    if not rows:
+        raise HTTPException(status_code=404, detail="Forecast not available yet")
+    
+    skills = [rows[skill] for skill in models.SKILLS if skill in rows]
+    projected_overall = sum(row.forecast for row in skills) / len(skills)
+    return schemas.PlayerForecast(
+        player_id=player_id,
+        horizon_days=skills[0].horizon_days,
+        evaluation_count=skills[0].evaluation_count,
+        last_evaluation_at=skills[0].last_evaluation_at,
+        fitted_at=skills[0].fitted_at,
+        projected_overall=round(projected_overall, 2),
+        on_track=projected_overall >= forecast.MOVE_UP_RATING,
+        skills=[
+            schemas.SkillForecast(
+                skill=row.skill,
+                slope_per_year=round(row.slope_per_year, 3),
+                current=round(row.current, 2),
+                forecast=round(row.forecast, 2),
+                lower=round(row.lower, 2),
+                upper=round(row.upper, 2)
+            )
+            for row in skills
+        ]
+    )
+
+@app.get("/api/players/{player_id}/similar", response_model=List[schemas.SimilarPlayer], dependencies=[Depends(ratelimit.limit())])
+async def get_similar_players(
+    player_id: int,
+    k: int = Query(5, ge=1, le=50),
+    basis: str = "latest",
+    same_age_group: bool = False,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    player = repository.player_for_coach(db, player_id, current_user.id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    if basis not in similarity.BASES:
+        raise HTTPException(status_code=400, detail=f"basis must be one of {', '.join(similarity.BASES)}")
+    
+    index = similarity.get_index(db, current_user.id)
+    age_group = player.age_group if same_age_group else None
+    nearest = index.nearest(player_id, k, basis, age_group)
+    players = {
+        p.id: p
+        for p in db.query(models.Player).filter(models.Player.id.in_([pid for pid, _, _ in nearest]))
+    }
+    return [
+        schemas.SimilarPlayer(
+            player_id=pid,
+            name=players[pid].name,
+            position=players[pid].position,
+            age_group=players[pid].age_group,
+            team_id=players[pid].team_id,
+            distance=round(distance, 3),
+            skills=dict(zip(models.SKILLS, np.round(vector, 2).tolist()))
+        )
+        for pid, distance, vector in nearest
+        if pid in players
+    ]
+
+@app.post("/api/players/{player_id}/photo", dependencies=[Depends(ratelimit.limit(cost=5, heavy=True))])
 async def upload_player_photo(
     player_id: int,
     file: UploadFile = File(...),
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    db_player = db.query(models.Player).filter(
-        models.Player.id == player_id,
-        models.Player.coach_id == current_user.id
-    ).first()
+    db_player = repository.player_for_coach(db, player_id, current_user.id)
     if not db_player:
         raise HTTPException(status_code=404, detail="Player not found")
     
     contents = await file.read()
-    photo_data = base64.b64encode(contents).decode('utf-8')
-    photo_url = f"data:{file.content_type};base64,{photo_data}"
+    photo_url = await run_in_threadpool(crud.photo_data_url, contents, file.content_type)
     
     db_player.photo_url = photo_url
+    invalidation.publish(db, current_user.id, "players")
     db.commit()
     
     return {"photo_url": photo_url}
 
-@app.get("/api/evaluations", response_model=List[schemas.Evaluation])
+@app.post("/api/players/{player_id}/photo/async", response_model=schemas.Job, status_code=202, dependencies=[Depends(ratelimit.limit(cost=2))])
+async def submit_player_photo(
+    player_id: int,
+    file: UploadFile = File(...),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    if not repository.owns_player(db, player_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Player not found")
+    
+    contents = await file.read()
+    return jobs.enqueue(db, current_user.id, "player_photo", {
+        "player_id": player_id,
+        "content_type": file.content_type,
+        "data": base64.b64encode(contents).decode('utf-8'),
+    })
+
+@app.get("/api/evaluations", response_model=List[schemas.Evaluation], dependencies=[Depends(ratelimit.limit())])
 async def get_evaluations(
     player_id: Optional[int] = None,
     current_user: models.User = Depends(auth.get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(auth.get_read_db)
+):
+    return repository.evaluations_for_coach(db, current_user.id, player_id)
+
+@app.get("/api/evaluations/packed", dependencies=[Depends(ratelimit.limit())])
+async def get_packed_evaluations(
+    player_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(auth.get_read_db)
+):
+    records = packed.load_skill_records(db, current_user.id, player_id, start, end)
+    return Response(
+        content=records.tobytes(),
+        media_type=packed.MEDIA_TYPE,
+        headers={
+            "X-Record-Format": packed.RECORD_FORMAT,
+            "X-Record-Count": str(len(records)),
+            "X-Skills": ",".join(models.SKILLS),
+        }
+    )
+
+@app.get("/api/export", dependencies=[Depends(ratelimit.limit(cost=10, heavy=True))])
+async def export_account(
+    request: Request,
+    format: str = "zip",
+    table: Optional[str] = None,
+    compress: bool = False,
+    current_user: models.User = Depends(auth.get_current_active_user)
 ):
-    query = db.query(models.Evaluation).filter(models.Evaluation.evaluator_id == current_user.id)
-    if player_id:
-        query = query.filter(models.Evaluation.player_id == player_id)
-    evaluations = query.order_by(models.Evaluation.date.desc()).all()
-    return evaluations
+    if format not in export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(export.FORMATS)}")
+    if table is not None and table not in export.TABLES:
+        raise HTTPException(status_code=400, detail=f"table must be one of {', '.join(export.TABLES)}")
+    if format == "zip" and compress:
+        raise HTTPException(status_code=400, detail="zip exports are already compressed")
+    if format == "csv" and table is None:
+        table = "evaluations"
+    
+    return StreamingResponse(
+        export.stream(current_user.id, format, table, compress, auth.primary_until(request)),
+        media_type="application/gzip" if compress else export.MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f"attachment; filename={export.filename(format, table, compress)}"
+        }
+    )
 
-@app.post("/api/evaluations", response_model=schemas.Evaluation)
+@app.post("/api/evaluations", response_model=schemas.Evaluation, dependencies=[Depends(ratelimit.limit())])
 async def create_evaluation(
     evaluation: schemas.EvaluationCreate,
+    background_tasks: BackgroundTasks,
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    player = db.query(models.Player).filter(
-        models.Player.id == evaluation.player_id,
-        models.Player.coach_id == current_user.id
-    ).first()
-    if not player:
+    if not repository.owns_player(db, evaluation.player_id, current_user.id):
         raise HTTPException(status_code=404, detail="Player not found")
     
-    db_evaluation = models.Evaluation(
-        player_id=evaluation.player_id,
-        evaluator_id=current_user.id,
-        evaluator_name=evaluation.evaluator_name,
-        evaluation_type=evaluation.evaluation_type,
-        skating=evaluation.skills.skating,
-        shooting=evaluation.skills.shooting,
-        passing=evaluation.skills.passing,
-        puck_handling=evaluation.skills.puck_handling,
-        hockey_iq=evaluation.skills.hockey_iq,
-        physicality=evaluation.skills.physicality,
-        notes=evaluation.notes,
-        strengths=evaluation.strengths,
-        areas_for_improvement=evaluation.areas_for_improvement
-    )
+    db_evaluation = crud.build_evaluation(current_user.id, evaluation)
     db.add(db_evaluation)
+    invalidation.publish(db, current_user.id, "evaluations")
     db.commit()
     db.refresh(db_evaluation)
+    template_index.record_use(current_user.id, set(evaluation.feedback_template_ids))
+    similarity.record_evaluations(current_user.id, [db_evaluation])
+    background_tasks.add_task(normalization.refresh_pending)
     return db_evaluation
 
-@app.post("/api/evaluations/bulk", response_model=List[schemas.Evaluation])
+@app.post("/api/evaluations/bulk", response_model=List[schemas.Evaluation], dependencies=[Depends(ratelimit.limit(cost=10, heavy=True))])
 async def create_bulk_evaluations(
     evaluations: List[schemas.EvaluationCreate],
+    background_tasks: BackgroundTasks,
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    created_evaluations = []
-    for evaluation in evaluations:
-        player = db.query(models.Player).filter(
-            models.Player.id == evaluation.player_id,
-            models.Player.coach_id == current_user.id
-        ).first()
-        if not player:
-            continue
-        
-        db_evaluation = models.Evaluation(
-            player_id=evaluation.player_id,
-            evaluator_id=current_user.id,
-            evaluator_name=evaluation.evaluator_name,
-            evaluation_type=evaluation.evaluation_type,
-            skating=evaluation.skills.skating,
-            shooting=evaluation.skills.shooting,
-            passing=evaluation.skills.passing,
-            puck_handling=evaluation.skills.puck_handling,
-            hockey_iq=evaluation.skills.hockey_iq,
-            physicality=evaluation.skills.physicality,
-            notes=evaluation.notes,
-            strengths=evaluation.strengths,
-            areas_for_improvement=evaluation.areas_for_improvement
-        )
-        db.add(db_evaluation)
-        created_evaluations.append(db_evaluation)
-    
-    db.commit()
-    for eval in created_evaluations:
-        db.refresh(eval)
+    created_evaluations = await run_in_threadpool(crud.create_evaluations, db, current_user.id, evaluations)
+    if created_evaluations:
+        background_tasks.add_task(normalization.refresh_pending)
     return created_evaluations
 
-@app.get("/api/players/{player_id}/pdf")
+@app.post("/api/evaluations/bulk/async", response_model=schemas.Job, status_code=202, dependencies=[Depends(ratelimit.limit(cost=5))])
+async def submit_bulk_evaluations(
+    evaluations: List[schemas.EvaluationCreate],
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    # Inserts are not idempotent, so a failed bulk job is never retried.
+    return jobs.enqueue(
+        db, current_user.id, "bulk_evaluations",
+        {"evaluations": [evaluation.dict() for evaluation in evaluations]},
+        max_attempts=1
+    )
+
+@app.get("/api/players/{player_id}/pdf", dependencies=[Depends(ratelimit.limit(cost=10, heavy=True))])
 async def get_player_pdf(
     player_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     current_user: models.User = Depends(auth.get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(auth.get_read_db)
 ):
-    player = db.query(models.Player).filter(
-        models.Player.id == player_id,
-        models.Player.coach_id == current_user.id
-    ).first()
+    player = repository.player_for_coach(db, player_id, current_user.id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    evaluations = db.query(models.Evaluation).filter(
-        models.Evaluation.player_id == player_id
-    ).order_by(models.Evaluation.date.desc()).all()
-    
-    pdf_data = generate_player_evaluation_pdf(player, evaluations)
+    pdf_data = await run_in_threadpool(crud.render_player_pdf, db, player, start, end)
     
     return Response(
         content=pdf_data,
@@ -301,17 +571,158 @@ async def get_player_pdf(
         }
     )
 
-@app.get("/api/feedback-templates", response_model=List[schemas.FeedbackTemplate])
-async def get_feedback_templates(
+@app.post("/api/players/{player_id}/pdf/async", response_model=schemas.Job, status_code=202, dependencies=[Depends(ratelimit.limit(cost=2))])
+async def submit_player_pdf(
+    player_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    if not repository.owns_player(db, player_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Player not found")
+    
+    return jobs.enqueue(db, current_user.id, "player_pdf", {
+        "player_id": player_id,
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
+    })
+
+@app.get("/api/leaderboard", response_model=List[schemas.LeaderboardEntry], dependencies=[Depends(ratelimit.limit(cost=2))])
+async def get_leaderboard(
+    team_id: Optional[int] = None,
+    evaluation_type: Optional[str] = None,
+    normalized: bool = False,
+    limit: int = Query(50, ge=1, le=500),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(auth.get_read_db)
+):
+    player_ids, ratings = await run_in_threadpool(
+        normalization.coach_ratings, db, current_user.id, team_id, evaluation_type, normalized, start, end
+    )
+    if not len(player_ids):
+        return []
+    
+    players, index, counts = np.unique(player_ids, return_inverse=True, return_counts=True)
+    sums = np.zeros((len(players), ratings.shape[1]))
+    np.add.at(sums, index, ratings)
+    means = sums / counts[:, None]
+    overall = means.mean(axis=1)
+    order = np.argsort(-overall, kind="stable")[:limit]
+    
+    player_info = {
+        player.id: player
+        for player in db.query(models.Player).filter(models.Player.id.in_(players[order].tolist()))
+    }
+    leaderboard = []
+    for rank, i in enumerate(order, start=1):
+        player = player_info[int(players[i])]
+        leaderboard.append(schemas.LeaderboardEntry(
+            rank=rank,
+            player_id=player.id,
+            name=player.name,
+            position=player.position,
+            team_id=player.team_id,
+            evaluation_count=int(counts[i]),
+            skills=dict(zip(models.SKILLS, np.round(means[i], 2).tolist())),
+            overall=round(float(overall[i]), 2)
+        ))
+    return leaderboard
+
+@app.get("/api/analytics/skills", response_model=schemas.SkillAverages, dependencies=[Depends(ratelimit.limit(cost=2))])
+async def get_skill_averages(
+    team_id: Optional[int] = None,
+    evaluation_type: Optional[str] = None,
+    normalized: bool = False,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(auth.get_read_db)
+):
+    player_ids, ratings = await run_in_threadpool(
+        normalization.coach_ratings, db, current_user.id, team_id, evaluation_type, normalized, start, end
+    )
+    averages = ratings.mean(axis=0) if len(ratings) else np.zeros(len(models.SKILLS))
+    return schemas.SkillAverages(
+        normalized=normalized,
+        evaluation_count=len(player_ids),
+        player_count=len(np.unique(player_ids)),
+        skills=dict(zip(models.SKILLS, np.round(averages, 2).tolist()))
+    )
+
+@app.get("/api/analytics/seasons", response_model=List[schemas.SeasonSkillSummary], dependencies=[Depends(ratelimit.limit())])
+async def get_season_summaries(
+    team_id: Optional[int] = None,
+    age_group: Optional[str] = None,
+    season: Optional[str] = None,
+    skill: Optional[str] = None,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(auth.get_read_db)
+):
+    summary = models.SeasonSkillSummary
+    query = db.query(summary).filter(summary.coach_id == current_user.id)
+    if team_id:
+        query = query.filter(summary.team_id == team_id)
+    if age_group:
+        query = query.filter(summary.age_group == age_group)
+    if season:
+        query = query.filter(summary.season == season)
+    if skill:
+        query = query.filter(summary.skill == skill)
+    period_order = case({period: i for i, period in enumerate(seasons.PERIODS)}, value=summary.period)
+    return query.order_by(
+        summary.team_id, summary.age_group, summary.skill, summary.season, period_order
+    ).all()
+
+@app.get("/api/normalization", response_model=List[schemas.EvaluatorNormalization], dependencies=[Depends(ratelimit.limit())])
+async def get_normalization(
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(auth.get_read_db)
+):
+    return db.query(models.EvaluatorNormalization).filter(
+        models.EvaluatorNormalization.evaluator_id == current_user.id
+    ).order_by(
+        models.EvaluatorNormalization.evaluator_name,
+        models.EvaluatorNormalization.skill
+    ).all()
+
+@app.post("/api/normalization/refresh", dependencies=[Depends(ratelimit.limit(cost=5, heavy=True))])
+async def refresh_normalization(
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    refit = await run_in_threadpool(normalization.refresh_account, db, current_user.id)
+    return {"refit": refit}
+
+@app.post("/api/analytics/refresh/async", response_model=schemas.Job, status_code=202, dependencies=[Depends(ratelimit.limit(cost=2))])
+async def submit_analytics_refresh(
     current_user: models.User = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
+):
+    return jobs.enqueue(db, current_user.id, "analytics_refresh", {})
+
+@app.get("/api/feedback-templates", response_model=List[schemas.FeedbackTemplate], dependencies=[Depends(ratelimit.limit())])
+async def get_feedback_templates(
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(auth.get_read_db)
 ):
     templates = db.query(models.FeedbackTemplate).filter(
         models.FeedbackTemplate.coach_id == current_user.id
     ).all()
     return templates
 
-@app.post("/api/feedback-templates", response_model=schemas.FeedbackTemplate)
+@app.get("/api/feedback-templates/suggest", response_model=List[schemas.FeedbackTemplate], dependencies=[Depends(ratelimit.limit())])
+async def suggest_feedback_templates(
+    q: str = "",
+    limit: int = Query(10, ge=1, le=50),
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    return template_index.get_index(db, current_user.id).suggest(q, limit)
+
+@app.post("/api/feedback-templates", response_model=schemas.FeedbackTemplate, dependencies=[Depends(ratelimit.limit())])
 async def create_feedback_template(
     template: schemas.FeedbackTemplateCreate,
     current_user: models.User = Depends(auth.get_current_active_user),
@@ -319,11 +730,12 @@ async def create_feedback_template(
 ):
     db_template = models.FeedbackTemplate(**template.dict(), coach_id=current_user.id)
     db.add(db_template)
+    invalidation.publish(db, current_user.id, "templates")
     db.commit()
     db.refresh(db_template)
     return db_template
 
-@app.delete("/api/feedback-templates/{template_id}")
+@app.delete("/api/feedback-templates/{template_id}", dependencies=[Depends(ratelimit.limit())])
 async def delete_feedback_template(
     template_id: int,
     current_user: models.User = Depends(auth.get_current_active_user),
@@ -337,5 +749,42 @@ async def delete_feedback_template(
         raise HTTPException(status_code=404, detail="Template not found")
     
     db.delete(template)
+    invalidation.publish(db, current_user.id, "templates")
     db.commit()
     return {"message": "Template deleted"}
+
+@app.get("/api/jobs/{job_id}", response_model=schemas.Job, dependencies=[Depends(ratelimit.limit())])
+async def get_job(
+    job_id: int,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    job = db.query(models.Job).filter(
+        models.Job.id == job_id,
+        models.Job.coach_id == current_user.id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/jobs/{job_id}/result", dependencies=[Depends(ratelimit.limit())])
+async def get_job_result(
+    job_id: int,
+    current_user: models.User = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    job = db.query(models.Job).filter(
+        models.Job.id == job_id,
+        models.Job.coach_id == current_user.id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == jobs.FAILED:
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    if job.status != jobs.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    
+    headers = {}
+    if job.result_filename:
+        headers["Content-Disposition"] = f"attachment; filename={job.result_filename}"
+    return Response(content=job.result, media_type=job.result_media_type, headers=headers)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, LargeBinary
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, LargeBinary, Float, UniqueConstraint
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -6,6 +7,8 @@ from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+SKILLS = ("skating", "shooting", "passing", "puck_handling", "hockey_iq", "physicality")
+
 class User(Base):
     __tablename__ = "users"
     
@@ -96,3 +99,121 @@ class FeedbackTemplate(Base):
     text = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     times_used = Column(Integer, default=0)
+
+
+class EvaluatorNormalization(Base):
+    __tablename__ = "evaluator_normalizations"
+    __table_args__ = (UniqueConstraint("evaluator_id", "evaluator_name", "skill"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    evaluator_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    evaluator_name = Column(String, nullable=False)
+    skill = Column(String, nullable=False)
+    offset = Column(Float, nullable=False, default=0.0)
+    scale = Column(Float, nullable=False, default=1.0)
+    sample_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class RefreshWatermark(Base):
+    __tablename__ = "refresh_watermarks"
+    
+    job = Column(String, primary_key=True)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+    
+    @classmethod
+    def for_job(cls, db, job: str) -> "RefreshWatermark":
+        mark = db.get(cls, job)
+        if mark is None:
+            dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(db.get_bind().dialect.name)
+            if dialect is None:
+                mark = cls(job=job)
+                db.add(mark)
+                return mark
+            # Workers may create the same watermark at once; one insert wins.
+            db.execute(dialect.insert(cls).values(job=job).on_conflict_do_nothing())
+            mark = db.get(cls, job)
+        return mark
+
+
+class SeasonSkillSummary(Base):
+    __tablename__ = "season_skill_summaries"
+    __table_args__ = (
+        UniqueConstraint(
+            "coach_id", "team_id", "age_group", "season", "period", "skill",
+            name="uq_season_skill_summaries_key", postgresql_nulls_not_distinct=True
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    coach_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"))
+    age_group = Column(String)
+    season = Column(String, nullable=False, index=True)
+    period = Column(String, nullable=False)
+    skill = Column(String, nullable=False)
+    evaluation_count = Column(Integer, nullable=False)
+    player_count = Column(Integer, nullable=False)
+    average = Column(Float, nullable=False)
+    minimum = Column(Integer, nullable=False)
+    maximum = Column(Integer, nullable=False)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PendingRefresh(Base):
+    __tablename__ = "pending_refreshes"
+    
+    id = Column(Integer, primary_key=True)
+    job = Column(String, nullable=False, index=True)
+    coach_id = Column(Integer, nullable=False)
+    player_id = Column(Integer)
+    season_year = Column(Integer)
+    queued_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PlayerForecast(Base):
+    __tablename__ = "player_forecasts"
+    
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    skill = Column(String, primary_key=True)
+    slope_per_year = Column(Float, nullable=False)
+    current = Column(Float, nullable=False)
+    forecast = Column(Float, nullable=False)
+    lower = Column(Float, nullable=False)
+    upper = Column(Float, nullable=False)
+    horizon_days = Column(Integer, nullable=False)
+    evaluation_count = Column(Integer, nullable=False)
+    last_evaluation_at = Column(DateTime, nullable=False)
+    fitted_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ArchivedSeason(Base):
+    __tablename__ = "archived_seasons"
+    
+    season = Column(String, primary_key=True)
+    starts_at = Column(DateTime, nullable=False)
+    ends_at = Column(DateTime, nullable=False)
+    path = Column(String, nullable=False)
+    evaluation_count = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    coach_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued", index=True)
+    payload = Column(Text, nullable=False, default="{}")
+    result = Column(LargeBinary)
+    result_media_type = Column(String)
+    result_filename = Column(String)
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, default=datetime.utcnow)
+    locked_by = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
@@ -0,0 +1,295 @@
+import argparse
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from . import archive, models, refresh_queue
+from .database import SessionLocal, advisory_lock
+
+# Each evaluator (a coach account plus the evaluator name typed on the form,
+# since several people share one account at tryouts) is modelled per skill as
+#   rating = offset + scale * consensus
+# where consensus is the mean rating the *other* evaluators gave the same
+# player and scale is the evaluator's spread relative to the pooled
+# within-evaluator spread of all evaluators of the same account on shared
+# players. Every input to an account's fit comes from that account alone, so
+# refitting only the accounts with new evaluations gives the same coefficients
+# as a full refit. Normalized ratings are mapped back onto the consensus scale
+# with
+#   normalized = (rating - offset) / scale
+#
+# Accounts with new evaluations arrive through refresh_queue; like the other
+# scheduled refreshes, one worker at a time runs under an advisory lock.
+
+JOB_NAME = "evaluator_normalization"
+MIN_SAMPLES_FOR_SCALE = 5
+SCALE_BOUNDS = (0.5, 2.0)
+
+RaterKey = Tuple[int, str]
+
+
+def _rater_codes(evaluator_ids: np.ndarray, evaluator_names: np.ndarray):
+    id_values, id_codes = np.unique(evaluator_ids, return_inverse=True)
+    name_values, name_codes = np.unique(evaluator_names, return_inverse=True)
+    combined, rater_idx = np.unique(id_codes * len(name_values) + name_codes, return_inverse=True)
+    keys = [
+        (int(id_values[code // len(name_values)]), str(name_values[code % len(name_values)]))
+        for code in combined
+    ]
+    return keys, rater_idx
+
+
+def fit(player_ids: np.ndarray, evaluator_ids: np.ndarray, evaluator_names: np.ndarray, ratings: np.ndarray):
+    """Fit per-evaluator, per-skill offset and scale.
+
+    ``ratings`` is an ``(n, len(SKILLS))`` array aligned with the id arrays.
+    Returns ``(keys, offsets, scales, counts)`` where the arrays are
+    ``(len(keys), len(SKILLS))``.
+    """
+    n_skills = ratings.shape[1]
+    keys, rater_idx = _rater_codes(evaluator_ids, evaluator_names)
+    n_raters = len(keys)
+    _, player_idx = np.unique(player_ids, return_inverse=True)
+    n_players = int(player_idx.max()) + 1 if len(player_idx) else 0
+    ratings = ratings.astype(np.float64)
+
+    # Leave-one-evaluator-out consensus: player totals minus this evaluator's
+    # own contribution, so an evaluator is never compared against themselves.
+    pair, pair_idx = np.unique(player_idx * n_raters + rater_idx, return_inverse=True)
+    player_count = np.bincount(player_idx, minlength=n_players)
+    pair_count = np.bincount(pair_idx, minlength=len(pair))
+    other_count = player_count[player_idx] - pair_count[pair_idx]
+    shared = other_count > 0
+
+    cols = np.arange(n_skills)
+    player_sum = np.zeros((n_players, n_skills))
+    np.add.at(player_sum, player_idx, ratings)
+    pair_sum = np.zeros((len(pair), n_skills))
+    np.add.at(pair_sum, pair_idx, ratings)
+
+    x = (player_sum[player_idx[shared]] - pair_sum[pair_idx[shared]]) / other_count[shared, None]
+    y = ratings[shared]
+    group = (rater_idx[shared, None] * n_skills + cols).ravel()
+    size = n_raters * n_skills
+
+    def total(weights):
+        return np.bincount(group, weights=weights.ravel(), minlength=size).reshape(n_raters, n_skills)
+
+    n = np.bincount(group, minlength=size).reshape(n_raters, n_skills).astype(np.float64)
+    safe_n = np.maximum(n, 1)
+    mean_x = total(x) / safe_n
+    mean_y = total(y) / safe_n
+    var_y = total(y * y) / safe_n - mean_y ** 2
+
+    # Pooled within-evaluator variance per account and skill, spread back
+    # over the account's raters.
+    _, account_of_rater = np.unique(np.asarray([key[0] for key in keys], dtype=np.int64), return_inverse=True)
+    account_n = np.zeros((int(account_of_rater.max()) + 1 if n_raters else 0, n_skills))
+    account_squares = np.zeros_like(account_n)
+    np.add.at(account_n, account_of_rater, n)
+    np.add.at(account_squares, account_of_rater, n * var_y)
+    pooled_var = (account_squares / np.maximum(account_n, 1))[account_of_rater]
+
+    scales = np.ones((n_raters, n_skills))
+    fit_scale = (n >= MIN_SAMPLES_FOR_SCALE) & (var_y > 1e-6) & (pooled_var > 1e-6)
+    ratio = np.sqrt(var_y / np.where(pooled_var > 1e-6, pooled_var, 1.0))
+    scales[fit_scale] = np.clip(ratio[fit_scale], *SCALE_BOUNDS)
+    offsets = np.where(n > 0, mean_y - scales * mean_x, 0.0)
+
+    return keys, offsets, scales, n.astype(np.int64)
+
+
+def _load(db: Session, evaluator_ids: Optional[Iterable[int]] = None):
+    e = models.Evaluation
+    stmt = select(e.player_id, e.evaluator_id, e.evaluator_name, *[getattr(e, s) for s in models.SKILLS])
+    if evaluator_ids is not None:
+        stmt = stmt.where(e.evaluator_id.in_(list(evaluator_ids)))
+    rows = db.execute(stmt).all()
+    if not rows:
+        return None
+    columns = list(zip(*rows))
+    return (
+        np.asarray(columns[0], dtype=np.int64),
+        np.asarray(columns[1], dtype=np.int64),
+        np.asarray([name.strip() for name in columns[2]], dtype=object),
+        np.column_stack(columns[3:]).astype(np.float64),
+    )
+
+
+def refit(db: Session, evaluator_ids: Optional[Iterable[int]] = None) -> int:
+    """Replace the normalization rows of ``evaluator_ids``' accounts.
+
+    ``None`` refits every account. Does not commit. Returns the number of
+    evaluator accounts refit.
+    """
+    data = _load(db, evaluator_ids)
+    table = models.EvaluatorNormalization.__table__
+    if evaluator_ids is None:
+        db.execute(delete(table))
+    else:
+        db.execute(delete(table).where(table.c.evaluator_id.in_(evaluator_ids)))
+
+    refit_count = 0
+    if data is not None:
+        keys, offsets, scales, counts = fit(*data)
+        now = datetime.utcnow()
+        db.execute(insert(table), [
+            {
+                "evaluator_id": evaluator_id,
+                "evaluator_name": evaluator_name,
+                "skill": skill,
+                "offset": float(offsets[i, j]),
+                "scale": float(scales[i, j]),
+                "sample_count": int(counts[i, j]),
+                "updated_at": now,
+            }
+            for i, (evaluator_id, evaluator_name) in enumerate(keys)
+            for j, skill in enumerate(models.SKILLS)
+        ])
+        refit_count = len({evaluator_id for evaluator_id, _ in keys})
+
+    return refit_count
+
+
+def refresh(db: Session, full: bool = False) -> int:
+    """Refit the normalization table.
+
+    Incremental runs only refit evaluator accounts with evaluations queued
+    since the last run. Returns the number of evaluator accounts refit.
+    """
+    if not advisory_lock(db, JOB_NAME):
+        return 0
+    mark = models.RefreshWatermark.for_job(db, JOB_NAME)
+    queued = refresh_queue.take(db, JOB_NAME)
+    evaluator_ids = None if full else sorted({coach_id for coach_id, _, _ in queued})
+    refit_count = refit(db, evaluator_ids) if evaluator_ids is None or evaluator_ids else 0
+    mark.refreshed_at = datetime.utcnow()
+    db.commit()
+    return refit_count
+
+
+def refresh_account(db: Session, evaluator_id: int) -> int:
+    """Refit one coach account now."""
+    advisory_lock(db, JOB_NAME, wait=True)
+    refresh_queue.take(db, JOB_NAME, evaluator_id)
+    refit_count = refit(db, [evaluator_id])
+    db.commit()
+    return refit_count
+
+
+def refresh_pending():
+    db = SessionLocal()
+    try:
+        refresh(db)
+    finally:
+        db.close()
+
+
+def load_coefficients(db: Session, evaluator_ids: Iterable[int]) -> Dict[RaterKey, Tuple[np.ndarray, np.ndarray]]:
+    rows = db.query(models.EvaluatorNormalization).filter(
+        models.EvaluatorNormalization.evaluator_id.in_(list(evaluator_ids))
+    ).all()
+    skill_index = {skill: j for j, skill in enumerate(models.SKILLS)}
+    coefficients: Dict[RaterKey, Tuple[np.ndarray, np.ndarray]] = {}
+    for row in rows:
+        offsets, scales = coefficients.setdefault(
+            (row.evaluator_id, row.evaluator_name),
+            (np.zeros(len(models.SKILLS)), np.ones(len(models.SKILLS))),
+        )
+        offsets[skill_index[row.skill]] = row.offset
+        scales[skill_index[row.skill]] = row.scale
+    return coefficients
+
+
+def apply(db: Session, evaluator_ids: np.ndarray, evaluator_names: np.ndarray, ratings: np.ndarray) -> np.ndarray:
+    """Map raw ratings onto the consensus scale.
+
+    Evaluators without a fitted row are passed through unchanged.
+    """
+    if len(ratings) == 0:
+        return ratings.astype(np.float64)
+    names = np.asarray([name.strip() for name in evaluator_names], dtype=object)
+    keys, rater_idx = _rater_codes(np.asarray(evaluator_ids), names)
+    coefficients = load_coefficients(db, {evaluator_id for evaluator_id, _ in keys})
+    offsets = np.zeros((len(keys), ratings.shape[1]))
+    scales = np.ones((len(keys), ratings.shape[1]))
+    for i, key in enumerate(keys):
+        if key in coefficients:
+            offsets[i], scales[i] = coefficients[key]
+    return (ratings - offsets[rater_idx]) / scales[rater_idx]
+
+
+def _archived_ratings(
+    db: Session,
+    coach_id: int,
+    team_id: Optional[int],
+    evaluation_type: Optional[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> list:
+    records = [
+        record for record in archive.load_evaluations(db, coach_id, start, end)
+        if not evaluation_type or record["evaluation_type"] == evaluation_type
+    ]
+    if not records:
+        return []
+    players = select(models.Player.id).where(models.Player.coach_id == coach_id)
+    if team_id:
+        players = players.where(models.Player.team_id == team_id)
+    keep = set(db.execute(players).scalars())
+    return [
+        (record["player_id"], record["evaluator_id"], record["evaluator_name"], *[record[s] for s in models.SKILLS])
+        for record in records
+        if record["player_id"] in keep
+    ]
+
+
+def coach_ratings(
+    db: Session,
+    coach_id: int,
+    team_id: Optional[int] = None,
+    evaluation_type: Optional[str] = None,
+    normalized: bool = False,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Return ``(player_ids, ratings)`` for a coach's evaluations in ``[start, end)``.
+
+    Archived seasons in the range are read back from the archive.
+    """
+    e = models.Evaluation
+    stmt = select(e.player_id, e.evaluator_id, e.evaluator_name, *[getattr(e, s) for s in models.SKILLS]).join(
+        models.Player, models.Player.id == e.player_id
+    ).where(models.Player.coach_id == coach_id)
+    if team_id:
+        stmt = stmt.where(models.Player.team_id == team_id)
+    if evaluation_type:
+        stmt = stmt.where(e.evaluation_type == evaluation_type)
+    if start:
+        stmt = stmt.where(e.date >= start)
+    if end:
+        stmt = stmt.where(e.date < end)
+    rows = _archived_ratings(db, coach_id, team_id, evaluation_type, start, end) + db.execute(stmt).all()
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(models.SKILLS)))
+    columns = list(zip(*rows))
+    player_ids = np.asarray(columns[0], dtype=np.int64)
+    ratings = np.column_stack(columns[3:]).astype(np.float64)
+    if normalized:
+        ratings = apply(db, np.asarray(columns[1], dtype=np.int64), columns[2], ratings)
+    return player_ids, ratings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit evaluator bias normalization")
+    parser.add_argument("--full", action="store_true", help="refit every evaluator instead of only new data")
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        count = refresh(db, full=args.full)
+    finally:
+        db.close()
+    print(f"Refit {count} evaluator account(s)")
@@ -0,0 +1,108 @@
+import calendar
+import gzip
+import os
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+
+# One little-endian, unpadded 18-byte record per evaluation:
+#   player_id  uint32
+#   date       int64   (Unix seconds, UTC)
+#   skills     6 x uint8 in models.SKILLS order
+RECORD_DTYPE = np.dtype([
+    ("player_id", "<u4"),
+    ("date", "<i8"),
+    ("skills", "u1", (len(models.SKILLS),)),
+])
+RECORD_FORMAT = "player_id:<u4,date:<i8,skills:6xu1"
+CHUNK_ROWS = 10_000
+MEDIA_TYPE = "application/vnd.hockey-eval.skills"
+
+
+def load_skill_records(
+    db: Session,
+    coach_id: int,
+    player_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> np.ndarray:
+    """Load a coach's evaluations as a ``RECORD_DTYPE`` array, oldest first.
+
+    Only the columns needed for charting are selected and rows are packed
+    in chunks as they stream in, so no ORM objects or Pydantic models are
+    built and at most ``CHUNK_ROWS`` tuples are alive at once. Archived
+    seasons inside the range (all of them when ``start`` is not given) are
+    read from the archive and prepended.
+    """
+    e = models.Evaluation
+    stmt = select(e.player_id, e.date, *[getattr(e, skill) for skill in models.SKILLS]).where(
+        e.evaluator_id == coach_id, e.date.isnot(None)
+    )
+    if player_id:
+        stmt = stmt.where(e.player_id == player_id)
+    if start:
+        stmt = stmt.where(e.date >= start)
+    if end:
+        stmt = stmt.where(e.date < end)
+    chunks = [load_archived_records(db, coach_id, player_id, start, end)]
+    result = db.execute(stmt.order_by(e.date).execution_options(yield_per=CHUNK_ROWS))
+    chunks += [to_records(rows) for rows in result.partitions()]
+    return np.concatenate(chunks)
+
+
+def _unix_seconds(value: datetime) -> int:
+    # Naive datetimes are UTC, matching to_records().
+    return calendar.timegm(value.utctimetuple())
+
+
+def archive_filename(coach_id: int) -> str:
+    return f"coach-{coach_id}.skills.gz"
+
+
+def load_archived_records(
+    db: Session,
+    coach_id: int,
+    player_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> np.ndarray:
+    """Records from archived seasons overlapping ``[start, end)``, oldest first."""
+    archived = models.ArchivedSeason
+    stmt = select(archived.path).order_by(archived.starts_at)
+    if start:
+        stmt = stmt.where(archived.ends_at > start)
+    if end:
+        stmt = stmt.where(archived.starts_at < end)
+
+    chunks = []
+    for path in db.execute(stmt).scalars():
+        try:
+            with gzip.open(os.path.join(path, archive_filename(coach_id)), "rb") as handle:
+                records = np.frombuffer(handle.read(), dtype=RECORD_DTYPE)
+        except FileNotFoundError:
+            continue
+        keep = np.ones(len(records), dtype=bool)
+        if player_id:
+            keep &= records["player_id"] == player_id
+        if start:
+            keep &= records["date"] >= _unix_seconds(start)
+        if end:
+            keep &= records["date"] < _unix_seconds(end)
+        chunks.append(records[keep])
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=RECORD_DTYPE)
+
+
+def to_records(rows) -> np.ndarray:
+    """Pack ``(player_id, date, *skills)`` tuples into ``RECORD_DTYPE``."""
+    records = np.empty(len(rows), dtype=RECORD_DTYPE)
+    if rows:
+        columns = list(zip(*rows))
+        records["player_id"] = columns[0]
+        records["date"] = np.array(columns[1], dtype="datetime64[s]").astype(np.int64)
+        records["skills"] = np.column_stack(columns[2:])
+    return records
@@ -1,26 +1,218 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.units import inch
+from reportlab.graphics.shapes import Circle, Drawing, Group, Line, Polygon, PolyLine, String
 from datetime import datetime
+from math import cos, pi, sin
+from typing import List, NamedTuple, Sequence
+from xml.sax.saxutils import escape
 import io
+import threading
 
-def generate_player_evaluation_pdf(player, evaluations):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    story = []
+from .models import SKILLS
+
+# Styles are built once per process; page templates hold per-build frame
+# state, so each thread keeps its own. Reports are rendered from aggregated
+# data (per-period averages and the newest few evaluations), never from a
+# player's full evaluation history. Charts are drawn from plain shapes rather
+# than the chart widgets, which spend most of their time on attribute
+# plumbing and took twice as long per report.
+
+MAX_RATING = 5
+RECENT_EVALUATIONS = 5
+MARGIN = 0.75 * inch
+
+SKILL_LABELS = {
+    "skating": "Skating",
+    "shooting": "Shooting",
+    "passing": "Passing",
+    "puck_handling": "Puck Handling",
+    "hockey_iq": "Hockey IQ",
+    "physicality": "Physicality",
+}
+ACCENT = colors.HexColor('#1e40af')
+AVERAGE_COLOR = colors.HexColor('#f59e0b')
+
+
+class TrendPoint(NamedTuple):
+    label: str
+    evaluation_count: int
+    averages: Sequence[float]
+
+
+class ReportData(NamedTuple):
+    player: object
+    recent: List[object]  # newest first, at most RECENT_EVALUATIONS
+    trend: List[TrendPoint]  # oldest first
+    averages: Sequence[float]  # all evaluations, in SKILLS order
+    evaluation_count: int
+
+
+def _build_styles():
     styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
+    styles.add(ParagraphStyle(
         'CustomTitle',
         parent=styles['Heading1'],
         fontSize=24,
-        textColor=colors.HexColor('#1e40af'),
+        textColor=ACCENT,
         spaceAfter=30,
+    ))
+    player_table = TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    skills_table = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    chart_grid = TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ])
+    return styles, player_table, skills_table, chart_grid
+
+
+STYLES, PLAYER_TABLE_STYLE, SKILLS_TABLE_STYLE, CHART_GRID_STYLE = _build_styles()
+
+_local = threading.local()
+
+
+def _footer(canvas, doc):
+    canvas.saveState()
+    canvas.setFont('Helvetica', 8)
+    canvas.setFillColor(colors.grey)
+    canvas.drawString(MARGIN, MARGIN / 2, doc.title)
+    canvas.drawRightString(letter[0] - MARGIN, MARGIN / 2, f"Page {doc.page}")
+    canvas.restoreState()
+
+
+def _page_templates():
+    templates = getattr(_local, "page_templates", None)
+    if templates is None:
+        frame = Frame(MARGIN, MARGIN, letter[0] - 2 * MARGIN, letter[1] - 2 * MARGIN, id='body')
+        templates = _local.page_templates = [PageTemplate(id='report', frames=[frame], onPage=_footer)]
+    return templates
+
+
+def _rotated_label(x: float, y: float, text: str) -> Group:
+    label = Group(String(0, 0, text, fontSize=6, textAnchor='end'))
+    label.translate(x, y)
+    label.rotate(60)
+    return label
+
+
+def _trend_chart(skill_index: int, trend: List[TrendPoint]) -> Drawing:
+    width, height = 2.2 * inch, 1.6 * inch
+    left, bottom, right, top = 24, 40, width - 10, height - 22
+    drawing = Drawing(width, height)
+    drawing.add(String(4, height - 12, SKILL_LABELS[SKILLS[skill_index]], fontName='Helvetica-Bold', fontSize=9))
+
+    step = (top - bottom) / MAX_RATING
+    for rating in range(MAX_RATING + 1):
+        y = bottom + rating * step
+        drawing.add(Line(left, y, right, y, strokeColor=colors.lightgrey if rating else colors.black, strokeWidth=0.5))
+        drawing.add(String(left - 4, y - 2, str(rating), fontSize=6, textAnchor='end'))
+    drawing.add(Line(left, bottom, left, top, strokeWidth=0.5))
+
+    # Points sit in the middle of equal-width category slots.
+    slot = (right - left) / len(trend)
+    points = []
+    for i, point in enumerate(trend):
+        x = left + slot * (i + 0.5)
+        y = bottom + point.averages[skill_index] * step
+        points.extend((x, y))
+        drawing.add(Circle(x, y, 1.5, fillColor=ACCENT, strokeColor=None))
+        drawing.add(_rotated_label(x + 2, bottom - 4, point.label))
+    if len(trend) > 1:
+        drawing.add(PolyLine(points, strokeColor=ACCENT, strokeWidth=1.5))
+    return drawing
+
+
+def _radar_points(cx: float, cy: float, radius: float, values: Sequence[float]) -> List[float]:
+    points = []
+    for i, value in enumerate(values):
+        angle = pi / 2 - 2 * pi * i / len(values)
+        r = radius * value / MAX_RATING
+        points.extend((cx + r * cos(angle), cy + r * sin(angle)))
+    return points
+
+
+def _radar_chart(latest: Sequence[float], averages: Sequence[float]) -> Drawing:
+    drawing = Drawing(3.4 * inch, 2.6 * inch)
+    cx, cy, radius = 1.7 * inch, 1.35 * inch, 1 * inch
+    for rating in range(1, MAX_RATING + 1):
+        drawing.add(Polygon(
+            _radar_points(cx, cy, radius, [rating] * len(SKILLS)),
+            strokeColor=colors.lightgrey, strokeWidth=0.5, fillColor=None,
+        ))
+    outer = _radar_points(cx, cy, radius, [MAX_RATING] * len(SKILLS))
+    label_points = _radar_points(cx, cy, radius + 10, [MAX_RATING] * len(SKILLS))
+    for i, skill in enumerate(SKILLS):
+        drawing.add(Line(cx, cy, outer[2 * i], outer[2 * i + 1], strokeColor=colors.lightgrey, strokeWidth=0.5))
+        x, y = label_points[2 * i], label_points[2 * i + 1]
+        anchor = 'middle' if abs(x - cx) < 1 else ('start' if x > cx else 'end')
+        drawing.add(String(x, y - 3, SKILL_LABELS[skill], fontSize=7, textAnchor=anchor))
+    drawing.add(Polygon(
+        _radar_points(cx, cy, radius, averages),
+        strokeColor=AVERAGE_COLOR, strokeWidth=1.5, fillColor=None,
+    ))
+    drawing.add(Polygon(
+        _radar_points(cx, cy, radius, latest),
+        strokeColor=ACCENT, strokeWidth=1.5, fillColor=colors.Color(0.12, 0.25, 0.69, alpha=0.2),
+    ))
+    drawing.add(String(4, 8, "Latest", fontSize=8, fillColor=ACCENT))
+    drawing.add(String(44, 8, "All-time average", fontSize=8, fillColor=AVERAGE_COLOR))
+    return drawing
+
+
+def _evaluation_story(evaluation) -> list:
+    story = [
+        Paragraph(f"Date: {evaluation.date.strftime('%Y-%m-%d')} | Type: {escape(evaluation.evaluation_type)}", STYLES['Heading3']),
+        Paragraph(f"Evaluator: {escape(evaluation.evaluator_name)}", STYLES['Normal']),
+        Spacer(1, 0.1*inch),
+    ]
+    skills_data = [['Skill', 'Rating']] + [
+        [SKILL_LABELS[skill], str(getattr(evaluation, skill))] for skill in SKILLS
+    ]
+    skills_table = Table(skills_data, colWidths=[3*inch, 1*inch])
+    skills_table.setStyle(SKILLS_TABLE_STYLE)
+    story.append(skills_table)
+    story.append(Spacer(1, 0.1*inch))
+    
+    if evaluation.strengths:
+        story.append(Paragraph(f"<b>Strengths:</b> {escape(evaluation.strengths)}", STYLES['Normal']))
+    if evaluation.areas_for_improvement:
+        story.append(Paragraph(f"<b>Areas for Improvement:</b> {escape(evaluation.areas_for_improvement)}", STYLES['Normal']))
+    if evaluation.notes:
+        story.append(Paragraph(f"<b>Notes:</b> {escape(evaluation.notes)}", STYLES['Normal']))
+    story.append(Spacer(1, 0.3*inch))
+    return story
+
+
+def generate_player_evaluation_pdf(report: ReportData) -> bytes:
+    player = report.player
+    buffer = io.BytesIO()
+    doc = BaseDocTemplate(
+        buffer,
+        pagesize=letter,
+        pageTemplates=_page_templates(),
+        title=f"Player Evaluation Report - {player.name}",
     )
+    story = []
     
-    story.append(Paragraph(f"Player Evaluation Report", title_style))
+    story.append(Paragraph("Player Evaluation Report", STYLES['CustomTitle']))
     story.append(Spacer(1, 0.2*inch))
     
     player_info = [
@@ -28,68 +220,36 @@ def generate_player_evaluation_pdf(player, evaluations):
         ['Jersey Number:', str(player.jersey_number) if player.jersey_number else 'N/A'],
         ['Position:', player.position or 'N/A'],
         ['Age Group:', player.age_group or 'N/A'],
+        ['Evaluations:', str(report.evaluation_count)],
         ['Report Date:', datetime.now().strftime('%Y-%m-%d')],
     ]
-    
     player_table = Table(player_info, colWidths=[2*inch, 4*inch])
-    player_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
+    player_table.setStyle(PLAYER_TABLE_STYLE)
     story.append(player_table)
     story.append(Spacer(1, 0.3*inch))
     
-    if evaluations:
-        story.append(Paragraph("Evaluation History", styles['Heading2']))
-        story.append(Spacer(1, 0.1*inch))
-        
-        for eval in evaluations[-5:]:
-            story.append(Paragraph(f"Date: {eval.date.strftime('%Y-%m-%d')} | Type: {eval.evaluation_type}", styles['Heading3']))
-            story.append(Paragraph(f"Evaluator: {eval.evaluator_name}", styles['Normal']))
-            story.append(Spacer(1, 0.1*inch))
-            
-            skills_data = [
-                ['Skill', 'Rating'],
-                ['Skating', str(eval.skating)],
-                ['Shooting', str(eval.shooting)],
-                ['Passing', str(eval.passing)],
-                ['Puck Handling', str(eval.puck_handling)],
-                ['Hockey IQ', str(eval.hockey_iq)],
-                ['Physicality', str(eval.physicality)],
-            ]
-            
-            skills_table = Table(skills_data, colWidths=[3*inch, 1*inch])
-            skills_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(skills_table)
-            story.append(Spacer(1, 0.1*inch))
-            
-            if eval.strengths:
-                story.append(Paragraph(f"<b>Strengths:</b> {eval.strengths}", styles['Normal']))
-            if eval.areas_for_improvement:
-                story.append(Paragraph(f"<b>Areas for Improvement:</b> {eval.areas_for_improvement}", styles['Normal']))
-            if eval.notes:
-                story.append(Paragraph(f"<b>Notes:</b> {eval.notes}", styles['Normal']))
-            
-            story.append(Spacer(1, 0.3*inch))
-    else:
-        story.append(Paragraph("No evaluations recorded yet.", styles['Normal']))
+    if not report.recent:
+        story.append(Paragraph("No evaluations recorded yet.", STYLES['Normal']))
+        doc.build(story)
+        return buffer.getvalue()
+    
+    story.append(Paragraph("Skill Profile", STYLES['Heading2']))
+    latest = [getattr(report.recent[0], skill) for skill in SKILLS]
+    story.append(_radar_chart(latest, report.averages))
+    
+    if report.trend:
+        story.append(Paragraph("Skill Trends", STYLES['Heading2']))
+        story.append(Paragraph("Average rating per season period.", STYLES['Normal']))
+        charts = [_trend_chart(i, report.trend) for i in range(len(SKILLS))]
+        chart_grid = Table([charts[i:i + 3] for i in range(0, len(charts), 3)])
+        chart_grid.setStyle(CHART_GRID_STYLE)
+        story.append(chart_grid)
+        story.append(Spacer(1, 0.2*inch))
+    
+    story.append(Paragraph("Recent Evaluations", STYLES['Heading2']))
+    story.append(Spacer(1, 0.1*inch))
+    for evaluation in report.recent:
+        story.extend(_evaluation_story(evaluation))
     
     doc.build(story)
-    pdf_data = buffer.getvalue()
-    buffer.close()
-    return pdf_data
+    return buffer.getvalue()
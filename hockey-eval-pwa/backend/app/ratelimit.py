@@ -0,0 +1,126 @@
+import math
+import os
+import threading
+import time
+from typing import Dict, Tuple
+
+from fastapi import Depends, HTTPException
+
+from . import auth, models
+
+# Token bucket per coach: RATE_LIMIT_PER_SECOND tokens refill continuously up
+# to RATE_LIMIT_BURST, and each route spends its own cost. CPU-heavy routes
+# additionally need one of HEAVY_CONCURRENCY process-wide slots; when none is
+# free the request is shed with 429 rather than queued.
+
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "2"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "60"))
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+HEAVY_CONCURRENCY = int(os.getenv("HEAVY_CONCURRENCY", "4"))
+HEAVY_RETRY_AFTER = 1
+
+
+class MemoryBackend:
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, cost: float, rate: float, burst: float) -> Tuple[bool, float]:
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                return True, 0.0
+            self._buckets[key] = (tokens, now)
+            return False, (cost - tokens) / rate
+
+
+class RedisBackend:
+    """Shares buckets between workers and hosts through Redis."""
+
+    SCRIPT = """
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local cost, rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local now = redis.call('TIME')
+    now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+    local tokens = tonumber(bucket[1]) or burst
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + (now - updated) * rate)
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the redis package is not installed") from exc
+        self._script = redis.Redis.from_url(url).register_script(self.SCRIPT)
+
+    def consume(self, key: str, cost: float, rate: float, burst: float) -> Tuple[bool, float]:
+        allowed, tokens = self._script(keys=[f"ratelimit:{key}"], args=[cost, rate, burst])
+        if allowed:
+            return True, 0.0
+        return False, (cost - float(tokens)) / rate
+
+
+class ConcurrencyGate:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.active >= self.limit:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+
+
+backend = RedisBackend(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else MemoryBackend()
+heavy_gate = ConcurrencyGate(HEAVY_CONCURRENCY)
+
+
+def _too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def limit(cost: float = 1, heavy: bool = False):
+    """Route dependency charging ``cost`` tokens to the current coach."""
+    async def dependency(current_user: models.User = Depends(auth.get_current_active_user)):
+        if RATE_LIMIT_PER_SECOND > 0:
+            allowed, retry_after = backend.consume(
+                f"coach:{current_user.id}",
+                min(cost, RATE_LIMIT_BURST),
+                RATE_LIMIT_PER_SECOND,
+                RATE_LIMIT_BURST,
+            )
+            if not allowed:
+                raise _too_many_requests("Rate limit exceeded", retry_after)
+        if not heavy:
+            yield
+            return
+        if not heavy_gate.try_acquire():
+            raise _too_many_requests("Server busy, try again shortly", HEAVY_RETRY_AFTER)
+        try:
+            yield
+        finally:
+            heavy_gate.release()
+    return dependency
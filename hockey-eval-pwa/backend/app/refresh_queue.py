@@ -0,0 +1,69 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from . import models, seasons
+from .database import RoutingSession
+
+# Work for the incremental refreshes, queued in pending_refreshes inside the
+# transaction that causes it, so it becomes visible exactly when that write
+# does. A refresh takes its job's rows with DELETE ... RETURNING: it removes
+# precisely the rows it saw, and anything committed meanwhile waits for the
+# next round. A max(evaluations.id) watermark could skip an evaluation for
+# good, since an insert that took a lower id but committed after the
+# watermark had moved past it was never looked at again.
+#
+# New evaluations are queued automatically when a session flushes them. Each
+# job keeps only the fields it rebuilds by (the others are stored as NULL);
+# a NULL season_year asks for every season.
+
+FIELDS = ("coach_id", "player_id", "season_year")
+JOB_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "season_summaries": ("coach_id", "season_year"),
+    "evaluator_normalization": ("coach_id",),
+    "player_forecasts": ("coach_id", "player_id"),
+}
+
+_table = models.PendingRefresh.__table__
+
+
+def _rows(changes: Iterable[dict]) -> List[dict]:
+    keys = {
+        (job,) + tuple(change[field] if field in fields else None for field in FIELDS)
+        for job, fields in JOB_FIELDS.items()
+        for change in changes
+    }
+    return [dict(zip(("job",) + FIELDS, key)) for key in keys]
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _queue_new_evaluations(session, flush_context):
+    changes = [
+        {
+            "coach_id": obj.evaluator_id,
+            "player_id": obj.player_id,
+            "season_year": seasons.season_start_year(obj.date) if obj.date else None,
+        }
+        for obj in session.new
+        if isinstance(obj, models.Evaluation)
+    ]
+    if changes:
+        session.connection().execute(insert(_table), _rows(changes))
+
+
+def request(db: Session, job: str, coach_id: int, player_id: Optional[int] = None, season_year: Optional[int] = None):
+    """Queue work for ``job`` that is not a new evaluation, e.g. a player changing teams."""
+    db.execute(insert(_table).values(job=job, coach_id=coach_id, player_id=player_id, season_year=season_year))
+
+
+def take(db: Session, job: str, coach_id: Optional[int] = None) -> List[Row]:
+    """Remove and return ``job``'s queued ``(coach_id, player_id, season_year)`` rows.
+
+    Only ``coach_id``'s when given. The rows come back if ``db`` rolls back.
+    """
+    stmt = delete(_table).where(_table.c.job == job)
+    if coach_id is not None:
+        stmt = stmt.where(_table.c.coach_id == coach_id)
+    return db.execute(stmt.returning(_table.c.coach_id, _table.c.player_id, _table.c.season_year)).all()
@@ -0,0 +1,65 @@
+from typing import List, Optional
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from . import models
+
+# The per-request lookups, built once at import time with named bind
+# parameters. A statement object memoizes its cache key, so executing the
+# same object again skips both statement construction and cache-key
+# generation and goes straight to the compiled-statement cache; rebuilding
+# the equivalent db.query(...) each request costs about three times as much
+# (benchmarks/coach_queries.py). This relies only on statement caching as it
+# works throughout SQLAlchemy 2.0; lambda statements are not used.
+#
+# Ownership checks and list endpoints fetch plain Core rows straight from
+# the session's connection, skipping the ORM entirely. Those do not
+# autoflush, so they do not see objects pending in the same session.
+
+_user_by_username = select(models.User).where(models.User.username == bindparam("username"))
+_user_by_email = select(models.User).where(models.User.email == bindparam("email"))
+
+_player_for_coach = select(models.Player).where(
+    models.Player.id == bindparam("player_id"),
+    models.Player.coach_id == bindparam("coach_id")
+)
+_owns_player = select(models.Player.id).where(
+    models.Player.id == bindparam("player_id"),
+    models.Player.coach_id == bindparam("coach_id")
+)
+
+_evaluations = select(*models.Evaluation.__table__.columns).where(
+    models.Evaluation.evaluator_id == bindparam("coach_id")
+)
+_coach_evaluations = _evaluations.order_by(models.Evaluation.date.desc())
+_player_evaluations = _evaluations.where(
+    models.Evaluation.player_id == bindparam("player_id")
+).order_by(models.Evaluation.date.desc())
+
+
+def user_by_username(db: Session, username: str) -> Optional[models.User]:
+    return db.execute(_user_by_username, {"username": username}).scalars().first()
+
+
+def user_by_email(db: Session, email: str) -> Optional[models.User]:
+    return db.execute(_user_by_email, {"email": email}).scalars().first()
+
+
+def player_for_coach(db: Session, player_id: int, coach_id: int) -> Optional[models.Player]:
+    return db.execute(_player_for_coach, {"player_id": player_id, "coach_id": coach_id}).scalars().first()
+
+
+def owns_player(db: Session, player_id: int, coach_id: int) -> bool:
+    params = {"player_id": player_id, "coach_id": coach_id}
+    return db.connection().execute(_owns_player, params).first() is not None
+
+
+def evaluations_for_coach(db: Session, coach_id: int, player_id: Optional[int] = None) -> List[Row]:
+    """A coach's evaluations, newest first, as Core rows."""
+    if player_id:
+        stmt, params = _player_evaluations, {"coach_id": coach_id, "player_id": player_id}
+    else:
+        stmt, params = _coach_evaluations, {"coach_id": coach_id}
+    return db.connection().execute(stmt, params).all()
@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from datetime import timezone
+from typing import Callable, List, Optional
+
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Jobs run on wall-clock time. A job registered with last_run is due
+# ``interval`` after that persisted time rather than after this process
+# started, so a daily job still runs when the API restarts more often than
+# daily, and it is not run again when another worker has just run it.
+
+LastRun = Callable[[], Optional[float]]
+
+
+def refreshed_at(job: str) -> LastRun:
+    """Last run of a refresh, from its refresh_watermarks row, as a Unix time."""
+    def last_run() -> Optional[float]:
+        db = SessionLocal()
+        try:
+            mark = db.get(models.RefreshWatermark, job)
+        finally:
+            db.close()
+        if mark is None or mark.refreshed_at is None:
+            return None
+        return mark.refreshed_at.replace(tzinfo=timezone.utc).timestamp()
+    return last_run
+
+
+class _Job:
+    def __init__(self, name: str, func: Callable[[], object], interval: float, last_run: Optional[LastRun] = None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.last_run = last_run
+        # Persisted jobs check their last run as soon as the scheduler starts.
+        self.next_run = time.time() + (interval if last_run is None else 0)
+
+    def due_at(self) -> Optional[float]:
+        """When another run already moved this job's next run, or None to run now."""
+        if self.last_run is None:
+            return None
+        try:
+            previous = self.last_run()
+        except Exception:
+            logger.exception("Reading the last run of %s failed", self.name)
+            return None
+        if previous is not None and previous + self.interval > time.time():
+            return previous + self.interval
+        return None
+
+
+class Scheduler:
+    """Runs registered jobs at a fixed interval on one daemon thread."""
+
+    def __init__(self):
+        self._jobs: List[_Job] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_job(self, name: str, func: Callable[[], object], interval: float, last_run: Optional[LastRun] = None):
+        if interval > 0:
+            self._jobs.append(_Job(name, func, interval, last_run))
+
+    def start(self):
+        if self._thread is not None or not self._jobs:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.time()
+            for job in self._jobs:
+                if job.next_run > now:
+                    continue
+                due_at = job.due_at()
+                if due_at is not None:
+                    job.next_run = due_at
+                    continue
+                try:
+                    job.func()
+                except Exception:
+                    logger.exception("Scheduled job %s failed", job.name)
+                job.next_run = time.time() + job.interval
+            wait = min(job.next_run for job in self._jobs) - time.time()
+            self._stop.wait(max(wait, 0))
+
+
+scheduler = Scheduler()
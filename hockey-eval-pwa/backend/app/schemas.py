@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -85,7 +85,7 @@ class EvaluationBase(BaseModel):
     areas_for_improvement: Optional[str] = None
 
 class EvaluationCreate(EvaluationBase):
-    pass
+    feedback_template_ids: List[int] = []
 
 class Evaluation(BaseModel):
     id: int
@@ -129,3 +129,167 @@ class PlayerWithEvaluations(Player):
     
     class Config:
         from_attributes = True
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    player_id: int
+    name: str
+    position: Optional[str] = None
+    team_id: Optional[int] = None
+    evaluation_count: int
+    skills: Dict[str, float]
+    overall: float
+
+class SkillAverages(BaseModel):
+    normalized: bool
+    evaluation_count: int
+    player_count: int
+    skills: Dict[str, float]
+
+class EvaluatorNormalization(BaseModel):
+    evaluator_name: str
+    skill: str
+    offset: float
+    scale: float
+    sample_count: int
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class SeasonSkillSummary(BaseModel):
+    team_id: Optional[int] = None
+    age_group: Optional[str] = None
+    season: str
+    period: str
+    skill: str
+    evaluation_count: int
+    player_count: int
+    average: float
+    minimum: int
+    maximum: int
+    refreshed_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class SimilarPlayer(BaseModel):
+    player_id: int
+    name: str
+    position: Optional[str] = None
+    age_group: Optional[str] = None
+    team_id: Optional[int] = None
+    distance: float
+    skills: Dict[str, float]
+
+class SkillForecast(BaseModel):
+    skill: str
+    slope_per_year: float
+    current: float
+    forecast: float
+    lower: float
+    upper: float
+
+class PlayerForecast(BaseModel):
+    player_id: int
+    horizon_days: int
+    evaluation_count: int
+    last_evaluation_at: datetime
+    fitted_at: Optional[datetime] = None
+    projected_overall: float
+    on_track: bool
+    skills: List[SkillForecast]
+
+class PlayerSummary(BaseModel):
+    id: int
+    name: str
+    jersey_number: Optional[int] = None
+    position: Optional[str] = None
+    age_group: Optional[str] = None
+    team_id: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+class DuplicateCandidate(BaseModel):
+    player: PlayerSummary
+    duplicate: PlayerSummary
+    score: float
+    reasons: List[str]
+
+class PlayerMergeRequest(BaseModel):
+    duplicate_ids: List[int]
+
+class PlayerMergeResult(BaseModel):
+    player: Player
+    merged_player_ids: List[int]
+    evaluations_moved: int
+
+class TeamBalanceRequest(BaseModel):
+    player_ids: List[int]
+    team_count: int = 2
+    time_budget_ms: int = 200
+    balance_positions: bool = True
+    keep_apart: List[List[int]] = []
+    seed: Optional[int] = None
+
+class BalancedTeam(BaseModel):
+    index: int
+    player_ids: List[int]
+    positions: Dict[str, int]
+    average_skills: Dict[str, float]
+    average_overall: float
+
+class TeamBalanceResult(BaseModel):
+    teams: List[BalancedTeam]
+    score: float
+    iterations: int
+    keep_apart_violations: int
+    unrated_player_ids: List[int]
+
+class PlayerLatest(BaseModel):
+    player_id: int
+    date: Optional[datetime] = None
+    evaluation_count: int
+    skills: List[int]
+    overall: float
+
+class Bootstrap(BaseModel):
+    user: User
+    teams: List[Team]
+    players: List[Player]
+    feedback_templates: List[FeedbackTemplate]
+    skills: List[str]
+    latest: List[PlayerLatest]
+
+class InvalidationLag(BaseModel):
+    last: float
+    mean: float
+    p50: float
+    p95: float
+    max: float
+    samples: int
+
+class InvalidationMetrics(BaseModel):
+    transport: str
+    origin: str
+    listening: bool
+    published: int
+    received: int
+    reconnects: int
+    lag_ms: Optional[InvalidationLag] = None
@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import case, extract
+
+# Hockey seasons run August through July and are labelled "2025-26".
+SEASON_START_MONTH = 8
+PERIODS = ("fall", "winter", "spring")
+
+
+def season_start_year(date: datetime) -> int:
+    return date.year if date.month >= SEASON_START_MONTH else date.year - 1
+
+
+def season_label(start_year: int) -> str:
+    return f"{start_year}-{(start_year + 1) % 100:02d}"
+
+
+def season_for(date: datetime) -> str:
+    return season_label(season_start_year(date))
+
+
+def season_bounds(label: str) -> Tuple[datetime, datetime]:
+    start_year = int(label.split("-")[0])
+    return (
+        datetime(start_year, SEASON_START_MONTH, 1),
+        datetime(start_year + 1, SEASON_START_MONTH, 1),
+    )
+
+
+def period_for(date: datetime) -> str:
+    if date.month >= SEASON_START_MONTH and date.month <= 11:
+        return "fall"
+    if date.month == 12 or date.month <= 2:
+        return "winter"
+    return "spring"
+
+
+def season_year_expr(column):
+    return extract("year", column) - case((extract("month", column) < SEASON_START_MONTH, 1), else_=0)
+
+
+def period_expr(column):
+    month = extract("month", column)
+    return case(
+        (month.between(SEASON_START_MONTH, 11), "fall"),
+        ((month == 12) | (month <= 2), "winter"),
+        else_="spring",
+    )
@@ -0,0 +1,149 @@
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import invalidation, models, packed
+
+# Per-coach matrix of player skill vectors for "players like this one".
+# Each row holds a player's latest ratings and a running sum for the
+# average; queries compute squared distances to every row in one NumPy
+# expression and take the k smallest with argpartition. Indexes are built
+# on first use, patched in place on evaluation writes and rebuilt when
+# players are added, edited or deleted.
+#
+# Builds read outside the lock, so every change that a build in flight could
+# have missed bumps the coach's generation, and the build is only cached if
+# the generation is unchanged when it finishes.
+
+BASES = ("latest", "average")
+
+_lock = threading.Lock()
+_indexes: Dict[int, "SimilarityIndex"] = {}
+_generations: Counter = Counter()
+_epoch = 0
+
+
+class SimilarityIndex:
+    def __init__(
+        self,
+        player_ids: np.ndarray,
+        latest: np.ndarray,
+        sums: np.ndarray,
+        counts: np.ndarray,
+        age_groups: np.ndarray,
+    ):
+        self.player_ids = player_ids
+        self.latest = latest.astype(np.float32)
+        self.sums = sums.astype(np.float64)
+        self.counts = counts.astype(np.int64)
+        self.average = (self.sums / self.counts[:, None]).astype(np.float32)
+        groups, self.age_group_codes = np.unique(age_groups.astype(str), return_inverse=True)
+        self.age_group_index = {str(group): code for code, group in enumerate(groups)}
+        self.rows = {int(player_id): row for row, player_id in enumerate(player_ids)}
+
+    @classmethod
+    def from_records(cls, records: np.ndarray, age_group_by_player: Dict[int, Optional[str]]) -> "SimilarityIndex":
+        """Build from ``packed.RECORD_DTYPE`` records sorted oldest first."""
+        player_ids, index, counts = np.unique(records["player_id"], return_inverse=True, return_counts=True)
+        skills = records["skills"].astype(np.float64)
+        sums = np.zeros((len(player_ids), skills.shape[1]))
+        np.add.at(sums, index, skills)
+        # The last occurrence of each player in date order is their latest.
+        last = len(records) - 1 - np.unique(index[::-1], return_index=True)[1]
+        age_groups = np.array([age_group_by_player.get(int(p)) for p in player_ids], dtype=object)
+        return cls(player_ids.astype(np.int64), skills[last], sums, counts, age_groups)
+
+    def vectors(self, basis: str) -> np.ndarray:
+        return self.average if basis == "average" else self.latest
+
+    def record(self, player_id: int, skills: Iterable[int]) -> bool:
+        row = self.rows.get(player_id)
+        if row is None:
+            return False
+        skills = np.asarray(list(skills), dtype=np.float64)
+        self.latest[row] = skills
+        self.sums[row] += skills
+        self.counts[row] += 1
+        self.average[row] = self.sums[row] / self.counts[row]
+        return True
+
+    def nearest(
+        self, player_id: int, k: int, basis: str = "latest", age_group: Optional[str] = None
+    ) -> List[Tuple[int, float, np.ndarray]]:
+        row = self.rows.get(player_id)
+        if row is None:
+            return []
+        vectors = self.vectors(basis)
+        distances = np.sum((vectors - vectors[row]) ** 2, axis=1)
+        distances[row] = np.inf
+        if age_group is not None:
+            distances[self.age_group_codes != self.age_group_index.get(str(age_group), -1)] = np.inf
+        candidates = int(np.count_nonzero(np.isfinite(distances)))
+        k = min(k, candidates)
+        if k <= 0:
+            return []
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+        return [
+            (int(self.player_ids[i]), float(np.sqrt(distances[i])), vectors[i])
+            for i in nearest
+        ]
+
+
+def build(db: Session, coach_id: int) -> SimilarityIndex:
+    records = packed.load_skill_records(db, coach_id)
+    age_groups = dict(db.execute(
+        select(models.Player.id, models.Player.age_group).where(models.Player.coach_id == coach_id)
+    ).all())
+    return SimilarityIndex.from_records(records, age_groups)
+
+
+def _generation(coach_id: int) -> Tuple[int, int]:
+    return _epoch, _generations[coach_id]
+
+
+def get_index(db: Session, coach_id: int) -> SimilarityIndex:
+    with _lock:
+        index = _indexes.get(coach_id)
+        if index is not None:
+            return index
+        generation = _generation(coach_id)
+    index = build(db, coach_id)
+    with _lock:
+        if _generation(coach_id) == generation:
+            _indexes[coach_id] = index
+    return index
+
+
+def invalidate(coach_id: Optional[int]):
+    """Drop ``coach_id``'s index, or every index when None."""
+    global _epoch
+    with _lock:
+        if coach_id is None:
+            _indexes.clear()
+            _epoch += 1
+        else:
+            _indexes.pop(coach_id, None)
+            _generations[coach_id] += 1
+
+
+def record_evaluations(coach_id: int, evaluations: Iterable[models.Evaluation]):
+    with _lock:
+        _generations[coach_id] += 1
+        index = _indexes.get(coach_id)
+        if index is None:
+            return
+        for evaluation in evaluations:
+            if not index.record(evaluation.player_id, (getattr(evaluation, skill) for skill in models.SKILLS)):
+                # First evaluation for this player: rebuild on next query.
+                _indexes.pop(coach_id, None)
+                return
+
+
+invalidation.subscribe("players", invalidate)
+# The writing worker patches its own index in record_evaluations().
+invalidation.subscribe("evaluations", invalidate, remote_only=True)
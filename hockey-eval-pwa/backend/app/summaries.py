@@ -0,0 +1,163 @@
+import argparse
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import and_, delete, distinct, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from . import models, refresh_queue, seasons
+from .database import SessionLocal, advisory_lock
+
+# Season summaries are materialized into season_skill_summaries, one row per
+# (coach, team, age group, season, period, skill). A partition is a
+# (coach, season) pair: a refresh only rebuilds partitions that received new
+# evaluations since the last round, plus every season of coaches that asked
+# for a rebuild because a player's team or age group changed. Both arrive
+# through refresh_queue.
+#
+# Every API worker runs the scheduler, so rebuilds take an advisory lock on
+# JOB_NAME: a scheduled refresh that finds it taken skips the round, and a
+# coach's on-demand rebuild waits for it.
+
+JOB_NAME = "season_summaries"
+
+
+def request_refresh(db: Session, coach_id: int):
+    refresh_queue.request(db, JOB_NAME, coach_id)
+
+
+def _season_filter(column, start_years: Iterable[int]):
+    ranges = []
+    for start_year in sorted(start_years):
+        start, end = seasons.season_bounds(seasons.season_label(start_year))
+        ranges.append(and_(column >= start, column < end))
+    return or_(*ranges)
+
+
+def _summary_rows(db: Session, coach_id: int, start_years: Optional[Set[int]], refreshed_at: datetime):
+    e, p, t = models.Evaluation, models.Player, models.Team
+    source = select(
+        seasons.season_year_expr(e.date).label("season_year"),
+        seasons.period_expr(e.date).label("period"),
+        p.team_id.label("team_id"),
+        func.coalesce(p.age_group, t.age_group).label("age_group"),
+        e.id.label("evaluation_id"),
+        e.player_id.label("player_id"),
+        *[getattr(e, skill).label(skill) for skill in models.SKILLS],
+    ).join(p, p.id == e.player_id).outerjoin(t, t.id == p.team_id).where(
+        p.coach_id == coach_id, e.date.isnot(None)
+    )
+    if start_years is not None:
+        source = source.where(_season_filter(e.date, start_years))
+    source = source.subquery()
+
+    keys = [source.c.season_year, source.c.period, source.c.team_id, source.c.age_group]
+    aggregates = []
+    for skill in models.SKILLS:
+        column = source.c[skill]
+        aggregates += [func.avg(column), func.min(column), func.max(column)]
+    stmt = select(
+        *keys,
+        func.count(source.c.evaluation_id),
+        func.count(distinct(source.c.player_id)),
+        *aggregates,
+    ).group_by(*keys)
+
+    rows = []
+    for season_year, period, team_id, age_group, evaluation_count, player_count, *stats in db.execute(stmt):
+        for i, skill in enumerate(models.SKILLS):
+            average, minimum, maximum = stats[3 * i:3 * i + 3]
+            rows.append({
+                "coach_id": coach_id,
+                "team_id": team_id,
+                "age_group": age_group,
+                "season": seasons.season_label(int(season_year)),
+                "period": period,
+                "skill": skill,
+                "evaluation_count": evaluation_count,
+                "player_count": player_count,
+                "average": float(average),
+                "minimum": minimum,
+                "maximum": maximum,
+                "refreshed_at": refreshed_at,
+            })
+    return rows
+
+
+def _rebuild(db: Session, partitions: Dict[int, Optional[Set[int]]], started_at: datetime) -> int:
+    # Archived seasons are no longer in evaluations; keep their summaries as they are.
+    archived = set(db.execute(select(models.ArchivedSeason.season)).scalars())
+    table = models.SeasonSkillSummary.__table__
+    rebuilt = 0
+    for coach_id, start_years in partitions.items():
+        if start_years is not None:
+            start_years = {y for y in start_years if seasons.season_label(y) not in archived}
+            if not start_years:
+                continue
+        stale = delete(table).where(table.c.coach_id == coach_id, table.c.season.notin_(archived))
+        if start_years is not None:
+            stale = stale.where(table.c.season.in_([seasons.season_label(y) for y in start_years]))
+        db.execute(stale)
+        rows = [
+            row for row in _summary_rows(db, coach_id, start_years, started_at)
+            if row["season"] not in archived
+        ]
+        if rows:
+            db.execute(insert(table), rows)
+        rebuilt += len(start_years) if start_years is not None else len({row["season"] for row in rows})
+    return rebuilt
+
+
+def refresh(db: Session, full: bool = False) -> int:
+    """Rebuild touched season partitions. Returns the number rebuilt."""
+    if not advisory_lock(db, JOB_NAME):
+        return 0
+    started_at = datetime.utcnow()
+    mark = models.RefreshWatermark.for_job(db, JOB_NAME)
+    queued = refresh_queue.take(db, JOB_NAME)
+
+    # coach_id -> season start years to rebuild, or None for every season
+    partitions: Dict[int, Optional[Set[int]]] = {}
+    if full:
+        for coach_id in db.execute(select(models.User.id)).scalars():
+            partitions[coach_id] = None
+    else:
+        for coach_id, _, season_year in queued:
+            if season_year is None:
+                partitions[coach_id] = None
+            elif partitions.get(coach_id, set()) is not None:
+                partitions.setdefault(coach_id, set()).add(season_year)
+
+    rebuilt = _rebuild(db, partitions, started_at)
+    mark.refreshed_at = started_at
+    db.commit()
+    return rebuilt
+
+
+def refresh_coach(db: Session, coach_id: int) -> int:
+    """Rebuild every season of one coach now. Returns the number rebuilt."""
+    advisory_lock(db, JOB_NAME, wait=True)
+    refresh_queue.take(db, JOB_NAME, coach_id)
+    rebuilt = _rebuild(db, {coach_id: None}, datetime.utcnow())
+    db.commit()
+    return rebuilt
+
+
+def refresh_pending():
+    db = SessionLocal()
+    try:
+        refresh(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh materialized season summaries")
+    parser.add_argument("--full", action="store_true", help="rebuild every partition")
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        count = refresh(db, full=args.full)
+    finally:
+        db.close()
+    print(f"Rebuilt {count} season partition(s)")
@@ -0,0 +1,133 @@
+import time
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Splits a pool into teams whose average skill vectors are as close as
+# possible. A greedy snake draft (per position when positions are balanced)
+# gives the starting split; simulated annealing then evaluates a batch of
+# random swaps at once as (batch, teams, skills) arrays, takes the best one
+# and keeps going until the time budget runs out. Swaps never change team
+# sizes, and with position balancing they only exchange players of the same
+# position, so the draft's position spread is preserved.
+
+SKILL_WEIGHT = 0.25
+KEEP_APART_PENALTY = 100.0
+BATCH_SIZE = 64
+START_TEMPERATURE = 0.05
+
+
+class Assignment(NamedTuple):
+    teams: np.ndarray
+    score: float
+    iterations: int
+    violations: int
+
+
+def _cost(team_sums: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """Imbalance of ``(..., teams, skills)`` sums; lower is better."""
+    averages = team_sums / sizes[:, None]
+    return averages.sum(-1).var(-1) + SKILL_WEIGHT * averages.var(-2).sum(-1)
+
+
+def _draft(skills: np.ndarray, groups: np.ndarray, team_count: int) -> np.ndarray:
+    overall = skills.sum(1)
+    order = np.lexsort((-overall, groups))
+    teams = np.empty(len(skills), dtype=np.int64)
+    sizes = np.zeros(team_count, dtype=np.int64)
+    totals = np.zeros(team_count)
+    group_counts = np.zeros((team_count, groups.max() + 1), dtype=np.int64)
+    for i in order:
+        # Fewest of this position, then smallest roster, then weakest total.
+        team = np.lexsort((totals, sizes, group_counts[:, groups[i]]))[0]
+        teams[i] = team
+        sizes[team] += 1
+        totals[team] += overall[i]
+        group_counts[team, groups[i]] += 1
+    return teams
+
+
+def _violations(teams: np.ndarray, keep_apart: np.ndarray) -> np.ndarray:
+    if not len(keep_apart):
+        return np.zeros(teams.shape[:-1], dtype=np.int64)
+    return (teams[..., keep_apart[:, 0]] == teams[..., keep_apart[:, 1]]).sum(-1)
+
+
+def balance(
+    skills: np.ndarray,
+    positions: Sequence[str],
+    team_count: int,
+    time_budget_ms: float,
+    balance_positions: bool = True,
+    keep_apart: Sequence[Tuple[int, int]] = (),
+    seed: Optional[int] = None,
+) -> Assignment:
+    """Assign each row of ``skills`` to one of ``team_count`` teams.
+
+    ``keep_apart`` holds pairs of row indexes that should not share a team.
+    Returns the best assignment found within ``time_budget_ms``.
+    """
+    rng = np.random.default_rng(seed)
+    skills = np.asarray(skills, dtype=np.float64)
+    n = len(skills)
+    if balance_positions:
+        _, groups = np.unique(np.asarray(positions, dtype=str), return_inverse=True)
+    else:
+        groups = np.zeros(n, dtype=np.int64)
+    pairs = np.asarray(keep_apart, dtype=np.int64).reshape(-1, 2)
+
+    teams = _draft(skills, groups, team_count)
+    sizes = np.bincount(teams, minlength=team_count).astype(np.float64)
+    team_sums = np.zeros((team_count, skills.shape[1]))
+    np.add.at(team_sums, teams, skills)
+    score = float(_cost(team_sums, sizes)) + KEEP_APART_PENALTY * int(_violations(teams, pairs))
+    best_teams, best_score = teams.copy(), score
+
+    members = [np.flatnonzero(groups == g) for g in range(groups.max() + 1)]
+    members = [m for m in members if len(m) > 1]
+    group_sizes = np.array([len(m) for m in members], dtype=np.int64)
+    group_starts = np.concatenate(([0], np.cumsum(group_sizes)[:-1])) if members else group_sizes
+    flat_members = np.concatenate(members) if members else group_sizes
+    group_weights = group_sizes / group_sizes.sum() if members else group_sizes
+
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    iterations = 0
+    batch = np.arange(BATCH_SIZE)
+    while members and time.perf_counter() < deadline:
+        # Sample swaps within a position group, weighted by group size.
+        group = rng.choice(len(members), BATCH_SIZE, p=group_weights)
+        offsets = (rng.random((2, BATCH_SIZE)) * group_sizes[group]).astype(np.int64)
+        first, second = flat_members[group_starts[group] + offsets]
+        team_a, team_b = teams[first], teams[second]
+        valid = team_a != team_b
+        if not valid.any():
+            iterations += 1
+            continue
+
+        delta = skills[second] - skills[first]
+        candidate_sums = np.broadcast_to(team_sums, (BATCH_SIZE,) + team_sums.shape).copy()
+        candidate_sums[batch, team_a] += delta
+        candidate_sums[batch, team_b] -= delta
+        candidate_scores = _cost(candidate_sums, sizes)
+        if len(pairs):
+            candidate_teams = np.broadcast_to(teams, (BATCH_SIZE, n)).copy()
+            candidate_teams[batch, first] = team_b
+            candidate_teams[batch, second] = team_a
+            candidate_scores = candidate_scores + KEEP_APART_PENALTY * _violations(candidate_teams, pairs)
+        candidate_scores[~valid] = np.inf
+
+        pick = int(np.argmin(candidate_scores))
+        change = candidate_scores[pick] - score
+        elapsed = 1 - (deadline - time.perf_counter()) / (time_budget_ms / 1000)
+        temperature = START_TEMPERATURE * max(1 - elapsed, 1e-3)
+        if change < 0 or rng.random() < np.exp(-change / temperature):
+            i, j = first[pick], second[pick]
+            teams[i], teams[j] = team_b[pick], team_a[pick]
+            team_sums = candidate_sums[pick]
+            score = float(candidate_scores[pick])
+            if score < best_score:
+                best_teams, best_score = teams.copy(), score
+        iterations += 1
+
+    return Assignment(best_teams, best_score, iterations, int(_violations(best_teams, pairs)))
+
@@ -0,0 +1,171 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.orm import Session
+
+from . import invalidation, models
+from .database import SessionLocal
+
+# Per-coach prefix index over feedback templates for autocomplete. Every word
+# of a template's name, category and text is stored in one sorted array, so a
+# prefix lookup is two bisects. Indexes are built on first use and dropped
+# whenever the coach creates or deletes a template.
+#
+# Template usage from evaluations is counted in memory and added to
+# times_used in one batched UPDATE by flush_pending().
+#
+# An index is built from a database snapshot outside the lock. Anything that
+# makes such a snapshot stale (a flush moving counts from _pending into the
+# table, an invalidation) bumps the coach's generation, and a build only
+# installs its index if the generation has not moved since it started.
+
+_WORD = re.compile(r"\w+")
+
+_lock = threading.Lock()
+_indexes: Dict[int, "CoachTemplateIndex"] = {}
+_pending: Counter = Counter()
+_generations: Counter = Counter()
+_epoch = 0
+
+
+def _words(*texts) -> List[str]:
+    return [word for text in texts if text for word in _WORD.findall(text.lower())]
+
+
+class CoachTemplateIndex:
+    def __init__(self, templates: Iterable[models.FeedbackTemplate]):
+        self.templates: Dict[int, dict] = {}
+        entries: List[Tuple[str, int]] = []
+        for template in templates:
+            self.templates[template.id] = {
+                "id": template.id,
+                "coach_id": template.coach_id,
+                "name": template.name,
+                "category": template.category,
+                "text": template.text,
+                "created_at": template.created_at,
+                "times_used": template.times_used or 0,
+            }
+            entries.extend((word, template.id) for word in set(_words(template.name, template.category, template.text)))
+        entries.sort()
+        self._words = [word for word, _ in entries]
+        self._ids = [template_id for _, template_id in entries]
+
+    def _prefix(self, prefix: str) -> set:
+        start = bisect_left(self._words, prefix)
+        end = bisect_left(self._words, prefix + "\uffff", start)
+        return set(self._ids[start:end])
+
+    def suggest(self, query: str, limit: int = 10) -> List[dict]:
+        words = _words(query)
+        if not words:
+            matches = set(self.templates)
+        else:
+            matches = self._prefix(words[0])
+            for word in words[1:]:
+                if not matches:
+                    break
+                matches &= self._prefix(word)
+        ranked = sorted(
+            (self.templates[template_id] for template_id in matches),
+            key=lambda template: (-template["times_used"], template["name"].lower()),
+        )
+        return ranked[:limit]
+
+
+def _generation(coach_id: int) -> Tuple[int, int]:
+    return _epoch, _generations[coach_id]
+
+
+def _bump(coach_ids: Iterable[int]):
+    for coach_id in coach_ids:
+        _generations[coach_id] += 1
+
+
+def get_index(db: Session, coach_id: int) -> CoachTemplateIndex:
+    with _lock:
+        index = _indexes.get(coach_id)
+        if index is not None:
+            return index
+        generation = _generation(coach_id)
+    templates = db.query(models.FeedbackTemplate).filter(
+        models.FeedbackTemplate.coach_id == coach_id
+    ).all()
+    index = CoachTemplateIndex(templates)
+    with _lock:
+        for (pending_coach, template_id), uses in _pending.items():
+            if pending_coach == coach_id and template_id in index.templates:
+                index.templates[template_id]["times_used"] += uses
+        # Otherwise this answers the current request only; the next one rebuilds.
+        if _generation(coach_id) == generation:
+            _indexes[coach_id] = index
+    return index
+
+
+def invalidate(coach_id: Optional[int]):
+    """Drop ``coach_id``'s index, or every index when None."""
+    global _epoch
+    with _lock:
+        if coach_id is None:
+            _indexes.clear()
+            _epoch += 1
+        else:
+            _indexes.pop(coach_id, None)
+            _bump([coach_id])
+
+
+def record_use(coach_id: int, template_ids: Iterable[int]):
+    with _lock:
+        index = _indexes.get(coach_id)
+        for template_id in template_ids:
+            _pending[(coach_id, template_id)] += 1
+            if index is not None and template_id in index.templates:
+                index.templates[template_id]["times_used"] += 1
+
+
+def flush(db: Session) -> int:
+    """Write buffered usage counts to times_used. Returns templates updated."""
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        coach_ids = {coach_id for coach_id, _ in batch}
+        _bump(coach_ids)
+    if not batch:
+        return 0
+    template = models.FeedbackTemplate.__table__
+    try:
+        db.execute(
+            update(template).where(
+                template.c.id == bindparam("template_id"),
+                template.c.coach_id == bindparam("template_coach_id"),
+            ).values(times_used=func.coalesce(template.c.times_used, 0) + bindparam("uses")),
+            [
+                {"template_id": template_id, "template_coach_id": coach_id, "uses": uses}
+                for (coach_id, template_id), uses in batch.items()
+            ],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        with _lock:
+            _pending.update(batch)
+            _bump(coach_ids)
+        raise
+    with _lock:
+        _bump(coach_ids)
+    return len(batch)
+
+
+def flush_pending():
+    db = SessionLocal()
+    try:
+        flush(db)
+    finally:
+        db.close()
+
+
+invalidation.subscribe("templates", invalidate)
@@ -0,0 +1,66 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import time
+
+from . import jobs
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def work(worker_id: str, poll_interval: float):
+    db = SessionLocal()
+    try:
+        while True:
+            try:
+                jobs.requeue_stale(db)
+                if not jobs.run_pending(db, worker_id):
+                    time.sleep(poll_interval)
+            except Exception:
+                logger.exception("Worker %s loop failed", worker_id)
+                db.rollback()
+                time.sleep(poll_interval)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--processes", type=int, default=int(os.getenv("JOB_WORKER_PROCESSES", os.cpu_count() or 1)))
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--once", action="store_true", help="drain the queue in this process and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    if args.once:
+        db = SessionLocal()
+        try:
+            processed = jobs.run_pending(db, prefix)
+        finally:
+            db.close()
+        print(f"Processed {processed} job(s)")
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=work, args=(f"{prefix}:{i}", args.poll_interval), name=f"job-worker-{i}")
+        for i in range(max(args.processes, 1))
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
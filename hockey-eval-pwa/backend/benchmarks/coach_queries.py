@@ -0,0 +1,105 @@
+"""Compare per-request query CPU for ad-hoc ORM queries and app.repository.
+
+    poetry run python benchmarks/coach_queries.py [--calls 5000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app import models, repository  # noqa: E402
+
+USERNAME = "coach"
+
+
+def orm_user(db, username):
+    return db.query(models.User).filter(models.User.username == username).first()
+
+
+def orm_player(db, player_id, coach_id):
+    return db.query(models.Player).filter(
+        models.Player.id == player_id,
+        models.Player.coach_id == coach_id
+    ).first()
+
+
+def orm_owns_player(db, player_id, coach_id):
+    return orm_player(db, player_id, coach_id) is not None
+
+
+def orm_evaluations(db, coach_id, player_id):
+    query = db.query(models.Evaluation).filter(models.Evaluation.evaluator_id == coach_id)
+    if player_id:
+        query = query.filter(models.Evaluation.player_id == player_id)
+    return query.order_by(models.Evaluation.date.desc()).all()
+
+
+def seed(db, players):
+    coach = models.User(email="coach@example.com", username=USERNAME, hashed_password="x")
+    db.add(coach)
+    db.flush()
+    for i in range(players):
+        player = models.Player(name=f"Player {i}", coach_id=coach.id)
+        db.add(player)
+        db.flush()
+        for day in range(4):
+            db.add(models.Evaluation(
+                player_id=player.id, evaluator_id=coach.id, evaluator_name="Coach",
+                evaluation_type="game", **{skill: 1 + (i + day) % 5 for skill in models.SKILLS}
+            ))
+    db.commit()
+    return coach.id
+
+
+def measure(db, calls, player_count, lookup):
+    # Identity-map hits would hide query costs, so every call gets a clean session.
+    started = time.process_time()
+    for i in range(calls):
+        lookup(db, 1 + i % player_count)
+        db.expunge_all()
+    return (time.process_time() - started) / calls * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--players", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        coach_id = seed(db, args.players)
+        cases = [
+            ("user by username",
+             lambda db, pid: orm_user(db, USERNAME),
+             lambda db, pid: repository.user_by_username(db, USERNAME)),
+            ("player for coach",
+             lambda db, pid: orm_player(db, pid, coach_id),
+             lambda db, pid: repository.player_for_coach(db, pid, coach_id)),
+            ("owns player",
+             lambda db, pid: orm_owns_player(db, pid, coach_id),
+             lambda db, pid: repository.owns_player(db, pid, coach_id)),
+            ("player evaluations",
+             lambda db, pid: orm_evaluations(db, coach_id, pid),
+             lambda db, pid: repository.evaluations_for_coach(db, coach_id, pid)),
+        ]
+        print(f"{'query':<20} {'orm us':>8} {'repo us':>8} {'saved':>7}")
+        totals = [0.0, 0.0]
+        for label, orm, repo in cases:
+            for lookup in (orm, repo):  # warm the compiled-statement cache
+                measure(db, 50, args.players, lookup)
+            before = measure(db, args.calls, args.players, orm)
+            after = measure(db, args.calls, args.players, repo)
+            totals[0] += before
+            totals[1] += after
+            print(f"{label:<20} {before:8.1f} {after:8.1f} {1 - after / before:7.0%}")
+        # A typical player request: authenticate, then load one player's data.
+        print(f"{'all four':<20} {totals[0]:8.1f} {totals[1]:8.1f} {1 - totals[1] / totals[0]:7.0%}")
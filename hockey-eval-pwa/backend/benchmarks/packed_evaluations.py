@@ -0,0 +1,93 @@
+"""Compare the JSON ORM read path with the packed skill-record path.
+
+    poetry run python benchmarks/packed_evaluations.py [--rows 100000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import models, packed, schemas  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+
+
+def seed(rows: int):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    coach = models.User(email="bench@example.com", username="bench", hashed_password="x")
+    db.add(coach)
+    db.commit()
+    db.refresh(coach)
+    players = max(rows // 20, 1)
+    db.execute(insert(models.Player), [
+        {"id": i + 1, "name": f"Player {i}", "coach_id": coach.id} for i in range(players)
+    ])
+    start = datetime(2024, 9, 1)
+    db.execute(insert(models.Evaluation), [
+        {
+            "player_id": i % players + 1,
+            "evaluator_id": coach.id,
+            "evaluator_name": "Bench",
+            "evaluation_type": "practice",
+            "date": start + timedelta(minutes=i),
+            **{skill: (i + j) % 5 + 1 for j, skill in enumerate(models.SKILLS)},
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+    coach_id = coach.id
+    db.close()
+    return coach_id
+
+
+def measure(label, func):
+    started = time.perf_counter()
+    payload = func()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} {elapsed * 1000:9.1f} ms  peak {peak / 2**20:8.1f} MiB  payload {len(payload) / 2**20:7.2f} MiB")
+    return elapsed, peak, len(payload)
+
+
+def orm_json(coach_id):
+    db = SessionLocal()
+    evaluations = db.query(models.Evaluation).filter(
+        models.Evaluation.evaluator_id == coach_id
+    ).order_by(models.Evaluation.date.desc()).all()
+    body = json.dumps([
+        schemas.Evaluation.model_validate(evaluation).model_dump(mode="json") for evaluation in evaluations
+    ]).encode()
+    db.close()
+    return body
+
+
+def packed_records(coach_id):
+    db = SessionLocal()
+    body = packed.load_skill_records(db, coach_id).tobytes()
+    db.close()
+    return body
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    coach_id = seed(args.rows)
+    print(f"{args.rows} evaluations")
+    json_stats = measure("json", lambda: orm_json(coach_id))
+    packed_stats = measure("packed", lambda: packed_records(coach_id))
+    print("ratio    time {:.1f}x  memory {:.1f}x  payload {:.1f}x".format(
+        *(a / b for a, b in zip(json_stats, packed_stats))
+    ))
@@ -0,0 +1,65 @@
+"""Time player report rendering.
+
+    poetry run python benchmarks/pdf_reports.py [--reports 200] [--periods 9]
+
+Also times the style sheet and table style construction that every report
+used to repeat and is now done once per process.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import pdf_generator  # noqa: E402
+from app.models import SKILLS  # noqa: E402
+
+
+def sample_report(rng, periods):
+    player = SimpleNamespace(name="Sample Player", jersey_number=17, position="Forward", age_group="U14")
+    recent = [
+        SimpleNamespace(
+            date=datetime(2026, 3, 1) - timedelta(days=14 * i),
+            evaluation_type="practice",
+            evaluator_name="Coach",
+            strengths="Edge work and first step",
+            areas_for_improvement="Backhand release",
+            notes="Consistent effort",
+            **dict(zip(SKILLS, rng.integers(1, 6, len(SKILLS)).tolist())),
+        )
+        for i in range(pdf_generator.RECENT_EVALUATIONS)
+    ]
+    trend = [
+        pdf_generator.TrendPoint(f"Period {i + 1}", 4, rng.uniform(1, 5, len(SKILLS)).tolist())
+        for i in range(periods)
+    ]
+    return pdf_generator.ReportData(player, recent, trend, rng.uniform(1, 5, len(SKILLS)).tolist(), 4 * periods)
+
+
+def per_call_ms(func, items):
+    started = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - started) / len(items) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--periods", type=int, default=9)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    reports = [sample_report(rng, args.periods) for _ in range(args.reports)]
+    size = len(pdf_generator.generate_player_evaluation_pdf(reports[0]))
+    render = per_call_ms(pdf_generator.generate_player_evaluation_pdf, reports)
+    styles = per_call_ms(lambda _: pdf_generator._build_styles(), reports)
+    print(f"{args.reports} reports, {args.periods} trend periods, {size / 1024:.1f} KiB each")
+    print(f"  render          {render:7.2f} ms/report")
+    print(f"  style setup     {styles:7.2f} ms (saved per report)")
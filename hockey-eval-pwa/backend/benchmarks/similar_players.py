@@ -0,0 +1,63 @@
+"""Time nearest-neighbour queries over a synthetic similarity index.
+
+    poetry run python benchmarks/similar_players.py [--players 100000] [--k 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import models  # noqa: E402
+from app.similarity import SimilarityIndex  # noqa: E402
+
+
+def python_loop(index, player_id, k):
+    target = index.latest[index.rows[player_id]].tolist()
+    scored = []
+    for row, other in enumerate(index.player_ids):
+        if other == player_id:
+            continue
+        vector = index.latest[row].tolist()
+        scored.append((sum((a - b) ** 2 for a, b in zip(vector, target)), int(other)))
+    scored.sort()
+    return scored[:k]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n, skills = args.players, len(models.SKILLS)
+    counts = rng.integers(1, 8, n)
+    latest = rng.integers(1, 6, (n, skills))
+    index = SimilarityIndex(
+        np.arange(1, n + 1),
+        latest,
+        latest * counts[:, None],
+        counts,
+        rng.choice(np.array(["U10", "U12", "U14"], dtype=object), n),
+    )
+    targets = rng.integers(1, n + 1, args.queries)
+
+    for label, kwargs in [("latest", {}), ("average", {"basis": "average"}), ("age group", {"age_group": "U12"})]:
+        started = time.perf_counter()
+        for player_id in targets:
+            index.nearest(int(player_id), args.k, **kwargs)
+        elapsed = (time.perf_counter() - started) / len(targets)
+        print(f"{label:<10} {elapsed * 1000:7.2f} ms/query over {n} players")
+
+    loops = max(args.queries // 20, 1)
+    started = time.perf_counter()
+    for player_id in targets[:loops]:
+        python_loop(index, int(player_id), args.k)
+    elapsed = (time.perf_counter() - started) / loops
+    print(f"{'py loop':<10} {elapsed * 1000:7.2f} ms/query over {n} players")
@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+import pytest
+
+# The app reads its configuration at import time, so point it at a throwaway
+# SQLite database before anything imports it. Tests use TestClient without a
+# context manager, which leaves the lifespan (scheduler, listener) stopped.
+_tmp = tempfile.mkdtemp(prefix="hockey-eval-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/test.db")
+os.environ.setdefault("ARCHIVE_DIR", os.path.join(_tmp, "archive"))
+os.environ.setdefault("RATE_LIMIT_PER_SECOND", "0")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    return TestClient(app)
+
+
+def login(client, username="coach"):
+    client.post("/api/auth/register", json={
+        "email": f"{username}@example.com", "username": username, "password": "secret"
+    })
+    response = client.post("/api/auth/login", data={"username": username, "password": "secret"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def headers(client):
+    return login(client)
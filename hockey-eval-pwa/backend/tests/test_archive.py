@@ -0,0 +1,96 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import archive, crud, invalidation, main, models, packed
+from app.database import SessionLocal
+
+
+def test_ensure_partitions_is_a_no_op_without_postgres(client):
+    db = SessionLocal()
+    try:
+        assert archive.ensure_partitions(db) == []
+    finally:
+        db.close()
+
+
+def test_partitions_are_ensured_at_startup(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(archive, "ensure_partitions_pending", lambda: calls.append(1))
+    monkeypatch.setattr(main.scheduler, "start", lambda: None)
+    monkeypatch.setattr(main.scheduler, "stop", lambda: None)
+    monkeypatch.setattr(invalidation, "start", lambda: None)
+    monkeypatch.setattr(invalidation, "stop", lambda: None)
+    with TestClient(main.app):
+        assert calls == [1]
+
+
+@pytest.fixture
+def archived(client, headers):
+    """Two evaluations archived with the 2022-23 season, one still hot."""
+    coach_id = client.get("/api/auth/me", headers=headers).json()["id"]
+    db = SessionLocal()
+    try:
+        player = models.Player(name="Alex Smith", coach_id=coach_id)
+        db.add(player)
+        db.flush()
+        for date, rating in ((datetime(2022, 10, 5), 2), (datetime(2023, 3, 1), 3), (datetime.utcnow(), 4)):
+            db.add(models.Evaluation(
+                player_id=player.id, evaluator_id=coach_id, evaluator_name="Coach", evaluation_type="game",
+                date=date, notes=f"rated {rating}", **{skill: rating for skill in models.SKILLS}
+            ))
+        db.commit()
+        assert archive.archive_season(db, "2022-23") == 2
+        assert db.query(models.Evaluation).count() == 1
+        return player.id
+    finally:
+        db.close()
+
+
+ARCHIVED_RANGE = {"start": "2022-08-01T00:00:00", "end": "2023-08-01T00:00:00"}
+
+
+def test_analytics_read_archived_seasons(client, headers, archived):
+    skills = client.get("/api/analytics/skills", headers=headers).json()
+    assert skills["evaluation_count"] == 3
+    assert skills["skills"]["skating"] == 3.0
+    in_archive = client.get("/api/analytics/skills", params=ARCHIVED_RANGE, headers=headers).json()
+    assert in_archive["evaluation_count"] == 2
+    assert in_archive["skills"]["skating"] == 2.5
+    [entry] = client.get("/api/leaderboard", headers=headers).json()
+    assert entry["evaluation_count"] == 3
+
+
+def test_packed_reads_archived_seasons_without_a_start(client, headers, archived):
+    response = client.get("/api/evaluations/packed", headers=headers)
+    records = np.frombuffer(response.content, dtype=packed.RECORD_DTYPE)
+    assert records["skills"][:, 0].tolist() == [2, 3, 4]
+    response = client.get("/api/evaluations/packed", params=ARCHIVED_RANGE, headers=headers)
+    assert len(np.frombuffer(response.content, dtype=packed.RECORD_DTYPE)) == 2
+
+
+def test_export_includes_archived_seasons(client, headers, archived):
+    response = client.get("/api/export?format=ndjson&table=evaluations", headers=headers)
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["skating"] for row in rows] == [2, 3, 4]
+
+
+def test_report_includes_archived_seasons(client, headers, archived):
+    db = SessionLocal()
+    try:
+        player = db.get(models.Player, archived)
+        report = crud.player_report_data(db, player)
+        assert report.evaluation_count == 3
+        assert [point.label for point in report.trend][:2] == ["Fall 22-23", "Spring 22-23"]
+        assert [evaluation.skating for evaluation in report.recent] == [4, 3, 2]
+        in_archive = crud.player_report_data(db, player, datetime(2022, 8, 1), datetime(2023, 8, 1))
+        assert in_archive.evaluation_count == 2
+        assert [evaluation.notes for evaluation in in_archive.recent] == ["rated 3", "rated 2"]
+    finally:
+        db.close()
+    response = client.get(f"/api/players/{archived}/pdf", params=ARCHIVED_RANGE, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
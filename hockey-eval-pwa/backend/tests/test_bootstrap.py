@@ -0,0 +1,37 @@
+import gzip
+import json
+
+
+def test_etag_is_stable_across_identical_requests(client, headers):
+    first = client.get("/api/bootstrap", headers=headers)
+    second = client.get("/api/bootstrap", headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert first.headers["etag"].startswith('W/"')
+    assert first.headers["etag"] == second.headers["etag"]
+
+
+def test_matching_if_none_match_returns_an_empty_304(client, headers):
+    etag = client.get("/api/bootstrap", headers=headers).headers["etag"]
+    response = client.get("/api/bootstrap", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_etag_changes_after_a_write(client, headers):
+    etag = client.get("/api/bootstrap", headers=headers).headers["etag"]
+    client.post("/api/teams", json={"name": "Bantam A", "age_group": "U15"}, headers=headers)
+    response = client.get("/api/bootstrap", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [team["name"] for team in response.json()["teams"]] == ["Bantam A"]
+
+
+def test_gzip_body_decompresses_to_the_json(client, headers):
+    plain = client.get("/api/bootstrap", headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    with client.stream("GET", "/api/bootstrap", headers={**headers, "Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == plain.headers["etag"]
+        raw = b"".join(response.iter_raw())
+    assert json.loads(gzip.decompress(raw)) == plain.json()
@@ -0,0 +1,121 @@
+from typing import NamedTuple, Optional
+
+import pytest
+
+from app import dedupe, models, normalization, refresh_queue
+from app.database import SessionLocal
+
+
+class Row(NamedTuple):
+    id: int
+    name: str
+    jersey_number: Optional[int] = None
+    age_group: Optional[str] = None
+    position: Optional[str] = None
+
+
+@pytest.mark.parametrize("word, code", [
+    ("robert", "R163"),
+    ("rupert", "R163"),
+    ("rubin", "R150"),
+    ("ashcraft", "A261"),
+    ("tymczak", "T522"),
+    ("pfister", "P236"),
+    ("honeyman", "H555"),
+    ("lee", "L000"),
+    ("", ""),
+])
+def test_soundex(word, code):
+    assert dedupe.soundex(word) == code
+
+
+def test_normalize_name_folds_accents_case_and_punctuation():
+    assert dedupe.normalize_name("  Zoë  O'Brien-Smith ") == "zoe o brien smith"
+
+
+def test_finds_misspelled_reimport():
+    players = [
+        Row(1, "Connor McDavid", 97, "U15", "Forward"),
+        Row(2, "Conor McDavid", 97, "U15", "forward"),
+        Row(3, "Sidney Crosby", 87, "U15", "Forward"),
+    ]
+    [candidate] = dedupe.find_duplicates(players)
+    assert (candidate.player_id, candidate.duplicate_id) == (1, 2)
+    assert "same jersey number" in candidate.reasons
+    assert "same age group" in candidate.reasons
+    assert "same position" in candidate.reasons
+
+
+def test_finds_swapped_names_across_age_groups():
+    players = [Row(4, "Smith Jordan", age_group="U13"), Row(9, "Jordan Smith", age_group="U15")]
+    [candidate] = dedupe.find_duplicates(players, min_score=0.3)
+    assert (candidate.player_id, candidate.duplicate_id) == (4, 9)
+
+
+def test_conflicting_jersey_numbers_lower_the_score():
+    same = dedupe.find_duplicates([Row(1, "Sam Reinhart", 23), Row(2, "Sam Reinhardt", 23)], min_score=0)
+    different = dedupe.find_duplicates([Row(1, "Sam Reinhart", 23), Row(2, "Sam Reinhardt", 41)], min_score=0)
+    assert same[0].score > different[0].score
+    assert "different jersey numbers" in different[0].reasons
+
+
+def test_strangers_are_not_reported():
+    players = [Row(1, "Alex Ovechkin", 8, "U15"), Row(2, "Nathan MacKinnon", 29, "U15"), Row(3, "")]
+    assert dedupe.find_duplicates(players, min_score=0) == []
+
+
+def test_results_sorted_and_limited():
+    players = [
+        Row(1, "Cale Makar", 8, "U15"), Row(2, "Cale Makar", 8, "U15"),
+        Row(3, "Quinn Hughes", 43, "U15"), Row(4, "Quin Hughes", None, "U15"),
+    ]
+    candidates = dedupe.find_duplicates(players, min_score=0.5)
+    assert [(c.player_id, c.duplicate_id) for c in candidates] == [(1, 2), (3, 4)]
+    assert candidates[0].score >= candidates[1].score
+    assert dedupe.find_duplicates(players, min_score=0.5, limit=1) == candidates[:1]
+
+
+def test_oversized_blocks_are_skipped(monkeypatch):
+    monkeypatch.setattr(dedupe, "MAX_BLOCK_SIZE", 2)
+    players = [Row(i, "Jack Hughes") for i in range(3)]
+    assert dedupe.find_duplicates(players) == []
+
+
+def test_duplicates_route(client, headers):
+    for name in ("Mitch Marner", "Mitch Marnor", "Auston Matthews"):
+        client.post("/api/players", json={"name": name, "jersey_number": 16}, headers=headers)
+    response = client.get("/api/players/duplicates?min_score=0.5", headers=headers)
+    assert response.status_code == 200
+    [candidate] = response.json()
+    assert {candidate["player"]["name"], candidate["duplicate"]["name"]} == {"Mitch Marner", "Mitch Marnor"}
+
+
+def test_merge_queues_a_normalization_refit(client, headers):
+    ids = [
+        client.post("/api/players", json={"name": name}, headers=headers).json()["id"]
+        for name in ("Mitch Marner", "Mitch Marnor")
+    ]
+    skills = {skill: 3 for skill in models.SKILLS}
+    client.post("/api/evaluations", json={
+        "player_id": ids[1], "evaluator_name": "Coach", "evaluation_type": "game", "skills": skills
+    }, headers=headers)
+    db = SessionLocal()
+    try:
+        refresh_queue.take(db, normalization.JOB_NAME)
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.post(f"/api/players/{ids[0]}/merge", json={"duplicate_ids": [ids[1]]}, headers=headers)
+    assert response.json()["evaluations_moved"] == 1
+    db = SessionLocal()
+    try:
+        assert len(refresh_queue.take(db, normalization.JOB_NAME)) == 1
+    finally:
+        db.close()
+
+
+def test_leaderboard_limit_is_bounded(client, headers):
+    assert client.get("/api/leaderboard?limit=0", headers=headers).status_code == 422
+    assert client.get("/api/leaderboard?limit=501", headers=headers).status_code == 422
+    assert client.get("/api/leaderboard?limit=500", headers=headers).status_code == 200
@@ -0,0 +1,101 @@
+import csv
+import gzip
+import io
+import json
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from app import archive, export, models
+from app.database import SessionLocal
+
+EVALUATIONS = 7
+
+
+@pytest.fixture
+def coach_id(client, headers, monkeypatch):
+    # Small chunks so every format goes through several of them.
+    monkeypatch.setattr(export, "CHUNK_ROWS", 3)
+    coach_id = client.get("/api/auth/me", headers=headers).json()["id"]
+    db = SessionLocal()
+    try:
+        team = models.Team(name="Hawks", coach_id=coach_id)
+        db.add(team)
+        db.flush()
+        players = [models.Player(name=name, coach_id=coach_id, team_id=team.id, photo_url="data:,x") for name in "AB"]
+        db.add_all(players)
+        db.flush()
+        for i in range(EVALUATIONS):
+            db.add(models.Evaluation(
+                player_id=players[i % 2].id, evaluator_id=coach_id, evaluator_name="Coach, Sr.",
+                evaluation_type="game", date=datetime(2022 + i % 3, 10, 1 + i), notes='says "hi"\nthen leaves',
+                **{skill: i % 5 + 1 for skill in models.SKILLS}
+            ))
+        db.commit()
+    finally:
+        db.close()
+    return coach_id
+
+
+def body(coach_id, format, table=None, compress=False):
+    data = b"".join(export.stream(coach_id, format, table, compress))
+    return gzip.decompress(data) if compress else data
+
+
+def csv_rows(data: bytes):
+    return list(csv.DictReader(io.StringIO(data.decode("utf-8"))))
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_csv(coach_id, compress):
+    rows = csv_rows(body(coach_id, "csv", "evaluations", compress))
+    assert len(rows) == EVALUATIONS
+    assert list(rows[0]) == export.columns("evaluations")
+    assert rows[0]["notes"] == 'says "hi"\nthen leaves'
+    assert [row["date"] for row in rows] == sorted(row["date"] for row in rows)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_ndjson(coach_id, compress):
+    rows = [json.loads(line) for line in body(coach_id, "ndjson", compress=compress).splitlines()]
+    counts = {table: sum(row["table"] == table for row in rows) for table in export.TABLES}
+    assert counts == {"teams": 1, "players": 2, "evaluations": EVALUATIONS}
+    assert all("photo_url" not in row for row in rows)
+
+
+def test_zip(coach_id):
+    bundle = zipfile.ZipFile(io.BytesIO(body(coach_id, "zip")))
+    assert bundle.testzip() is None
+    assert sorted(bundle.namelist()) == sorted(f"{table}.csv" for table in export.TABLES)
+    assert len(csv_rows(bundle.read("evaluations.csv"))) == EVALUATIONS
+    assert len(csv_rows(bundle.read("players.csv"))) == 2
+
+
+def test_one_table(coach_id):
+    rows = [json.loads(line) for line in body(coach_id, "ndjson", "teams").splitlines()]
+    assert [row["name"] for row in rows] == ["Hawks"]
+
+
+def test_archived_seasons_are_merged_in_first(coach_id):
+    db = SessionLocal()
+    try:
+        assert archive.archive_season(db, "2022-23") == 3
+    finally:
+        db.close()
+    for compress in (False, True):
+        rows = csv_rows(body(coach_id, "csv", "evaluations", compress))
+        assert len(rows) == EVALUATIONS
+        assert [row["date"][:4] for row in rows[:3]] == ["2022"] * 3
+    bundle = zipfile.ZipFile(io.BytesIO(body(coach_id, "zip")))
+    assert len(csv_rows(bundle.read("evaluations.csv"))) == EVALUATIONS
+
+
+def test_export_route(client, headers, coach_id):
+    response = client.get("/api/export?format=csv&compress=true", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"].endswith("-evaluations.csv.gz")
+    assert len(csv_rows(gzip.decompress(response.content))) == EVALUATIONS
+    assert client.get("/api/export?format=zip&compress=true", headers=headers).status_code == 400
+    assert client.get("/api/export?format=xml", headers=headers).status_code == 400
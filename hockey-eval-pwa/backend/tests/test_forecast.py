@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select
+
+from app import forecast, models, normalization, refresh_queue, summaries
+from app.database import SessionLocal
+
+DAY = 86400.0
+YEAR = forecast.SECONDS_PER_YEAR
+
+
+def linear(player_id, start, per_year, days):
+    dates = np.array([1.7e9 + day * DAY for day in days])
+    ratings = np.array([[start + per_year * (date - dates[0]) / YEAR] * 2 for date in dates])
+    return np.full(len(days), player_id), dates, ratings
+
+
+def test_fit_recovers_a_linear_trend():
+    player_ids, dates, ratings = linear(7, 2.0, 1.0, [0, 60, 120, 180, 240])
+    result = forecast.fit(player_ids, dates, ratings, horizon_days=365)
+    assert result.player_ids.tolist() == [7]
+    assert result.valid.tolist() == [True]
+    np.testing.assert_allclose(result.slope[0], 1.0)
+    np.testing.assert_allclose(result.current[0], 2.0 + 240 / 365.25)
+    np.testing.assert_allclose(result.forecast[0], 2.0 + 240 / 365.25 + 365 / 365.25)
+    # A perfect fit has no residual spread, so the band collapses onto it.
+    np.testing.assert_allclose(result.lower[0], result.forecast[0])
+
+
+def test_fit_groups_players_and_clips_to_the_rating_scale():
+    first = linear(1, 4.0, 2.0, [0, 100, 200])
+    second = linear(2, 3.0, -0.5, [0, 50, 90, 150])
+    player_ids, dates, ratings = (np.concatenate(pair) for pair in zip(second, first))
+    result = forecast.fit(player_ids, dates, ratings, horizon_days=365)
+    assert result.player_ids.tolist() == [1, 2]
+    assert result.counts.tolist() == [3, 4]
+    assert (result.forecast[0] == forecast.RATING_RANGE[1]).all()
+    np.testing.assert_allclose(result.slope[1], -0.5)
+
+
+def test_fit_is_robust_to_one_outlier():
+    player_ids, dates, ratings = linear(1, 2.0, 1.0, range(0, 300, 30))
+    ratings[4] = 5.0
+    result = forecast.fit(player_ids, dates, ratings)
+    assert abs(result.slope[0, 0] - 1.0) < 0.2
+
+
+@pytest.mark.parametrize("days, valid", [
+    ([0, 40], False),
+    ([0, 10, 20], False),
+    ([0, 15, 31], True),
+])
+def test_fit_needs_enough_evaluations_over_enough_time(days, valid):
+    result = forecast.fit(*linear(1, 3.0, 0.5, days))
+    assert result.valid.tolist() == [valid]
+
+
+def test_refresh_refits_without_duplicating(client):
+    db = SessionLocal()
+    try:
+        coach = models.User(email="coach@example.com", username="coach", hashed_password="x")
+        db.add(coach)
+        db.flush()
+        player = models.Player(name="Alex Smith", coach_id=coach.id)
+        db.add(player)
+        db.flush()
+        for month in range(4):
+            db.add(models.Evaluation(
+                player_id=player.id, evaluator_id=coach.id, evaluator_name="Coach", evaluation_type="game",
+                date=datetime(2025, 9, 1) + timedelta(days=30 * month), **{skill: 2 + month % 2 for skill in models.SKILLS}
+            ))
+        db.commit()
+
+        assert forecast.refresh(db) == 1
+        assert forecast.refresh(db) == 0
+        assert forecast.refresh(db, full=True) == 1
+        assert forecast.refresh_coach(db, coach.id) == 1
+        assert db.execute(select(func.count()).select_from(models.PlayerForecast)).scalar() == len(models.SKILLS)
+    finally:
+        db.close()
+
+
+def test_late_commit_with_a_lower_id_is_not_skipped(client):
+    db = SessionLocal()
+    try:
+        coach = models.User(email="coach@example.com", username="coach", hashed_password="x")
+        db.add(coach)
+        db.flush()
+        players = [models.Player(name=name, coach_id=coach.id) for name in ("Late", "Early")]
+        db.add_all(players)
+        db.flush()
+
+        def evaluations(player, first_id):
+            return [
+                models.Evaluation(
+                    id=first_id + month, player_id=player.id, evaluator_id=coach.id, evaluator_name="Coach",
+                    evaluation_type="game", date=datetime(2025, 9, 1) + timedelta(days=30 * month),
+                    **{skill: 2 + month % 2 for skill in models.SKILLS}
+                )
+                for month in range(3)
+            ]
+
+        db.add_all(evaluations(players[1], 10))
+        db.commit()
+        assert forecast.refresh(db) == 1
+
+        # The first player's evaluations took lower ids but commit only now.
+        db.add_all(evaluations(players[0], 1))
+        db.commit()
+        assert forecast.refresh(db) == 1
+        forecast_players = set(db.execute(select(models.PlayerForecast.player_id)).scalars())
+        assert forecast_players == {player.id for player in players}
+    finally:
+        db.close()
+
+
+def test_every_incremental_refresh_is_queued():
+    assert set(refresh_queue.JOB_FIELDS) == {summaries.JOB_NAME, normalization.JOB_NAME, forecast.JOB_NAME}
@@ -0,0 +1,135 @@
+import json
+import time
+from collections import defaultdict
+
+import pytest
+from sqlalchemy import event, select
+
+from app import invalidation, models
+from app.database import SessionLocal, engine
+
+
+@pytest.fixture
+def evictions(monkeypatch):
+    monkeypatch.setattr(invalidation, "_handlers", defaultdict(list))
+    calls = []
+    invalidation.subscribe("players", lambda coach_id: calls.append(("players", coach_id)))
+    invalidation.subscribe("templates", lambda coach_id: calls.append(("templates", coach_id)), remote_only=True)
+    return calls
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    marked = []
+    monkeypatch.setattr(invalidation, "mark_write", marked.append)
+    return marked
+
+
+def payload(origin="other-host:1:abcd1234", coach_id=7, kinds=("players", "templates"), sent_at=None):
+    return json.dumps({"o": origin, "c": coach_id, "k": list(kinds), "t": time.time() if sent_at is None else sent_at})
+
+
+def test_remote_event_evicts_every_subscriber(evictions, writes):
+    received = invalidation.metrics()["received"]
+    invalidation.receive(payload(sent_at=time.time() - 0.25))
+    assert evictions == [("players", 7), ("templates", 7)]
+    # The coach's reads stay on the primary on this worker too.
+    assert writes == [7]
+    metrics = invalidation.metrics()
+    assert metrics["received"] == received + 1
+    assert metrics["lag_ms"]["last"] >= 250
+
+
+def test_own_and_malformed_events_are_ignored(evictions, writes):
+    received = invalidation.metrics()["received"]
+    invalidation.receive(payload(origin=invalidation.ORIGIN))
+    invalidation.receive("not json")
+    invalidation.receive(json.dumps({"c": 7}))
+    assert evictions == [] and writes == []
+    assert invalidation.metrics()["received"] == received
+
+
+def test_local_dispatch_skips_remote_only_subscribers(evictions):
+    invalidation._dispatch(3, ["players", "templates"], remote=False)
+    assert evictions == [("players", 3)]
+
+
+def test_failing_subscriber_does_not_stop_the_others(evictions):
+    invalidation.subscribe("players", lambda coach_id: 1 / 0)
+    invalidation.subscribe("players", lambda coach_id: evictions.append(("after", coach_id)))
+    invalidation._dispatch(3, ["players"], remote=True)
+    assert evictions == [("players", 3), ("after", 3)]
+
+
+def test_events_are_delivered_on_commit_and_dropped_on_rollback(client, evictions):
+    db = SessionLocal()
+    try:
+        # Handlers publish inside a transaction that has already read something.
+        db.execute(select(models.User.id))
+        invalidation.publish(db, 5, "players")
+        db.rollback()
+        db.commit()
+        assert evictions == []
+        invalidation.publish(db, 5, "players", "templates")
+        db.commit()
+        assert evictions == [("players", 5)]
+    finally:
+        db.close()
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        invalidation.subscribe("unknown", lambda coach_id: None)
+
+
+def test_metrics_require_login(client, headers):
+    assert client.get("/metrics/invalidation").status_code == 401
+    response = client.get("/metrics/invalidation", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["transport"] == "in-process"
+
+
+@pytest.fixture
+def notifications(monkeypatch):
+    """NOTIFY payloads this worker sends, with SQLite standing in for pg_notify."""
+    sent = []
+
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.create_function("pg_notify", 2, lambda channel, message: sent.append(message))
+
+    engine.dispose()
+    event.listen(engine, "connect", on_connect)
+    monkeypatch.setattr(invalidation, "uses_notify", lambda: True)
+    yield sent
+    event.remove(engine, "connect", on_connect)
+    engine.dispose()
+
+
+@pytest.mark.parametrize("path, body, kind", [
+    ("/api/teams", {"name": "Bantam A"}, "teams"),
+    ("/api/players", {"name": "Alex Smith"}, "players"),
+])
+def test_creates_reach_other_workers(client, headers, notifications, monkeypatch, writes, path, body, kind):
+    coach_id = client.get("/api/auth/me", headers=headers).json()["id"]
+    assert client.post(path, json=body, headers=headers).status_code == 200
+    [sent] = notifications
+    assert json.loads(sent)["k"] == [kind]
+
+    # What a second worker's listener does with it.
+    monkeypatch.setattr(invalidation, "_handlers", defaultdict(list))
+    monkeypatch.setattr(invalidation, "ORIGIN", "other-host:2:abcd1234")
+    evicted = []
+    invalidation.subscribe(kind, evicted.append)
+    invalidation.subscribe("templates", lambda coach_id: evicted.append("templates"))
+    invalidation.receive(sent)
+    assert evicted == [coach_id]
+    assert writes == [coach_id]
+
+
+def test_every_player_write_publishes(client, headers, evictions):
+    player_id = client.post("/api/players", json={"name": "Alex Smith"}, headers=headers).json()["id"]
+    response = client.put(f"/api/players/{player_id}", json={"name": "Alex Smith", "jersey_number": 9}, headers=headers)
+    assert response.status_code == 200
+    photo = {"file": ("photo.png", b"png", "image/png")}
+    assert client.post(f"/api/players/{player_id}/photo", files=photo, headers=headers).status_code == 200
+    assert [kind for kind, _ in evictions] == ["players"] * 3
@@ -0,0 +1,46 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app import jobs, models
+from app.database import SessionLocal
+
+
+def seed_coach(db, username):
+    coach = models.User(email=f"{username}@example.com", username=username, hashed_password="x")
+    db.add(coach)
+    db.flush()
+    player = models.Player(name=f"{username} player", coach_id=coach.id)
+    db.add(player)
+    db.flush()
+    start = datetime(2025, 10, 1)
+    for day, name in enumerate(["Alice", "Bob"] * 3):
+        db.add(models.Evaluation(
+            player_id=player.id, evaluator_id=coach.id, evaluator_name=name, evaluation_type="game",
+            date=start + timedelta(days=20 * day), **{skill: 2 + day % 3 for skill in models.SKILLS}
+        ))
+    return coach.id, player.id
+
+
+def test_analytics_refresh_only_touches_the_requesting_coach(client):
+    db = SessionLocal()
+    try:
+        coach_id, player_id = seed_coach(db, "first")
+        other_id, _ = seed_coach(db, "second")
+        db.commit()
+        job = jobs.enqueue(db, coach_id, "analytics_refresh", {})
+        jobs.run_job(db, job.id)
+        db.refresh(job)
+
+        assert job.status == jobs.SUCCEEDED
+        assert json.loads(job.result) == {
+            "normalization_refit": 1, "season_partitions_rebuilt": 1, "players_forecast": 1
+        }
+        assert set(db.execute(select(models.EvaluatorNormalization.evaluator_id)).scalars()) == {coach_id}
+        assert set(db.execute(select(models.SeasonSkillSummary.coach_id)).scalars()) == {coach_id}
+        assert set(db.execute(select(models.PlayerForecast.player_id)).scalars()) == {player_id}
+        # Nothing was marked as processed for the other coach.
+        assert db.get(models.RefreshWatermark, "season_summaries") is None
+    finally:
+        db.close()
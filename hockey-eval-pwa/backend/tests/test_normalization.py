@@ -0,0 +1,173 @@
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from app import models, normalization
+from app.database import SessionLocal
+
+BASE = np.array([
+    [2, 3, 3, 4, 2, 3],
+    [4, 4, 5, 3, 4, 4],
+    [1, 2, 2, 2, 3, 1],
+    [3, 3, 4, 5, 3, 2],
+    [5, 4, 4, 4, 5, 5],
+    [2, 1, 3, 2, 2, 3],
+    [3, 5, 2, 3, 4, 4],
+    [4, 2, 3, 4, 1, 2],
+], dtype=float)
+
+
+def panel(evaluator_id, transforms, player_offset=0):
+    """Every evaluator in ``transforms`` rates every BASE player."""
+    player_ids, evaluator_ids, names, ratings = [], [], [], []
+    for name, transform in transforms.items():
+        for player, base in enumerate(BASE):
+            player_ids.append(player_offset + player)
+            evaluator_ids.append(evaluator_id)
+            names.append(name)
+            ratings.append(transform(base))
+    return np.array(player_ids), np.array(evaluator_ids), np.array(names, dtype=object), np.array(ratings)
+
+
+def coefficients(result):
+    keys, offsets, scales, counts = result
+    return {key: (offsets[i], scales[i], counts[i]) for i, key in enumerate(keys)}
+
+
+def test_fit_recovers_a_constant_bias():
+    fitted = coefficients(normalization.fit(*panel(1, {
+        "Alice": lambda base: base,
+        "Bob": lambda base: base + 1,
+    })))
+    offset, scale, count = fitted[(1, "Bob")]
+    np.testing.assert_allclose(offset, 1)
+    np.testing.assert_allclose(scale, 1)
+    assert (count == len(BASE)).all()
+    np.testing.assert_allclose(fitted[(1, "Alice")][0], -1)
+
+
+def test_fit_scales_a_wide_evaluator_against_a_narrow_one():
+    fitted = coefficients(normalization.fit(*panel(1, {
+        "Alice": lambda base: base,
+        "Bob": lambda base: base,
+        "Casey": lambda base: 3 + 1.6 * (base - 3),
+    })))
+    assert (fitted[(1, "Casey")][1] > 1).all()
+    assert (fitted[(1, "Alice")][1] < 1).all()
+
+
+def test_fit_leaves_evaluators_without_shared_players_alone():
+    player_ids, evaluator_ids, names, ratings = panel(1, {"Alice": lambda base: base + 2})
+    offsets, scales, counts = normalization.fit(player_ids, evaluator_ids, names, ratings)[1:]
+    assert (offsets == 0).all()
+    assert (scales == 1).all()
+    assert (counts == 0).all()
+
+
+def test_fit_of_an_account_ignores_other_accounts():
+    first = panel(1, {"Alice": lambda base: base, "Bob": lambda base: 3 + 1.5 * (base - 3)})
+    second = panel(2, {"Dana": lambda base: 1 + 0 * base, "Eli": lambda base: 5 - base // 2}, player_offset=100)
+    alone = coefficients(normalization.fit(*first))
+    together = coefficients(normalization.fit(*(np.concatenate(pair) for pair in zip(first, second))))
+    for key, (offset, scale, count) in alone.items():
+        np.testing.assert_allclose(together[key][0], offset)
+        np.testing.assert_allclose(together[key][1], scale)
+
+
+def test_apply_round_trips_fitted_bias(client):
+    db = SessionLocal()
+    try:
+        db.add_all(rows(1, 1, {"Alice": lambda base: np.minimum(base, 4), "Bob": lambda base: np.minimum(base, 4) + 1}))
+        db.commit()
+        normalization.refresh(db, full=True)
+        normalized = normalization.apply(db, np.array([1, 1]), ["Bob", " Carol "], np.array([[4.0] * 6, [4.0] * 6]))
+    finally:
+        db.close()
+    np.testing.assert_allclose(normalized[0], 3)
+    np.testing.assert_allclose(normalized[1], 4)
+
+
+def rows(coach_id, first_player_id, transforms):
+    evaluations = []
+    for player, base in enumerate(BASE):
+        for name, transform in transforms.items():
+            values = np.clip(transform(base), 1, 5).astype(int).tolist()
+            evaluations.append(models.Evaluation(
+                player_id=first_player_id + player, evaluator_id=coach_id, evaluator_name=name,
+                evaluation_type="tryout", **dict(zip(models.SKILLS, values))
+            ))
+    return evaluations
+
+
+def stored(db):
+    table = models.EvaluatorNormalization.__table__
+    return {
+        (row.evaluator_id, row.evaluator_name, row.skill): (row.offset, row.scale, row.sample_count)
+        for row in db.execute(select(table))
+    }
+
+
+def test_incremental_refresh_matches_full_refit(client):
+    db = SessionLocal()
+    try:
+        db.add_all(rows(1, 1, {"Alice": lambda base: base, "Bob": lambda base: base + 1}))
+        db.add_all(rows(2, 100, {"Dana": lambda base: base - 1, "Eli": lambda base: 3 + 2 * (base - 3)}))
+        db.commit()
+        assert normalization.refresh(db, full=True) == 2
+
+        db.add_all(rows(1, 1, {"Casey": lambda base: 3 + 2 * (base - 3)}))
+        db.commit()
+        assert normalization.refresh(db) == 1
+        incremental = stored(db)
+
+        normalization.refresh(db, full=True)
+        full = stored(db)
+    finally:
+        db.close()
+    assert incremental.keys() == full.keys()
+    for key, (offset, scale, count) in full.items():
+        assert incremental[key] == (pytest.approx(offset), pytest.approx(scale), count)
+
+
+def test_refresh_route_only_refits_the_callers_account(client, headers):
+    db = SessionLocal()
+    try:
+        coach_id = db.execute(select(models.User.id)).scalar_one()
+        db.add_all(rows(coach_id, 1, {"Alice": lambda base: base, "Bob": lambda base: base + 1}))
+        db.add_all(rows(coach_id + 1, 100, {"Dana": lambda base: base, "Eli": lambda base: base + 1}))
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.post("/api/normalization/refresh", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"refit": 1}
+
+    db = SessionLocal()
+    try:
+        assert {key[0] for key in stored(db)} == {coach_id}
+        # The scheduled refresh still picks up the other account, and only that.
+        assert normalization.refresh(db) == 1
+        assert {key[0] for key in stored(db)} == {coach_id, coach_id + 1}
+    finally:
+        db.close()
+
+
+def test_late_commit_with_a_lower_id_is_not_skipped(client):
+    db = SessionLocal()
+    try:
+        late = rows(1, 1, {"Alice": lambda base: base, "Bob": lambda base: base + 1})
+        early = rows(2, 100, {"Dana": lambda base: base, "Eli": lambda base: base + 1})
+        for evaluation_id, evaluation in enumerate(late + early, start=1):
+            evaluation.id = evaluation_id
+        db.add_all(early)
+        db.commit()
+        assert normalization.refresh(db) == 1
+
+        # Account 1's evaluations took lower ids but commit only now.
+        db.add_all(late)
+        db.commit()
+        assert normalization.refresh(db) == 1
+        assert {key[0] for key in stored(db)} == {1, 2}
+    finally:
+        db.close()
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app import models, packed
+from app.database import SessionLocal
+
+EPOCH = datetime(1970, 1, 1)
+DATES = [datetime(2025, 9, 1, 18), datetime(2025, 10, 15, 7, 30), datetime(2026, 1, 3)]
+
+
+@pytest.fixture
+def seeded(client, headers):
+    coach_id = client.get("/api/auth/me", headers=headers).json()["id"]
+    db = SessionLocal()
+    try:
+        players = [models.Player(name=name, coach_id=coach_id) for name in ("Alex Smith", "Sam Lee")]
+        db.add_all(players)
+        db.flush()
+        rows = []
+        for i, date in enumerate(DATES):
+            player = players[i % 2]
+            skills = [(i + j) % 5 + 1 for j in range(len(models.SKILLS))]
+            db.add(models.Evaluation(
+                player_id=player.id, evaluator_id=coach_id, evaluator_name="Coach", evaluation_type="game",
+                date=date, **dict(zip(models.SKILLS, skills))
+            ))
+            rows.append((player.id, date, skills))
+        db.commit()
+        return rows
+    finally:
+        db.close()
+
+
+def decode(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"] == packed.MEDIA_TYPE
+    records = np.frombuffer(response.content, dtype=packed.RECORD_DTYPE)
+    assert int(response.headers["X-Record-Count"]) == len(records)
+    return [
+        (int(record["player_id"]), EPOCH + timedelta(seconds=int(record["date"])), record["skills"].tolist())
+        for record in records
+    ]
+
+
+def test_record_layout_is_18_unpadded_bytes():
+    assert packed.RECORD_DTYPE.itemsize == 18
+    records = packed.to_records([(7, datetime(1970, 1, 1, 0, 0, 5), 1, 2, 3, 4, 5, 1)])
+    assert records.tobytes() == (
+        (7).to_bytes(4, "little") + (5).to_bytes(8, "little") + bytes([1, 2, 3, 4, 5, 1])
+    )
+
+
+def test_packed_round_trip(client, headers, seeded):
+    response = client.get("/api/evaluations/packed", headers=headers)
+    assert response.headers["X-Record-Format"] == packed.RECORD_FORMAT
+    assert response.headers["X-Skills"] == ",".join(models.SKILLS)
+    assert decode(response) == seeded
+
+
+def test_packed_filters(client, headers, seeded):
+    in_range = client.get("/api/evaluations/packed?start=2025-10-01T00:00:00&end=2026-01-03T00:00:00", headers=headers)
+    assert decode(in_range) == seeded[1:2]
+    player_id = seeded[0][0]
+    one_player = client.get(f"/api/evaluations/packed?player_id={player_id}", headers=headers)
+    assert decode(one_player) == [row for row in seeded if row[0] == player_id]
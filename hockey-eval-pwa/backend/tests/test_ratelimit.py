@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+import httpx
+
+from app import crud, export, ratelimit
+from app.main import app
+
+
+def test_memory_backend_spends_burst_then_refuses(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    backend = ratelimit.MemoryBackend()
+
+    assert backend.consume("coach:1", 4, rate=2, burst=10) == (True, 0.0)
+    assert backend.consume("coach:1", 6, rate=2, burst=10) == (True, 0.0)
+    allowed, retry_after = backend.consume("coach:1", 3, rate=2, burst=10)
+    assert not allowed
+    assert retry_after == 1.5
+
+
+def test_memory_backend_refills_up_to_burst(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    backend = ratelimit.MemoryBackend()
+
+    assert backend.consume("coach:1", 10, rate=2, burst=10)[0]
+    now[0] += 2
+    assert backend.consume("coach:1", 4, rate=2, burst=10)[0]
+    assert not backend.consume("coach:1", 1, rate=2, burst=10)[0]
+    now[0] += 1000
+    assert backend.consume("coach:1", 10, rate=2, burst=10)[0]
+    assert not backend.consume("coach:1", 1, rate=2, burst=10)[0]
+
+
+def test_memory_backend_keeps_coaches_apart(monkeypatch):
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: 100.0)
+    backend = ratelimit.MemoryBackend()
+
+    assert backend.consume("coach:1", 10, rate=2, burst=10)[0]
+    assert backend.consume("coach:2", 10, rate=2, burst=10)[0]
+
+
+def test_concurrency_gate():
+    gate = ratelimit.ConcurrencyGate(2)
+    assert gate.try_acquire()
+    assert gate.try_acquire()
+    assert not gate.try_acquire()
+    gate.release()
+    assert gate.try_acquire()
+
+
+def test_heavy_route_is_shed_while_slots_are_busy(client, headers, monkeypatch):
+    player_id = client.post("/api/players", json={"name": "Alex Smith"}, headers=headers).json()["id"]
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_render(db, player, start=None, end=None):
+        started.set()
+        release.wait(10)
+        return b"%PDF-1.4"
+
+    monkeypatch.setattr(ratelimit, "heavy_gate", ratelimit.ConcurrencyGate(1))
+    monkeypatch.setattr(crud, "render_player_pdf", slow_render)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            first = asyncio.create_task(http.get(f"/api/players/{player_id}/pdf", headers=headers))
+            try:
+                assert await asyncio.to_thread(started.wait, 10)
+                # The render holds the only slot on a worker thread; the event
+                # loop stays free to shed the next heavy request and serve others.
+                second = await asyncio.wait_for(http.get(f"/api/players/{player_id}/pdf", headers=headers), 5)
+                health = await asyncio.wait_for(http.get("/healthz"), 5)
+            finally:
+                release.set()
+            return await first, second, health
+
+    first, second, health = asyncio.run(scenario())
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == "1"
+    assert health.status_code == 200
+    assert first.status_code == 200
+    assert ratelimit.heavy_gate.active == 0
+
+
+def test_export_holds_a_heavy_slot_until_streamed(client, headers, monkeypatch):
+    monkeypatch.setattr(ratelimit, "heavy_gate", ratelimit.ConcurrencyGate(1))
+    active = []
+
+    def stream(coach_id, format, table=None, compress=False, primary_until=None):
+        for _ in range(3):
+            active.append(ratelimit.heavy_gate.active)
+            yield b"row\n"
+
+    monkeypatch.setattr(export, "stream", stream)
+    response = client.get("/api/export?format=ndjson", headers=headers)
+    assert response.status_code == 200
+    assert active == [1, 1, 1]
+    assert ratelimit.heavy_gate.active == 0
+    ratelimit.heavy_gate.try_acquire()
+    assert client.get("/api/export?format=ndjson", headers=headers).status_code == 429
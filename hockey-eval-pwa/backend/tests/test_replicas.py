@@ -0,0 +1,72 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+
+from app import database, models
+
+
+@pytest.fixture
+def replica(client, tmp_path, monkeypatch):
+    # Two SQLite files as in the README recipe: the schema is built on both.
+    engine = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    models.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "replica_engines", [engine])
+    monkeypatch.setattr(database, "_last_write", {})
+    yield engine
+    engine.dispose()
+
+
+def replica_only_team(replica, client, headers):
+    coach_id = client.get("/api/auth/me", headers=headers).json()["id"]
+    with replica.begin() as conn:
+        conn.execute(insert(models.Team.__table__).values(name="Replica Hawks", coach_id=coach_id))
+
+
+def team_names(client, headers):
+    response = client.get("/api/teams", headers=headers)
+    assert response.status_code == 200
+    return {team["name"] for team in response.json()}
+
+
+def test_reads_go_to_the_replica(client, headers, replica):
+    replica_only_team(replica, client, headers)
+    assert team_names(client, headers) == {"Replica Hawks"}
+
+
+def test_reads_stay_on_the_primary_after_a_write(client, headers, replica, monkeypatch):
+    replica_only_team(replica, client, headers)
+    assert client.post("/api/teams", json={"name": "Primary Hawks"}, headers=headers).status_code == 200
+    assert team_names(client, headers) == {"Primary Hawks"}
+
+    # Once the window has passed the replica serves the coach again.
+    monkeypatch.setattr(database, "READ_YOUR_WRITES_SECONDS", 0)
+    assert team_names(client, headers) == {"Replica Hawks"}
+
+
+def test_writes_never_reach_the_replica(client, headers, replica):
+    client.post("/api/teams", json={"name": "Primary Hawks"}, headers=headers)
+    with replica.connect() as conn:
+        assert conn.execute(select(models.Team.name)).all() == []
+
+
+def test_write_deadline_travels_with_the_client(client, headers, replica, monkeypatch):
+    replica_only_team(replica, client, headers)
+    response = client.post("/api/teams", json={"name": "Primary Hawks"}, headers=headers)
+    deadline = response.headers[database.READ_YOUR_WRITES_HEADER]
+    assert float(deadline) > time.time()
+
+    # Another worker never saw the write; the echoed header keeps it on the primary.
+    monkeypatch.setattr(database, "_last_write", {})
+    sticky = {**headers, database.READ_YOUR_WRITES_HEADER: deadline}
+    assert team_names(client, sticky) == {"Primary Hawks"}
+    assert team_names(client, headers) == {"Replica Hawks"}
+    expired = {**headers, database.READ_YOUR_WRITES_HEADER: str(time.time() - 1)}
+    assert team_names(client, expired) == {"Replica Hawks"}
+    garbage = {**headers, database.READ_YOUR_WRITES_HEADER: "soon"}
+    assert team_names(client, garbage) == {"Replica Hawks"}
+
+
+def test_reads_do_not_set_the_deadline(client, headers, replica):
+    response = client.get("/api/teams", headers=headers)
+    assert database.READ_YOUR_WRITES_HEADER not in response.headers
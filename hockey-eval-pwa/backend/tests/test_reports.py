@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import crud, models
+from app.database import SessionLocal
+from app.pdf_generator import RECENT_EVALUATIONS
+
+
+@pytest.fixture
+def player_id(client, headers):
+    """A player with more dated evaluations than a report lists."""
+    coach_id = client.get("/api/auth/me", headers=headers).json()["id"]
+    db = SessionLocal()
+    try:
+        player = models.Player(name="Alex Smith", coach_id=coach_id)
+        db.add(player)
+        db.flush()
+        # Inserted out of date order so the ordering comes from the query.
+        for day in (3, 7, 1, 5, 8, 2, 6, 4):
+            db.add(models.Evaluation(
+                player_id=player.id, evaluator_id=coach_id, evaluator_name="Coach", evaluation_type="game",
+                date=datetime(2024, 10, 1) + timedelta(days=day), notes=f"day {day}",
+                **{skill: 1 + day % 5 for skill in models.SKILLS}
+            ))
+        db.commit()
+        return player.id
+    finally:
+        db.close()
+
+
+def test_report_lists_the_newest_evaluations_first(client, player_id):
+    db = SessionLocal()
+    try:
+        report = crud.player_report_data(db, db.get(models.Player, player_id))
+    finally:
+        db.close()
+    assert RECENT_EVALUATIONS == 5
+    assert [evaluation.notes for evaluation in report.recent] == ["day 8", "day 7", "day 6", "day 5", "day 4"]
+    assert report.evaluation_count == 8
+
+
+def test_player_pdf(client, headers, player_id):
+    response = client.get(f"/api/players/{player_id}/pdf", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
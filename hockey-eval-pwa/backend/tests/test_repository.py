@@ -0,0 +1,58 @@
+import pytest
+
+from app import models, repository
+from app.database import SessionLocal
+
+from .conftest import login
+
+
+@pytest.fixture
+def coaches(client, headers):
+    """Two coaches, each with one player evaluated once."""
+    other = login(client, "other")
+    ids = [client.get("/api/auth/me", headers=h).json()["id"] for h in (headers, other)]
+    db = SessionLocal()
+    try:
+        players = []
+        for coach_id in ids:
+            player = models.Player(name=f"Player of {coach_id}", coach_id=coach_id)
+            db.add(player)
+            db.flush()
+            db.add(models.Evaluation(
+                player_id=player.id, evaluator_id=coach_id, evaluator_name="Coach", evaluation_type="game",
+                **{skill: 3 for skill in models.SKILLS}
+            ))
+            players.append(player.id)
+        db.commit()
+        return list(zip(ids, players))
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def test_owns_player_is_scoped_to_the_coach(coaches, db):
+    (coach, player), (other, other_player) = coaches
+    assert repository.owns_player(db, player, coach)
+    assert not repository.owns_player(db, other_player, coach)
+    assert not repository.owns_player(db, player, other)
+
+
+def test_player_for_coach_is_scoped_to_the_coach(coaches, db):
+    (coach, player), (other, other_player) = coaches
+    assert repository.player_for_coach(db, player, coach).id == player
+    assert repository.player_for_coach(db, other_player, coach) is None
+    assert repository.player_for_coach(db, player, other) is None
+
+
+def test_evaluations_for_coach_is_scoped_to_the_coach(coaches, db):
+    (coach, player), (other, other_player) = coaches
+    assert [row.player_id for row in repository.evaluations_for_coach(db, coach)] == [player]
+    assert [row.player_id for row in repository.evaluations_for_coach(db, coach, player)] == [player]
+    assert repository.evaluations_for_coach(db, coach, other_player) == []
+    assert [row.player_id for row in repository.evaluations_for_coach(db, other)] == [other_player]
@@ -0,0 +1,56 @@
+import time
+from datetime import datetime, timedelta
+
+from app import models, scheduler
+from app.database import SessionLocal
+
+DAY = 86400.0
+
+
+def test_job_without_a_persisted_run_waits_one_interval():
+    job = scheduler._Job("example", lambda: None, DAY)
+    assert job.next_run > time.time() + DAY - 60
+    assert job.due_at() is None
+
+
+def test_persisted_job_is_due_one_interval_after_its_last_run():
+    job = scheduler._Job("example", lambda: None, DAY, last_run=lambda: time.time() - DAY + 3600)
+    # Checked as soon as the scheduler starts, not a full day after a restart.
+    assert job.next_run <= time.time()
+    assert abs(job.due_at() - (time.time() + 3600)) < 60
+
+
+def test_persisted_job_runs_when_overdue_or_never_run():
+    overdue = scheduler._Job("example", lambda: None, DAY, last_run=lambda: time.time() - 2 * DAY)
+    never = scheduler._Job("example", lambda: None, DAY, last_run=lambda: None)
+    assert overdue.due_at() is None
+    assert never.due_at() is None
+
+
+def test_scheduler_skips_a_job_another_worker_just_ran(monkeypatch):
+    runs = []
+    last_runs = iter([None, time.time()])
+    sched = scheduler.Scheduler()
+    sched.add_job("example", lambda: runs.append(1), DAY, last_run=lambda: next(last_runs))
+    sched.add_job("stop", lambda: sched._stop.set(), 0.01)
+    job = sched._jobs[0]
+
+    sched._run()
+    assert runs == [1]
+    job.next_run = 0
+    sched._stop.clear()
+    sched._run()
+    assert runs == [1]
+    assert job.next_run > time.time() + DAY - 60
+
+
+def test_refreshed_at_reads_the_watermark(client):
+    last_run = scheduler.refreshed_at("example")
+    assert last_run() is None
+    db = SessionLocal()
+    try:
+        models.RefreshWatermark.for_job(db, "example").refreshed_at = datetime.utcnow() - timedelta(hours=2)
+        db.commit()
+    finally:
+        db.close()
+    assert abs(last_run() - (time.time() - 7200)) < 60
@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app import models, packed, similarity
+from app.database import SessionLocal
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes():
+    similarity.invalidate(None)
+    yield
+    similarity.invalidate(None)
+
+
+def index_of(evaluations, age_groups=None):
+    records = packed.to_records([
+        (player_id, datetime(2025, 9, day), *skills) for day, (player_id, skills) in enumerate(evaluations, start=1)
+    ])
+    return similarity.SimilarityIndex.from_records(records, age_groups or {})
+
+
+def test_nearest_orders_by_distance_and_excludes_the_player():
+    index = index_of([(1, [3] * 6), (2, [3, 3, 3, 3, 3, 4]), (3, [5] * 6), (4, [1] * 6)])
+    nearest = index.nearest(1, 2)
+    assert [player_id for player_id, _, _ in nearest] == [2, 3]
+    assert nearest[0][1] == pytest.approx(1.0)
+    assert 1 not in [player_id for player_id, _, _ in index.nearest(1, 10)]
+
+
+def test_k_is_bounded_by_the_candidates():
+    index = index_of([(1, [3] * 6), (2, [4] * 6), (3, [5] * 6)])
+    assert len(index.nearest(1, 10)) == 2
+    assert index.nearest(1, 0) == []
+    assert index.nearest(99, 3) == []
+
+
+def test_latest_and_average_bases():
+    index = index_of([(1, [1] * 6), (1, [5] * 6), (2, [5] * 6), (3, [3] * 6)])
+    assert index.nearest(1, 1, "latest")[0][0] == 2
+    assert index.nearest(1, 1, "average")[0][0] == 3
+    np.testing.assert_allclose(index.average[index.rows[1]], [3] * 6)
+
+
+def test_age_group_filter():
+    index = index_of([(1, [3] * 6), (2, [3] * 6), (3, [4] * 6)], {1: "U13", 2: "U15", 3: "U13"})
+    assert [player_id for player_id, _, _ in index.nearest(1, 5, age_group="U13")] == [3]
+
+
+def test_record_updates_latest_and_average():
+    index = index_of([(1, [1] * 6), (2, [4] * 6), (3, [2] * 6)])
+    assert index.nearest(1, 1)[0][0] == 3
+    assert index.record(1, [4] * 6)
+    assert index.nearest(1, 1)[0][0] == 2
+    np.testing.assert_allclose(index.average[index.rows[1]], [2.5] * 6)
+    assert not index.record(42, [4] * 6)
+
+
+def evaluate(client, headers, player_id, rating):
+    skills = {skill: rating for skill in models.SKILLS}
+    return client.post("/api/evaluations", json={
+        "player_id": player_id, "evaluator_name": "Coach", "evaluation_type": "game", "skills": skills
+    }, headers=headers)
+
+
+def similar(client, headers, player_id, **params):
+    response = client.get(f"/api/players/{player_id}/similar", params=params, headers=headers)
+    assert response.status_code == 200
+    return [entry["player_id"] for entry in response.json()]
+
+
+def test_similar_route_follows_new_evaluations(client, headers):
+    coach_id = client.get("/api/auth/me", headers=headers).json()["id"]
+    ids = [client.post("/api/players", json={"name": name}, headers=headers).json()["id"] for name in "ABC"]
+    for player_id, rating in zip(ids, (1, 4, 2)):
+        evaluate(client, headers, player_id, rating)
+    assert similar(client, headers, ids[0]) == [ids[2], ids[1]]
+    # Patched in place on this worker, without a rebuild.
+    cached = similarity._indexes[coach_id]
+    evaluate(client, headers, ids[0], 4)
+    assert similar(client, headers, ids[0], k=1) == [ids[1]]
+    assert similarity._indexes[coach_id] is cached
+
+
+def test_similar_route_bounds_k(client, headers):
+    player_id = client.post("/api/players", json={"name": "A"}, headers=headers).json()["id"]
+    assert client.get(f"/api/players/{player_id}/similar?k=0", headers=headers).status_code == 422
+    assert client.get(f"/api/players/{player_id}/similar?k=51", headers=headers).status_code == 422
+
+
+def test_build_racing_a_new_evaluation_is_not_installed(client, headers, monkeypatch):
+    coach_id = client.get("/api/auth/me", headers=headers).json()["id"]
+    real_build = similarity.build
+
+    def build_then_commit(db, coach_id):
+        index = real_build(db, coach_id)
+        # Committed after the build read its records, before it installs.
+        similarity.record_evaluations(coach_id, [])
+        return index
+
+    monkeypatch.setattr(similarity, "build", build_then_commit)
+    db = SessionLocal()
+    try:
+        similarity.get_index(db, coach_id)
+        assert coach_id not in similarity._indexes
+        monkeypatch.setattr(similarity, "build", real_build)
+        similarity.get_index(db, coach_id)
+        assert coach_id in similarity._indexes
+    finally:
+        db.close()
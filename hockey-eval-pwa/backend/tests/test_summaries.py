@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app import models, summaries
+from app.database import SessionLocal, advisory_lock
+
+
+@pytest.fixture
+def db(client):
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def seed(db):
+    coach = models.User(email="coach@example.com", username="coach", hashed_password="x")
+    db.add(coach)
+    db.flush()
+    team = models.Team(name="Hawks", age_group="U13", coach_id=coach.id)
+    db.add(team)
+    db.flush()
+    player = models.Player(name="Alex Smith", coach_id=coach.id, team_id=team.id)
+    db.add(player)
+    db.flush()
+    for day in (3, 20):
+        db.add(models.Evaluation(
+            player_id=player.id, evaluator_id=coach.id, evaluator_name="Coach", evaluation_type="game",
+            date=datetime(2025, 10, day), **{skill: 3 for skill in models.SKILLS}
+        ))
+    db.commit()
+    return coach.id
+
+
+def summary_count(db):
+    return db.execute(select(func.count()).select_from(models.SeasonSkillSummary)).scalar()
+
+
+def test_repeated_refreshes_do_not_duplicate_rows(db):
+    coach_id = seed(db)
+    assert summaries.refresh(db) == 1
+    assert summaries.refresh(db, full=True) == 1
+    assert summaries.refresh_coach(db, coach_id) == 1
+    assert summary_count(db) == len(models.SKILLS)
+
+
+def test_summary_rows_are_unique_per_key(db):
+    # SQLite treats NULLs as distinct here, so the row needs a team; on
+    # PostgreSQL the constraint is NULLS NOT DISTINCT.
+    coach_id = seed(db)
+    summaries.refresh(db)
+    existing = db.execute(select(models.SeasonSkillSummary)).scalars().first()
+    db.add(models.SeasonSkillSummary(
+        coach_id=coach_id, team_id=existing.team_id, age_group=existing.age_group, season=existing.season,
+        period=existing.period, skill=existing.skill, evaluation_count=1, player_count=1,
+        average=1.0, minimum=1, maximum=1
+    ))
+    with pytest.raises(IntegrityError):
+        db.commit()
+
+
+def test_watermark_created_by_another_worker_is_reused(db, monkeypatch):
+    other = SessionLocal()
+    try:
+        models.RefreshWatermark.for_job(other, "example").refreshed_at = datetime(2026, 1, 1)
+        other.commit()
+    finally:
+        other.close()
+
+    # This worker looked before the other one committed, so it also inserts.
+    real_get, calls = db.get, []
+
+    def stale_get(*args, **kwargs):
+        calls.append(args)
+        return None if len(calls) == 1 else real_get(*args, **kwargs)
+
+    monkeypatch.setattr(db, "get", stale_get)
+    assert models.RefreshWatermark.for_job(db, "example").refreshed_at == datetime(2026, 1, 1)
+    db.commit()
+    assert db.execute(select(func.count()).select_from(models.RefreshWatermark)).scalar() == 1
+
+
+def test_advisory_lock_is_a_no_op_without_postgres(db):
+    assert advisory_lock(db, summaries.JOB_NAME)
+    assert advisory_lock(db, summaries.JOB_NAME, wait=True)
+
+
+def test_late_commit_with_a_lower_id_is_not_skipped(db):
+    coach_id = seed(db)
+    player_id = db.execute(select(models.Player.id)).scalar_one()
+    db.add(models.Evaluation(
+        id=10, player_id=player_id, evaluator_id=coach_id, evaluator_name="Coach", evaluation_type="game",
+        date=datetime(2025, 11, 1), **{skill: 4 for skill in models.SKILLS}
+    ))
+    db.commit()
+    summaries.refresh(db)
+
+    # An insert that took id 5 before id 10 committed, but only commits now.
+    db.add(models.Evaluation(
+        id=5, player_id=player_id, evaluator_id=coach_id, evaluator_name="Coach", evaluation_type="game",
+        date=datetime(2024, 10, 1), **{skill: 2 for skill in models.SKILLS}
+    ))
+    db.commit()
+    assert summaries.refresh(db) == 1
+    seasons_built = set(db.execute(select(models.SeasonSkillSummary.season)).scalars())
+    assert seasons_built == {"2024-25", "2025-26"}
+
+
+def test_team_change_queues_a_rebuild_of_every_season(db):
+    coach_id = seed(db)
+    summaries.refresh(db)
+    assert summaries.refresh(db) == 0
+    summaries.request_refresh(db, coach_id)
+    db.commit()
+    assert summaries.refresh(db) == 1
+    assert summaries.refresh(db) == 0
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from app import team_balancer
+
+
+def make_pool(n=24, seed=0):
+    rng = np.random.default_rng(seed)
+    skills = rng.integers(1, 6, size=(n, 8)).astype(float)
+    positions = ["goalie" if i < 4 else ("defense" if i % 3 == 0 else "forward") for i in range(n)]
+    return skills, positions
+
+
+def imbalance(skills, teams, team_count):
+    sums = np.zeros((team_count, skills.shape[1]))
+    np.add.at(sums, teams, skills)
+    return float(team_balancer._cost(sums, np.bincount(teams, minlength=team_count).astype(float)))
+
+
+def test_team_sizes_differ_by_at_most_one():
+    skills, positions = make_pool(23)
+    result = team_balancer.balance(skills, positions, 4, time_budget_ms=20, seed=1)
+    sizes = np.bincount(result.teams, minlength=4)
+    assert sizes.sum() == 23
+    assert sizes.max() - sizes.min() <= 1
+
+
+def test_positions_are_spread_across_teams():
+    skills, positions = make_pool(24)
+    result = team_balancer.balance(skills, positions, 4, time_budget_ms=20, seed=1)
+    goalies = [result.teams[i] for i, position in enumerate(positions) if position == "goalie"]
+    assert sorted(goalies) == [0, 1, 2, 3]
+
+
+def test_annealing_improves_on_the_draft():
+    skills, positions = make_pool(30, seed=3)
+    draft = team_balancer.balance(skills, positions, 3, time_budget_ms=0, seed=1)
+    annealed = team_balancer.balance(skills, positions, 3, time_budget_ms=100, seed=1)
+    assert draft.iterations == 0
+    assert annealed.iterations > 0
+    assert annealed.score <= draft.score
+    assert annealed.score == pytest.approx(imbalance(skills, annealed.teams, 3))
+
+
+def test_keep_apart_pairs_end_up_on_different_teams():
+    skills, positions = make_pool(16)
+    # Identical players sit next to each other in the draft order.
+    skills[5] = skills[6] = skills[7] = 5
+    keep_apart = [(5, 6), (6, 7), (5, 7)]
+    result = team_balancer.balance(
+        skills, positions, 4, time_budget_ms=100, balance_positions=False, keep_apart=keep_apart, seed=2
+    )
+    assert result.violations == 0
+    assert len({result.teams[5], result.teams[6], result.teams[7]}) == 3
+
+
+def test_single_player_per_group_skips_annealing():
+    skills = np.array([[1.0] * 8, [5.0] * 8])
+    result = team_balancer.balance(skills, ["goalie", "forward"], 2, time_budget_ms=50)
+    assert result.iterations == 0
+    assert sorted(result.teams.tolist()) == [0, 1]
+
+
+def test_balance_route(client, headers):
+    player_ids = [
+        client.post("/api/players", json={"name": f"Player {i}", "position": "Forward"}, headers=headers).json()["id"]
+        for i in range(6)
+    ]
+    response = client.post("/api/teams/balance", json={
+        "player_ids": player_ids, "team_count": 2, "time_budget_ms": 20, "seed": 1
+    }, headers=headers)
+    assert response.status_code == 200
+    teams = response.json()["teams"]
+    assert sorted(len(team["player_ids"]) for team in teams) == [3, 3]
+    assert response.json()["unrated_player_ids"] == player_ids
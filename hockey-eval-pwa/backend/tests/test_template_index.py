@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import models, template_index
+from app.database import SessionLocal
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    template_index.invalidate(None)
+    template_index._pending.clear()
+    yield
+    template_index.invalidate(None)
+    template_index._pending.clear()
+
+
+def template(id, name, text, category=None, times_used=0):
+    return SimpleNamespace(
+        id=id, coach_id=1, name=name, category=category, text=text, created_at=None, times_used=times_used
+    )
+
+
+def names(results):
+    return [result["name"] for result in results]
+
+
+def test_prefix_lookup_matches_every_word():
+    index = template_index.CoachTemplateIndex([
+        template(1, "Edges", "Work on inside edges in tight turns"),
+        template(2, "Shot", "Quick release from the slot", category="Shooting"),
+        template(3, "Turns", "Crossovers through turns"),
+    ])
+    assert names(index.suggest("tur")) == ["Edges", "Turns"]
+    assert names(index.suggest("TIGHT tu")) == ["Edges"]
+    assert names(index.suggest("shoot")) == ["Shot"]
+    assert index.suggest("zamboni") == []
+
+
+def test_most_used_templates_rank_first_then_by_name():
+    index = template_index.CoachTemplateIndex([
+        template(1, "beta", "skate", times_used=1),
+        template(2, "Alpha", "skate", times_used=1),
+        template(3, "gamma", "skate", times_used=7),
+    ])
+    assert names(index.suggest("skate")) == ["gamma", "Alpha", "beta"]
+    assert names(index.suggest("", limit=2)) == ["gamma", "Alpha"]
+
+
+def create_templates(client, headers, *names):
+    return [
+        client.post("/api/feedback-templates", json={"name": name, "text": "Keep your stick on the ice"}, headers=headers).json()
+        for name in names
+    ]
+
+
+def test_record_use_ranks_immediately_and_flush_persists(client, headers):
+    first, second = create_templates(client, headers, "Alpha", "Beta")
+    coach_id = first["coach_id"]
+    assert names(client.get("/api/feedback-templates/suggest?q=stick", headers=headers).json()) == ["Alpha", "Beta"]
+
+    template_index.record_use(coach_id, {second["id"]})
+    assert names(client.get("/api/feedback-templates/suggest?q=stick", headers=headers).json()) == ["Beta", "Alpha"]
+
+    db = SessionLocal()
+    try:
+        assert template_index.flush(db) == 1
+        assert template_index.flush(db) == 0
+        assert db.get(models.FeedbackTemplate, second["id"]).times_used == 1
+    finally:
+        db.close()
+    # A rebuilt index reads the flushed count from the table, once.
+    template_index.invalidate(coach_id)
+    results = client.get("/api/feedback-templates/suggest?q=stick", headers=headers).json()
+    assert [result["times_used"] for result in results] == [1, 0]
+
+
+def test_build_racing_a_flush_is_not_installed(client, headers, monkeypatch):
+    [created] = create_templates(client, headers, "Alpha")
+    coach_id = created["coach_id"]
+    template_index.record_use(coach_id, {created["id"]})
+    real_index = template_index.CoachTemplateIndex
+
+    def flush_during_build(templates):
+        # The snapshot was read before the flush moved the count into the table.
+        db = SessionLocal()
+        try:
+            template_index.flush(db)
+        finally:
+            db.close()
+        return real_index(templates)
+
+    monkeypatch.setattr(template_index, "CoachTemplateIndex", flush_during_build)
+    db = SessionLocal()
+    try:
+        template_index.get_index(db, coach_id)
+        assert coach_id not in template_index._indexes
+        monkeypatch.setattr(template_index, "CoachTemplateIndex", real_index)
+        index = template_index.get_index(db, coach_id)
+        assert template_index._indexes[coach_id] is index
+        assert index.templates[created["id"]]["times_used"] == 1
+    finally:
+        db.close()
+
+
+def test_build_racing_an_invalidation_is_not_installed(client, headers, monkeypatch):
+    [created] = create_templates(client, headers, "Alpha")
+    real_index = template_index.CoachTemplateIndex
+
+    def invalidate_during_build(templates):
+        template_index.invalidate(created["coach_id"])
+        return real_index(templates)
+
+    monkeypatch.setattr(template_index, "CoachTemplateIndex", invalidate_during_build)
+    db = SessionLocal()
+    try:
+        template_index.get_index(db, created["coach_id"])
+    finally:
+        db.close()
+    assert created["coach_id"] not in template_index._indexes
+
+
+def test_suggest_limit_is_bounded(client, headers):
+    assert client.get("/api/feedback-templates/suggest?limit=0", headers=headers).status_code == 422
+    assert client.get("/api/feedback-templates/suggest?limit=51", headers=headers).status_code == 422
@@ -18,6 +18,25 @@ const getHeaders = () => {
   return headers
 }
 
+// After a write the API returns the time until which this client's reads
+// must come from the primary database; sending it back lets any server
+// worker honour it, not just the one that handled the write.
+const READ_PRIMARY_HEADER = 'X-Read-Primary-Until'
+let readPrimaryUntil: string | null = null
+
+const request = async (url: string, init: RequestInit = {}): Promise<Response> => {
+  const headers = new Headers(init.headers)
+  if (readPrimaryUntil && Number(readPrimaryUntil) * 1000 > Date.now()) {
+    headers.set(READ_PRIMARY_HEADER, readPrimaryUntil)
+  }
+  const response = await fetch(url, { ...init, headers })
+  const until = response.headers.get(READ_PRIMARY_HEADER)
+  if (until) {
+    readPrimaryUntil = until
+  }
+  return response
+}
+
 export interface Player {
   id: number
   name: string
@@ -79,7 +98,7 @@ export interface FeedbackTemplate {
 export const api = {
   teams: {
     list: async (): Promise<Team[]> => {
-      const response = await fetch(`${API_URL}/api/teams`, {
+      const response = await request(`${API_URL}/api/teams`, {
         headers: getHeaders()
       })
       if (!response.ok) throw new Error('Failed to fetch teams')
@@ -87,7 +106,7 @@ export const api = {
     },
     
     create: async (team: { name: string; age_group?: string; season?: string }): Promise<Team> => {
-      const response = await fetch(`${API_URL}/api/teams`, {
+      const response = await request(`${API_URL}/api/teams`, {
         method: 'POST',
         headers: getHeaders(),
         body: JSON.stringify(team)
@@ -103,7 +122,7 @@ export const api = {
       if (teamId) params.append('team_id', teamId.toString())
       if (search) params.append('search', search)
       
-      const response = await fetch(`${API_URL}/api/players?${params}`, {
+      const response = await request(`${API_URL}/api/players?${params}`, {
         headers: getHeaders()
       })
       if (!response.ok) throw new Error('Failed to fetch players')
@@ -111,7 +130,7 @@ export const api = {
     },
     
     get: async (id: number): Promise<Player & { evaluations: Evaluation[] }> => {
-      const response = await fetch(`${API_URL}/api/players/${id}`, {
+      const response = await request(`${API_URL}/api/players/${id}`, {
         headers: getHeaders()
       })
       if (!response.ok) throw new Error('Failed to fetch player')
@@ -125,7 +144,7 @@ export const api = {
       age_group?: string
       team_id?: number
     }): Promise<Player> => {
-      const response = await fetch(`${API_URL}/api/players`, {
+      const response = await request(`${API_URL}/api/players`, {
         method: 'POST',
         headers: getHeaders(),
         body: JSON.stringify(player)
@@ -135,7 +154,7 @@ export const api = {
     },
     
     update: async (id: number, player: Partial<Player>): Promise<Player> => {
-      const response = await fetch(`${API_URL}/api/players/${id}`, {
+      const response = await request(`${API_URL}/api/players/${id}`, {
         method: 'PUT',
         headers: getHeaders(),
         body: JSON.stringify(player)
@@ -145,7 +164,7 @@ export const api = {
     },
     
     delete: async (id: number): Promise<void> => {
-      const response = await fetch(`${API_URL}/api/players/${id}`, {
+      const response = await request(`${API_URL}/api/players/${id}`, {
         method: 'DELETE',
         headers: getHeaders()
       })
@@ -156,7 +175,7 @@ export const api = {
       const formData = new FormData()
       formData.append('file', file)
       
-      const response = await fetch(`${API_URL}/api/players/${id}/photo`, {
+      const response = await request(`${API_URL}/api/players/${id}/photo`, {
         method: 'POST',
         headers: {
           'Authorization': `Bearer ${authToken}`
@@ -168,7 +187,7 @@ export const api = {
     },
     
     downloadPDF: async (id: number): Promise<Blob> => {
-      const response = await fetch(`${API_URL}/api/players/${id}/pdf`, {
+      const response = await request(`${API_URL}/api/players/${id}/pdf`, {
         headers: {
           'Authorization': `Bearer ${authToken}`
         }
@@ -183,7 +202,7 @@ export const api = {
       const params = new URLSearchParams()
       if (playerId) params.append('player_id', playerId.toString())
       
-      const response = await fetch(`${API_URL}/api/evaluations?${params}`, {
+      const response = await request(`${API_URL}/api/evaluations?${params}`, {
         headers: getHeaders()
       })
       if (!response.ok) throw new Error('Failed to fetch evaluations')
@@ -199,7 +218,7 @@ export const api = {
       strengths?: string
       areas_for_improvement?: string
     }): Promise<Evaluation> => {
-      const response = await fetch(`${API_URL}/api/evaluations`, {
+      const response = await request(`${API_URL}/api/evaluations`, {
         method: 'POST',
         headers: getHeaders(),
         body: JSON.stringify(evaluation)
@@ -217,7 +236,7 @@ export const api = {
       strengths?: string
       areas_for_improvement?: string
     }>): Promise<Evaluation[]> => {
-      const response = await fetch(`${API_URL}/api/evaluations/bulk`, {
+      const response = await request(`${API_URL}/api/evaluations/bulk`, {
         method: 'POST',
         headers: getHeaders(),
         body: JSON.stringify(evaluations)
@@ -229,7 +248,7 @@ export const api = {
   
   templates: {
     list: async (): Promise<FeedbackTemplate[]> => {
-      const response = await fetch(`${API_URL}/api/feedback-templates`, {
+      const response = await request(`${API_URL}/api/feedback-templates`, {
         headers: getHeaders()
       })
       if (!response.ok) throw new Error('Failed to fetch templates')
@@ -241,7 +260,7 @@ export const api = {
       category?: string
       text: string
     }): Promise<FeedbackTemplate> => {
-      const response = await fetch(`${API_URL}/api/feedback-templates`, {
+      const response = await request(`${API_URL}/api/feedback-templates`, {
         method: 'POST',
         headers: getHeaders(),
         body: JSON.stringify(template)
@@ -251,7 +270,7 @@ export const api = {
     },
     
     delete: async (id: number): Promise<void> => {
-      const response = await fetch(`${API_URL}/api/feedback-templates/${id}`, {
+      const response = await request(`${API_URL}/api/feedback-templates/${id}`, {
         method: 'DELETE',
         headers: getHeaders()
       })